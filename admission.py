@@ -0,0 +1,156 @@
+"""Per-tool admission control for async tools.
+
+Each guarded tool gets a ToolGate: at most `limit` calls run at once, up to
+`max_queue` more wait their turn in arrival order, and anything beyond that
+is rejected at once with an "overloaded" response instead of piling up.
+
+The gate keeps an exponentially weighted moving average of how long
+admitted calls take. A new call that would have to queue is also rejected
+when the wait it can expect (its place in the queue, divided across the
+running slots, times the average) exceeds `max_wait`, and a queued call
+that has waited `max_wait` gives up. Load is shed while the server can
+still answer quickly, and every rejection carries retry_after_ms, the
+gate's estimate of when a slot will be free.
+
+Gates are per event loop, so with several workers the limits apply per
+worker process.
+"""
+import asyncio
+import collections
+import functools
+import inspect
+import json
+import math
+import time
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str, retry_after_ms: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_ms = retry_after_ms
+
+    def payload(self) -> dict:
+        return {"error": "Server overloaded", "reason": self.reason, "retry_after_ms": self.retry_after_ms}
+
+
+class ToolGate:
+    def __init__(self, limit: int, max_queue: int, max_wait: float, initial_latency: float = 0.1, alpha: float = 0.2):
+        if limit < 1 or max_queue < 0 or max_wait <= 0:
+            raise ValueError("limit must be >= 1, max_queue >= 0 and max_wait > 0")
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.alpha = alpha
+        self.latency = initial_latency
+        self._waiters = collections.deque()
+        self.active = 0
+        self.admitted = 0
+        self.shed = {}
+
+    def expected_wait(self, position: int) -> float:
+        """Seconds until the call at 1-based queue `position` should get a slot."""
+        return math.ceil(position / self.limit) * self.latency
+
+    def _reject(self, reason: str, wait: float):
+        self.shed[reason] = self.shed.get(reason, 0) + 1
+        return Overloaded(reason, max(1, math.ceil(wait * 1000)))
+
+    async def acquire(self):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        position = len(self._waiters) + 1
+        if position > self.max_queue:
+            raise self._reject("queue_full", self.expected_wait(position))
+        if self.expected_wait(position) > self.max_wait:
+            raise self._reject("expected_wait", self.expected_wait(position))
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as this caller gave up; pass it on.
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject("queue_timeout", self.expected_wait(len(self._waiters) + 1)) from None
+            raise
+        self.admitted += 1
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # the slot moves to the waiter; active is unchanged
+                return
+        self.active -= 1
+
+    def observe(self, seconds: float):
+        self.latency += self.alpha * (seconds - self.latency)
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "latency_ewma_ms": round(self.latency * 1000, 2),
+            "admitted": self.admitted,
+            "shed": dict(sorted(self.shed.items())),
+        }
+
+
+def parse_limits(spec: str) -> dict:
+    """Parse "tool=limit:max_queue:max_wait_ms,..." into {tool: (limit, max_queue, max_wait_seconds)}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            tool, values = item.split("=", 1)
+            limit, max_queue, max_wait_ms = (int(v) for v in values.split(":"))
+        except ValueError:
+            raise ValueError(f"Invalid admission limit {item!r}; expected tool=limit:max_queue:max_wait_ms") from None
+        limits[tool.strip()] = (limit, max_queue, max_wait_ms / 1000)
+    return limits
+
+
+class AdmissionController:
+    def __init__(self, limits: dict, clock=time.monotonic):
+        self._clock = clock
+        self.gates = {
+            tool: ToolGate(limit, max_queue, max_wait)
+            for tool, (limit, max_queue, max_wait) in limits.items()
+        }
+
+    def guard(self, fn):
+        """Wrap an async tool so calls beyond its gate return an overloaded error payload.
+
+        Tools without a configured limit are returned unchanged.
+        """
+        gate = self.gates.get(fn.__name__)
+        if gate is None:
+            return fn
+        if not inspect.iscoroutinefunction(fn):
+            raise TypeError(f"admission limits apply to async tools; {fn.__name__} is synchronous")
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                await gate.acquire()
+            except Overloaded as e:
+                return json.dumps(e.payload())
+            started = self._clock()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                gate.observe(self._clock() - started)
+                gate.release()
+        return wrapper
+
+    def stats(self) -> dict:
+        return {tool: gate.stats() for tool, gate in sorted(self.gates.items())}
@@ -0,0 +1,203 @@
+"""Asynchronous, batched audit log of recommendations and template creations.
+
+Tools call AuditSink.record(), which only puts a tuple on a bounded
+in-memory queue; a background thread drains it in batches, turns each
+record into one JSON line and appends the batch to the current file in
+the audit directory (as one gzip member when compression is on, so the
+files read back with zcat). Fields the tool already has as JSON text (the
+finding and the response) are spliced into the line as they are, so
+neither the tool nor the writer decodes them.
+
+Files are named audit-<pid>-<UTC time>-<seq>.jsonl[.gz] so worker
+processes never share one. A file is closed once it reaches
+max_file_bytes on disk. Whenever a process opens a new file it prunes the
+directory to its newest max_files audit files, whichever process wrote
+them, so files left by workers that have exited or restarted under a new
+pid are removed too.
+
+When the queue is full, policy "drop" discards the new record at once and
+"block" waits up to block_timeout for room first; either way a record that
+could not be queued is counted in `dropped`. "block" can hold up the event
+loop for that long, so keep the timeout short.
+"""
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("drop", "block")
+
+_STOP = object()
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0  # removed from under us; appending recreates it
+
+
+class AuditSink:
+    def __init__(self, directory: str = None, max_queue: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 1.0, max_file_bytes: int = 64 * 1024 * 1024, max_files: int = 20,
+                 compress: bool = True, policy: str = "drop", block_timeout: float = 0.05, clock=time.time):
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid audit policy {policy!r}; expected one of {', '.join(POLICIES)}")
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.compress = compress
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._clock = clock
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._wake = threading.Event()
+        self._closed = False
+        self._path = None
+        self._seq = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.write_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def record(self, event: str, fields: dict, json_fields: dict = None) -> bool:
+        """Queue one audit record; False if it was dropped. json_fields values must be valid JSON text."""
+        if not self.enabled or self._closed:
+            return False
+        if self._thread is None:
+            self._start()
+        item = (self._clock(), event, fields, json_fields)
+        try:
+            if self.policy == "block":
+                self._queue.put(item, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(item)
+            if self._queue.qsize() >= self.batch_size:
+                self._wake.set()
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _start(self):
+        # Started on first use, so a process that never records (like a multi-worker parent) has no thread.
+        with self._lock:
+            if self._thread is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            # Let records gather for up to flush_interval (less once a full batch is waiting), so the
+            # writer wakes once per batch rather than once per record.
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = _STOP in items
+            items = [item for item in items if item is not _STOP]
+            for i in range(0, len(items), self.batch_size):
+                self._write(items[i:i + self.batch_size])
+            if stop:
+                return
+
+    @staticmethod
+    def _line(ts, event, fields, json_fields) -> str:
+        line = json.dumps({"ts": round(ts, 6), "event": event, **fields}, separators=(",", ":"), default=str)
+        if not json_fields:
+            return line
+        # JSON text is spliced in rather than decoded and re-encoded. Newlines in valid JSON only occur as
+        # whitespace between tokens (inside strings they are escaped), so dropping them keeps one record per line.
+        extra = ",".join(f"{json.dumps(key)}:{text.replace(chr(10), '')}" for key, text in json_fields.items())
+        return f"{line[:-1]},{extra}}}"
+
+    def _write(self, batch):
+        data = "".join(self._line(*item) + "\n" for item in batch).encode()
+        if self.compress:
+            data = gzip.compress(data, compresslevel=1)
+        try:
+            path = self._current_path()
+            with open(path, "ab") as f:
+                f.write(data)
+        except OSError:
+            logger.warning("Could not write %d audit records", len(batch), exc_info=True)
+            with self._lock:
+                self.write_errors += 1
+                self.dropped += len(batch)
+            return
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+
+    def _current_path(self) -> str:
+        if self._path is None or _size(self._path) >= self.max_file_bytes:
+            self._seq += 1
+            stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(self._clock()))
+            suffix = ".jsonl.gz" if self.compress else ".jsonl"
+            self._path = os.path.join(self.directory, f"audit-{os.getpid()}-{stamp}-{self._seq:04d}{suffix}")
+            self._prune()
+        return self._path
+
+    def files(self) -> list:
+        """Every audit file in the directory, from all processes, least recently written first."""
+        if not self.enabled or not os.path.isdir(self.directory):
+            return []
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith("audit-"):
+                try:
+                    found.append((entry.stat().st_mtime_ns, entry.name, entry.path))
+                except OSError:
+                    pass  # pruned by another worker meanwhile
+        return [path for _, _, path in sorted(found)]
+
+    def _prune(self):
+        # The file about to be opened counts towards max_files.
+        files = self.files()
+        for path in files[: max(0, len(files) - self.max_files + 1)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self, timeout: float = 5.0):
+        """Stop accepting records and wait up to timeout for the queue to be written."""
+        self._closed = True
+        if self._thread is not None:
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                return
+            self._wake.set()
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "policy": self.policy,
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "write_errors": self.write_errors,
+            }
@@ -0,0 +1,112 @@
+"""Process-wide cache of boto3 clients.
+
+Creating a boto3 client resolves credentials, loads service models and sets
+up a connection pool, which costs tens of milliseconds. Clients are
+thread-safe once built, so the tools share one per (service, region,
+credentials identity) instead of building a new one per call.
+"""
+import os
+import threading
+import time
+
+
+class _FixedCredentials:
+    """Credential provider handing a session one existing botocore Credentials object."""
+
+    METHOD = "fis-mcp-cached"
+
+    def __init__(self, credentials):
+        self._credentials = credentials
+
+    def load(self):
+        return self._credentials
+
+
+class ClientCache:
+    def __init__(self, max_pool_connections: int = 10, endpoint_urls: dict = None, on_build=None):
+        self.max_pool_connections = max_pool_connections
+        # Called with each new client, e.g. to register event hooks.
+        self._on_build = on_build
+        # Per-service endpoint overrides, e.g. {"fis": "http://127.0.0.1:4599"} for a local fake.
+        self.endpoint_urls = dict(endpoint_urls or {})
+        self._clients = {}
+        self._lock = threading.Lock()
+        self.constructions = 0
+        self.construction_seconds_total = 0.0
+        self.construction_seconds_max = 0.0
+        self.construction_seconds_last = 0.0
+
+    def get(self, service: str, region: str = None, credentials=None, identity: str = None):
+        """Return a cached client, building it on first use.
+
+        credentials, when given, is an STS-style dict (AccessKeyId, SecretAccessKey,
+        SessionToken), whose AccessKeyId is the identity part of the cache key, or a
+        botocore Credentials object such as RefreshableCredentials, which needs an
+        explicit identity and keeps one client valid across refreshes.
+        Without it the client uses the default credential chain.
+        """
+        region = region or os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION")
+        if identity is None:
+            identity = credentials["AccessKeyId"] if credentials else "default"
+        key = (service, region, identity)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._build(service, region, credentials)
+                self._clients[key] = client
+        return client
+
+    def _build(self, service, region, credentials):
+        started = time.perf_counter()
+        import boto3
+        from botocore.config import Config
+
+        # Sessions are not thread-safe, so each client gets its own (built under _lock).
+        if credentials is not None and not isinstance(credentials, dict):
+            import botocore.session
+            from botocore.credentials import CredentialResolver
+
+            core = botocore.session.Session()
+            core.register_component("credential_provider", CredentialResolver([_FixedCredentials(credentials)]))
+            session = boto3.session.Session(botocore_session=core)
+        elif credentials:
+            session = boto3.session.Session(
+                aws_access_key_id=credentials["AccessKeyId"],
+                aws_secret_access_key=credentials["SecretAccessKey"],
+                aws_session_token=credentials.get("SessionToken"),
+            )
+        else:
+            session = boto3.session.Session()
+        client = session.client(
+            service,
+            region_name=region,
+            endpoint_url=self.endpoint_urls.get(service),
+            config=Config(max_pool_connections=self.max_pool_connections),
+        )
+        if self._on_build:
+            self._on_build(client)
+        elapsed = time.perf_counter() - started
+        self.constructions += 1
+        self.construction_seconds_total += elapsed
+        self.construction_seconds_last = elapsed
+        self.construction_seconds_max = max(self.construction_seconds_max, elapsed)
+        return client
+
+    def evict(self, identity: str):
+        """Drop every client built for a credentials identity (e.g. once its account is no longer cached)."""
+        with self._lock:
+            for key in [k for k in self._clients if k[2] == identity]:
+                del self._clients[key]
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "max_pool_connections": self.max_pool_connections,
+            "constructions": self.constructions,
+            "construction_seconds_total": round(self.construction_seconds_total, 6),
+            "construction_seconds_max": round(self.construction_seconds_max, 6),
+            "construction_seconds_last": round(self.construction_seconds_last, 6),
+        }
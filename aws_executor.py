@@ -0,0 +1,64 @@
+"""Dedicated thread pool for blocking AWS calls made from async tools.
+
+boto3 is synchronous, and FastMCP runs synchronous tools directly on the
+event loop, so an AWS round-trip inside a tool stalls every other request on
+the server. Async tools hand their AWS work to this executor instead. The
+pool size caps how many AWS calls run at once; extra calls wait in the pool's
+queue, whose depth is tracked for monitoring. Calls run in a copy of the
+caller's context, so contextvars such as the current trace span carry over.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AwsCallExecutor:
+    def __init__(self, max_concurrency: int = 16):
+        self.max_concurrency = max_concurrency
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="aws-call")
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self.submitted - self.started
+
+    @property
+    def in_flight(self) -> int:
+        return self.started - self.completed
+
+    def _call(self, fn):
+        with self._lock:
+            self.started += 1
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self.completed += 1
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the pool and await its result without blocking the loop."""
+        with self._lock:
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        return await loop.run_in_executor(self._pool, self._call, call)
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting calls; with wait, block until calls already submitted have finished."""
+        self._pool.shutdown(wait=wait)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+        }
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Cold-start budget check for server.py.
+
+Measures, over several fresh interpreters:
+  - import time of server.py, with the slowest imported packages (python -X importtime)
+  - time from process launch to the first successful MCP request (tools/list)
+and exits non-zero if the median of either exceeds its budget, so it can gate
+CI. It also fails if importing server.py pulls in a module that should only
+load on first use (boto3, botocore, numpy).
+
+Run: python benchmarks/bench_cold_start.py [--runs 3] [--import-budget-ms 1500]
+         [--first-request-budget-ms 3000] [--top 10]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+LAZY_MODULES = ("boto3", "botocore", "numpy")
+
+
+def import_profile():
+    """(total ms, {top-level package: cumulative ms}, lazy modules that were imported)"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import server"],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    packages, pending, total, eager = {}, {}, 0.0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        ms = int(cumulative) / 1000
+        if module.split(".")[0] in LAZY_MODULES:
+            eager.add(module.split(".")[0])
+        # Children are reported before their parent, so server's direct imports are the
+        # depth-1 entries since the previous top-level one (interpreter start-up).
+        if depth == 1:
+            top = module.split(".")[0]
+            pending[top] = pending.get(top, 0.0) + ms
+        elif depth == 0:
+            if module == "server":
+                total, packages = ms, pending
+            pending = {}
+    return total, packages, eager
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_request_ms(timeout=30.0):
+    port = free_port()
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/list", "params": {}}).encode()
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "server.py"], cwd=ROOT, env={**os.environ, "MCP_PORT": str(port)},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            request = urllib.request.Request(f"http://127.0.0.1:{port}/mcp", data=body, headers={
+                "Content-Type": "application/json", "Accept": "application/json, text/event-stream",
+            })
+            try:
+                with urllib.request.urlopen(request, timeout=5) as resp:
+                    resp.read()
+                    return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"server did not answer within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--import-budget-ms", type=float, default=1500)
+    parser.add_argument("--first-request-budget-ms", type=float, default=3000)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    profiles = [import_profile() for _ in range(args.runs)]
+    import_ms = statistics.median(p[0] for p in profiles)
+    packages = profiles[-1][1]
+    eager = set().union(*(p[2] for p in profiles))
+    first_ms = statistics.median(first_request_ms() for _ in range(args.runs))
+
+    print(f"import server.py: {import_ms:8.1f} ms (budget {args.import_budget_ms:.0f})")
+    for name, ms in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {name:<30} {ms:8.1f} ms")
+    print(f"first request:    {first_ms:8.1f} ms (budget {args.first_request_budget_ms:.0f})")
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append("import time over budget")
+    if first_ms > args.first_request_budget_ms:
+        failures.append("time to first request over budget")
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(sorted(eager))}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+create_fis_template throughput and latency against a local fake FIS.
+
+Starts fake_fis.FakeFisServer in-process, points the server's FIS client at
+it, and drives the create_fis_template tool at each concurrency level. Every
+request targets a distinct tag value so each one really creates a template;
+--reuse sends one identical request instead to measure the idempotent path.
+
+Run: python benchmarks/bench_create_template.py [--concurrency 1,4,16,64] [--requests 200]
+         [--latency-ms 30] [--jitter-ms 20] [--throttle-rate 0] [--max-rps N] [--reuse]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from fake_fis import FakeFisServer  # noqa: E402
+
+RECOMMENDATION = {"action": "aws:ec2:stop-instances", "duration": "PT5M", "description": "Benchmark stop instances"}
+
+
+def target(i):
+    return {
+        "roleArn": "arn:aws:iam::123456789012:role/FISRole",
+        "stopConditionArn": "arn:aws:cloudwatch:us-east-1:123456789012:alarm:bench-alarm",
+        "tags": {"bench": f"run-{i}"},
+    }
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def drive(server, concurrency, requests, offset, reuse):
+    slots = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(i):
+        nonlocal errors
+        async with slots:
+            started = time.perf_counter()
+            result = json.loads(await server.create_fis_template(RECOMMENDATION, target(0 if reuse else offset + i)))
+            latencies.append(time.perf_counter() - started)
+            errors += "error" in result
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=int, default=None)
+    parser.add_argument("--reuse", action="store_true", help="send one identical request to measure template reuse")
+    args = parser.parse_args()
+
+    fake = FakeFisServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                         throttle_rate=args.throttle_rate, max_rps=args.max_rps, seed=42).start()
+    os.environ["FIS_ENDPOINT_URL"] = fake.endpoint_url
+    for name, value in (("AWS_ACCESS_KEY_ID", "bench"), ("AWS_SECRET_ACCESS_KEY", "bench"),
+                        ("AWS_DEFAULT_REGION", "us-east-1")):
+        os.environ.setdefault(name, value)
+    import server
+
+    print(f"fake FIS at {fake.endpoint_url}: latency {args.latency_ms}+{args.jitter_ms}ms, "
+          f"throttle rate {args.throttle_rate}, max rps {args.max_rps}, executor {server.AWS_EXECUTOR.max_concurrency}")
+    print(f"{'concurrency':>11}  {'req/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'errors':>6}")
+    offset = 0
+    try:
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            elapsed, latencies, errors = asyncio.run(drive(server, concurrency, args.requests, offset, args.reuse))
+            offset += args.requests
+            print(f"{concurrency:>11}  {args.requests / elapsed:>8.1f}  "
+                  f"{statistics.median(latencies) * 1e3:>8.1f}  {percentile(latencies, 95) * 1e3:>8.1f}  "
+                  f"{percentile(latencies, 99) * 1e3:>8.1f}  {errors:>6}")
+    finally:
+        fake.stop()
+    print(f"fake FIS: {fake.stats()}; template index: {server.TEMPLATE_INDEX.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the recommendation and validation hot paths.
+
+Calls recommend_fis_experiments, _validate_duration, the roleArn and
+stopConditionArn patterns and _build_template (the validation and
+template-building part of create_fis_template) directly, without HTTP, at
+small, median and maximum (MAX_INPUT_SIZE) input sizes. Each case reports
+ops/sec and, under tracemalloc, the peak bytes allocated during one call
+and the bytes still held after it.
+
+recommend_fis_experiments is measured with the result cache disabled, plus
+one cached case, so a cache hit does not hide matching and rendering cost.
+
+Baselines live in benchmarks/hot_paths_baseline.json. --check compares a
+run with them and exits non-zero when a case is slower or allocates more
+than the tolerances allow; --save rewrites them. ops/sec depends on the
+machine and is noisy on shared hosts, so the default ops tolerance only
+catches large slowdowns; refresh the baseline on the machine you compare
+on before trusting a smaller one. Allocation figures are stable across
+machines running the same Python version.
+
+Run: python benchmarks/bench_hot_paths.py [--cases recommend,role_arn] [--min-time 0.2]
+         [--check] [--save] [--ops-tolerance 0.5] [--alloc-tolerance 0.10]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+import server  # noqa: E402
+from cache import ResultCache  # noqa: E402
+
+BASELINE = os.path.join(HERE, "hot_paths_baseline.json")
+MAX = server.MAX_INPUT_SIZE
+ACCOUNT = "123456789012"
+
+
+def _finding(nbytes):
+    """A finding that serializes to just under nbytes and mentions several catalog keywords.
+
+    The padding goes in description, a scanned field, so larger findings cost the matcher more text.
+    """
+    finding = {
+        "id": "finding-001",
+        "type": "PERFORMANCE_ISSUE",
+        "severity": "HIGH",
+        "summary": "High network latency and cpu saturation on the api tier",
+    }
+    filler = "Database connection pool exhausted while lambda cold starts throttle requests. "
+    finding["description"] = (filler * (nbytes // len(filler) + 1))[: max(0, nbytes - len(json.dumps(finding)) - 16)]
+    return finding
+
+
+def _target(tag_count, name_len):
+    return {
+        "roleArn": f"arn:aws:iam::{ACCOUNT}:role/{'r' * name_len}",
+        "stopConditionArn": f"arn:aws:cloudwatch:us-east-1:{ACCOUNT}:alarm:{'a' * name_len}",
+        "selectionMode": "PERCENT(25)",
+        "tags": {f"tag{i:03d}": f"value-{i:03d}" for i in range(tag_count)},
+    }
+
+
+def _max_target():
+    """The largest target that still fits in MAX_INPUT_SIZE once serialized."""
+    target = _target(1, 40)
+    i = 0
+    while len(json.dumps(target)) < MAX - 40:
+        target["tags"][f"tag{i:03d}"] = "x" * 32
+        i += 1
+    return target
+
+
+RECOMMENDATION = {"action": "aws:ec2:stop-instances", "duration": "PT30M", "description": "Stop instances to test recovery"}
+
+
+def _recommend(finding):
+    return lambda: server.recommend_fis_experiments(finding)
+
+
+def _build(target):
+    allowed = server.CATALOG_STORE.current().allowed_actions
+    return lambda: server._build_template(RECOMMENDATION, target, allowed)
+
+
+def _match(pattern, value):
+    return lambda: pattern.match(value)
+
+
+def build_cases():
+    """(group, name, input_bytes, fn); each fn is ready to call repeatedly."""
+    role = server.ROLE_ARN_PATTERN
+    stop = server.STOP_CONDITION_ARN_PATTERN
+    findings = {"small": _finding(200), "median": _finding(2048), "max": _finding(MAX - 32)}
+    targets = {"small": _target(1, 12), "median": _target(10, 32), "max": _max_target()}
+    # Longer digit runs than the interpreter's int conversion limit fail with ValueError instead.
+    digits = min(MAX - 3, getattr(sys, "get_int_max_str_digits", lambda: MAX)())
+    durations = {"small": "PT5M", "median": "PT45M", "max": "PT" + "9" * digits + "M"}
+    arn_names = {"small": 8, "median": 64, "max": MAX - 64}
+
+    cases = []
+    for size, finding in findings.items():
+        cases.append(("recommend", size, len(json.dumps(finding)), _recommend(finding)))
+    cases.append(("recommend", "median-cached", len(json.dumps(findings["median"])), _recommend(findings["median"])))
+    for size, duration in durations.items():
+        cases.append(("duration", size, len(duration), lambda d=duration: server._validate_duration(d)))
+    cases.append(("duration", "invalid-max", MAX, lambda d="P" * MAX: server._validate_duration(d)))
+    for size, n in arn_names.items():
+        role_arn = f"arn:aws:iam::{ACCOUNT}:role/{'r' * n}"
+        stop_arn = f"arn:aws:cloudwatch:us-east-1:{ACCOUNT}:alarm:{'a' * n}"
+        cases.append(("role_arn", size, len(role_arn), _match(role, role_arn)))
+        cases.append(("stop_arn", size, len(stop_arn), _match(stop, stop_arn)))
+    # A name that fails on its last character makes the pattern scan all of it before rejecting.
+    cases.append(("role_arn", "invalid-max", MAX, _match(role, f"arn:aws:iam::{ACCOUNT}:role/{'r' * (MAX - 32)}!")))
+    for size, target in targets.items():
+        cases.append(("build_template", size, len(json.dumps(target)), _build(target)))
+    return cases
+
+
+def ops_per_sec(fn, min_time):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(number, int(number * min_time / 0.2))
+    return number / min(timer.repeat(repeat=5, number=number))
+
+
+def allocations(fn, calls=20):
+    """(peak bytes allocated during one call, bytes still held per call afterwards)."""
+    fn()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        peak = 0
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            fn()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+        retained = (tracemalloc.get_traced_memory()[0] - base) // calls
+    finally:
+        tracemalloc.stop()
+    return peak, max(0, retained)
+
+
+def run(groups, min_time):
+    results = {}
+    for group, name, nbytes, fn in build_cases():
+        if groups and group not in groups:
+            continue
+        cached = name.endswith("-cached")
+        server.RESULT_CACHE = ResultCache(max_entries=1024 if cached else 0)
+        rate = ops_per_sec(fn, min_time)
+        peak, retained = allocations(fn)
+        results[f"{group}/{name}"] = {
+            "input_bytes": nbytes,
+            "ops_per_sec": round(rate, 1),
+            "alloc_peak_bytes": peak,
+            "alloc_retained_bytes": retained,
+        }
+    return results
+
+
+def compare(results, baseline, ops_tolerance, alloc_tolerance):
+    """Lines describing each case that regressed against the baseline."""
+    regressions = []
+    for case, now in results.items():
+        then = baseline.get(case)
+        if then is None:
+            continue
+        if now["ops_per_sec"] < then["ops_per_sec"] * (1 - ops_tolerance):
+            regressions.append(f"{case}: {now['ops_per_sec']:.0f} ops/s, baseline {then['ops_per_sec']:.0f}")
+        # A few hundred bytes of slack keeps tiny cases from flapping on interpreter noise.
+        limit = then["alloc_peak_bytes"] * (1 + alloc_tolerance) + 512
+        if now["alloc_peak_bytes"] > limit:
+            regressions.append(f"{case}: peak {now['alloc_peak_bytes']} B, baseline {then['alloc_peak_bytes']} B")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", default="", help="comma-separated groups: recommend,duration,role_arn,stop_arn,build_template")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing repeat")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--check", action="store_true", help="exit 1 if any case regressed against the baseline")
+    parser.add_argument("--save", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--ops-tolerance", type=float, default=0.5, help="allowed fractional ops/sec drop")
+    parser.add_argument("--alloc-tolerance", type=float, default=0.10, help="allowed fractional peak-allocation growth")
+    args = parser.parse_args()
+
+    results = run({g for g in args.cases.split(",") if g}, args.min_time)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["cases"]
+
+    print(f"{'case':<30} {'bytes':>6} {'ops/s':>12} {'vs base':>8} {'peak B':>8} {'held B':>7}")
+    for case, r in results.items():
+        then = baseline.get(case)
+        delta = f"{(r['ops_per_sec'] / then['ops_per_sec'] - 1) * 100:+7.1f}%" if then else ""
+        print(f"{case:<30} {r['input_bytes']:>6} {r['ops_per_sec']:>12,.0f} {delta:>8} "
+              f"{r['alloc_peak_bytes']:>8} {r['alloc_retained_bytes']:>7}")
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cases": {**baseline, **results},
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.check:
+        regressions = compare(results, baseline, args.ops_tolerance, args.alloc_tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
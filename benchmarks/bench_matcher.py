@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Per-call latency of keyword matching as the finding catalog grows.
+
+Compares the original substring scan (`k in text` for every key) with the
+compiled KeywordMatcher used by recommend_fis_experiments.
+
+Run: python benchmarks/bench_matcher.py [--sizes 5,10,100,1000] [--repeat 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from matcher import KeywordMatcher  # noqa: E402
+
+BASE_KEYWORDS = ["network", "latency", "database", "cpu", "lambda"]
+
+FINDINGS = {
+    "typical": {
+        "id": "finding-001",
+        "summary": "High network latency between services causing request timeouts",
+        "type": "NETWORK_ISSUE",
+    },
+    "max-size": {
+        "id": "finding-002",
+        "summary": ("Database connection pool exhausted after cpu saturation on api tier. " * 140)[:10000],
+        "type": "DATABASE_ISSUE",
+    },
+}
+
+
+def build_catalog(size):
+    """Real keywords first, then synthetic one- and two-word keywords."""
+    keywords = list(BASE_KEYWORDS[:size])
+    i = 0
+    while len(keywords) < size:
+        keywords.append(f"svc{i:04d} fault" if i % 4 == 0 else f"kw{i:04d}")
+        i += 1
+    return keywords
+
+
+def bench(sizes, repeat):
+    rows = []
+    for size in sizes:
+        keywords = build_catalog(size)
+        matcher = KeywordMatcher((k, k) for k in keywords)
+        for name, finding in FINDINGS.items():
+            raw = json.dumps(finding)
+            text = raw.lower()
+            legacy = timeit.timeit(lambda: [k for k in keywords if k in text], number=repeat)
+            compiled = timeit.timeit(lambda: matcher.match(raw), number=repeat)
+            rows.append((size, name, len(raw), legacy / repeat * 1e6, compiled / repeat * 1e6))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="5,10,50,100,500,1000")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    print(f"{'keywords':>8}  {'finding':<9} {'bytes':>6}  {'substring us':>12}  {'matcher us':>10}")
+    for size, name, nbytes, legacy_us, compiled_us in bench(sizes, args.repeat):
+        print(f"{size:>8}  {name:<9} {nbytes:>6}  {legacy_us:>12.2f}  {compiled_us:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Batch TF-IDF ranking latency against synthetic catalogs.
+
+Scores a batch of findings against catalogs of growing size with one
+TfidfRanker.scores() call per batch, and compares it with scoring the same
+findings one at a time.
+
+Run: python benchmarks/bench_ranking.py [--sizes 5,100,1000] [--batch 100] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from catalog import compile_catalog  # noqa: E402
+from matcher import tokenize  # noqa: E402
+from ranking import TfidfRanker  # noqa: E402
+
+WORDS = ("network latency database cpu lambda memory disk timeout throttle failover replica "
+         "cache queue stream container pod node instance volume region zone endpoint").split()
+
+
+def build_catalog(size, rng):
+    actions = ["aws:ec2:stop-instances", "aws:network:disrupt-connectivity", "aws:rds:reboot-db-instances"]
+    mappings = {}
+    for i in range(size):
+        words = rng.sample(WORDS, 4)
+        mappings[f"kw{i:04d}"] = {
+            "action": actions[i % len(actions)],
+            "duration": "PT5M",
+            "description": f"Test {' '.join(words)} resilience {i}",
+            "keywords": [f"{words[0]} {words[1]}"],
+        }
+    return compile_catalog(mappings, actions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="5,100,1000")
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    queries = [tokenize(" ".join(rng.choices(WORDS, k=12))) for _ in range(args.batch)]
+    print(f"{'entries':>7}  {'build ms':>8}  {'batch ms':>8}  {'per-finding loop ms':>19}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        catalog = build_catalog(size, rng)
+        build = timeit.timeit(lambda: TfidfRanker(catalog), number=1)
+        ranker = TfidfRanker(catalog)
+        batch = timeit.timeit(lambda: ranker.scores(queries), number=args.repeat) / args.repeat
+        loop = timeit.timeit(lambda: [ranker.scores([q]) for q in queries], number=args.repeat) / args.repeat
+        print(f"{size:>7}  {build * 1e3:>8.2f}  {batch * 1e3:>8.2f}  {loop * 1e3:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Throughput scaling of server.py across worker processes.
+
+For each worker count, starts `python server.py --workers N` on a free port
+and drives recommend_fis_experiments calls over streamable HTTP from several
+client processes for a fixed duration, then reports requests/sec and
+p50/p99 latency. Findings carry a unique id so every call does the matching
+and serialization work instead of hitting the result cache.
+
+Scaling is bounded by the machine's cores (the clients share them too); on a
+single-core host every worker count performs about the same.
+
+Run: python benchmarks/bench_workers.py [--workers 1,2,4,8] [--clients 4] [--threads 8] [--seconds 10]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+FINDINGS = [
+    {"type": "network", "summary": "High network latency between services", "description": "p99 latency spikes"},
+    {"type": "database", "summary": "RDS failover not tested", "description": "Single-AZ database instance"},
+    {"type": "compute", "summary": "CPU saturation on web tier", "description": "Autoscaling lags under load"},
+    {"type": "lambda", "summary": "Lambda timeout errors", "description": "Downstream dependency slow"},
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def call(port, payload):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/mcp", data=json.dumps(payload).encode(), headers={
+        "Content-Type": "application/json", "Accept": "application/json, text/event-stream",
+    })
+    with urllib.request.urlopen(request, timeout=30) as resp:
+        return resp.read()
+
+
+def wait_ready(port, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            call(port, {"jsonrpc": "2.0", "id": 0, "method": "tools/list", "params": {}})
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def client(port, threads, seconds, seed, results):
+    """One client process: `threads` closed-loop callers for `seconds`; puts (latencies, errors) on results."""
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def loop(worker):
+        nonlocal errors
+        i = 0
+        while time.monotonic() < deadline:
+            finding = {**FINDINGS[i % len(FINDINGS)], "id": f"{seed}-{worker}-{i}"}
+            payload = {"jsonrpc": "2.0", "id": i, "method": "tools/call",
+                       "params": {"name": "recommend_fis_experiments", "arguments": {"finding": finding}}}
+            started = time.perf_counter()
+            try:
+                call(port, payload)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+            except OSError:
+                with lock:
+                    errors += 1
+            i += 1
+
+    pool = [threading.Thread(target=loop, args=(w,)) for w in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    results.put((latencies, errors))
+
+
+def run(workers, args):
+    port = free_port()
+    env = {**os.environ, "MCP_PORT": str(port), "FIS_PREWARM": "0"}
+    server = subprocess.Popen([sys.executable, "server.py", "--workers", str(workers)], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(port)
+        results = multiprocessing.Queue()
+        clients = [multiprocessing.Process(target=client, args=(port, args.threads, args.seconds, c, results))
+                   for c in range(args.clients)]
+        for p in clients:
+            p.start()
+        latencies, errors = [], 0
+        for _ in clients:
+            lat, err = results.get()
+            latencies += lat
+            errors += err
+        for p in clients:
+            p.join()
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] if latencies else 0.0
+    p50 = statistics.median(latencies) if latencies else 0.0
+    return len(latencies) / args.seconds, p50, p99, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--clients", type=int, default=4, help="client processes")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent callers per client process")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.clients}x{args.threads} concurrent callers, {args.seconds:.0f}s per run")
+    print(f"{'workers':>7}  {'req/s':>8}  {'p50 ms':>8}  {'p99 ms':>8}  {'errors':>6}")
+    baseline = None
+    for workers in (int(w) for w in args.workers.split(",")):
+        rate, p50, p99, errors = run(workers, args)
+        baseline = baseline or rate
+        print(f"{workers:>7}  {rate:>8.1f}  {p50 * 1e3:>8.1f}  {p99 * 1e3:>8.1f}  {errors:>6}"
+              f"   x{rate / baseline if baseline else 0:.2f}")
+
+
+if __name__ == "__main__":
+    main()
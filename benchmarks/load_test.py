@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Concurrent MCP load test against a running server.
+
+Opens K MCP ClientSessions over streamable HTTP and replays a weighted
+corpus of tool calls (benchmarks/load_corpus.json by default) at a target
+aggregate rate. Calls are scheduled open-loop, so latency is measured from
+each call's scheduled send time and includes any wait for a free session;
+a server that falls behind shows it as growing latency instead of silently
+lowering the offered load. --rate 0 runs closed-loop instead (every session
+sends its next call as soon as the previous one returns).
+
+Reports throughput, latency percentiles and error rates overall and per
+tool, and writes them as JSON (--output) for diffing between releases.
+Error classes match the server's /metrics labels.
+
+The default corpus includes create_* calls; point the server at fake_fis.py
+(FIS_ENDPOINT_URL) unless you mean to create real templates, or pass
+--tools recommend_fis_experiments,recommend_fis_experiments_batch.
+
+Run: python benchmarks/load_test.py [--url http://localhost:8000/mcp] [--sessions 8] [--rate 50]
+         [--duration 30] [--corpus FILE] [--tools a,b] [--header 'Authorization=Bearer ...'] [--output report.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from metrics import error_class  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(HERE, "load_corpus.json")
+
+
+def load_corpus(path, tools=None):
+    with open(path, encoding="utf-8") as f:
+        calls = json.load(f)["calls"]
+    if tools:
+        calls = [c for c in calls if c["tool"] in tools]
+    if not calls:
+        raise SystemExit("corpus has no calls for the selected tools")
+    return calls
+
+
+def classify(result) -> str:
+    """'ok', or the error class of a failed call."""
+    if result.isError:
+        return "tool_error"
+    try:
+        payload = json.loads(result.content[0].text)
+    except (IndexError, AttributeError, ValueError):
+        return "unparseable_response"
+    if isinstance(payload, dict) and "error" in payload:
+        return error_class(str(payload["error"]))
+    return "ok"
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+
+def summarize(samples, elapsed):
+    """samples: [(outcome, latency_s, service_s)]"""
+    latencies = sorted(s[1] for s in samples)
+    service = sorted(s[2] for s in samples)
+    errors = {}
+    for outcome, _, _ in samples:
+        if outcome != "ok":
+            errors[outcome] = errors.get(outcome, 0) + 1
+    failed = sum(errors.values())
+    return {
+        "requests": len(samples),
+        "errors": failed,
+        "error_rate": round(failed / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {f"p{p}": round(percentile(latencies, p) * 1e3, 2) for p in (50, 90, 95, 99)}
+        | {"max": round(latencies[-1] * 1e3, 2) if latencies else 0.0,
+           "mean": round(sum(latencies) / len(latencies) * 1e3, 2) if latencies else 0.0},
+        "service_ms": {f"p{p}": round(percentile(service, p) * 1e3, 2) for p in (50, 99)},
+        "error_classes": dict(sorted(errors.items())),
+    }
+
+
+async def run_load(url, sessions, rate, duration, calls, headers=None, seed=0, timeout=60):
+    rng = random.Random(seed)
+    weights = [c.get("weight", 1) for c in calls]
+    loop = asyncio.get_running_loop()
+    jobs = asyncio.Queue()
+    samples = []
+    ready = 0
+    all_ready, go = asyncio.Event(), asyncio.Event()
+    deadline = None
+
+    def next_call():
+        return rng.choices(calls, weights)[0]
+
+    async def one(session, call, scheduled):
+        started = loop.time()
+        try:
+            outcome = classify(await session.call_tool(call["tool"], call["arguments"]))
+        except Exception as e:
+            outcome = f"exception_{type(e).__name__.lower()}"
+        done = loop.time()
+        samples.append((call["tool"], outcome, done - scheduled, done - started))
+
+    async def worker():
+        nonlocal ready
+        async with streamablehttp_client(url, headers or {}, timeout=timeout, terminate_on_close=False) as (r, w, _):
+            async with ClientSession(r, w) as session:
+                await session.initialize()
+                ready += 1
+                if ready == sessions:
+                    all_ready.set()
+                await go.wait()
+                if rate > 0:
+                    while (job := await jobs.get()) is not None:
+                        await one(session, *job)
+                else:
+                    while loop.time() < deadline:
+                        await one(session, next_call(), loop.time())
+
+    workers = [asyncio.create_task(worker()) for _ in range(sessions)]
+    await asyncio.wait_for(all_ready.wait(), timeout)
+    started = loop.time()
+    deadline = started + duration
+    go.set()
+    if rate > 0:
+        for i in range(int(rate * duration)):
+            scheduled = started + i / rate
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            jobs.put_nowait((next_call(), scheduled))
+        for _ in workers:
+            jobs.put_nowait(None)
+    await asyncio.gather(*workers)
+    return samples, loop.time() - started
+
+
+def build_report(samples, elapsed, config):
+    per_tool = {}
+    for tool, outcome, latency, service in samples:
+        per_tool.setdefault(tool, []).append((outcome, latency, service))
+    return {
+        "config": config,
+        "elapsed_s": round(elapsed, 2),
+        "summary": summarize([s[1:] for s in samples], elapsed),
+        "per_tool": {tool: summarize(rows, elapsed) for tool, rows in sorted(per_tool.items())},
+    }
+
+
+def print_report(report):
+    rows = [("all", report["summary"])] + list(report["per_tool"].items())
+    print(f"{'tool':<34} {'req':>6} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+    for name, s in rows:
+        lat = s["latency_ms"]
+        print(f"{name:<34} {s['requests']:>6} {s['throughput_rps']:>8.1f} {s['error_rate'] * 100:>6.2f} "
+              f"{lat['p50']:>8.1f} {lat['p95']:>8.1f} {lat['p99']:>8.1f} {lat['max']:>8.1f}")
+    for cls, n in report["summary"]["error_classes"].items():
+        print(f"  error {cls}: {n}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000/mcp")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=50.0, help="calls/sec across all sessions; 0 = closed loop")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--tools", default="", help="comma-separated tools to replay (default: all in corpus)")
+    parser.add_argument("--header", action="append", default=[], help="extra HTTP header as Name=value")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    tools = {t for t in args.tools.split(",") if t}
+    calls = load_corpus(args.corpus, tools)
+    headers = dict(h.split("=", 1) for h in args.header)
+    samples, elapsed = asyncio.run(run_load(args.url, args.sessions, args.rate, args.duration, calls, headers, args.seed))
+    config = {
+        "url": args.url, "sessions": args.sessions, "rate": args.rate, "duration_s": args.duration,
+        "corpus": os.path.basename(args.corpus), "tools": sorted(tools) or None, "seed": args.seed,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - elapsed)),
+    }
+    report = build_report(samples, elapsed, config)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Request body size limits enforced before the MCP layer parses anything.
+
+BodySizeLimits holds the limits and rejection counters, and
+BodySizeLimitMiddleware applies them to each request: it answers 413 for a
+request whose Content-Length exceeds max_bytes without reading the body,
+and counts the bytes of bodies sent without one (chunked transfer) as they
+arrive, stopping at the limit. The body it has read is then replayed to
+the app.
+
+Tools can have tighter limits than the whole server (tool_limits). They
+apply to the call's arguments re-encoded with json.dumps, the same
+measure the tools use for their own input limits, so whitespace in a
+pretty-printed request does not count against them. A body no larger than
+the smallest limit is passed on untouched; only a larger body is decoded
+to find which tool it calls. A call over its tool's limit is answered with that tool's usual error payload
+({"error": ..., "max_bytes": ...}) as a normal tool result, so clients see
+the same response as before, only without the MCP layer validating and
+dispatching the request first. Over the server-wide limit, the response is
+HTTP 413 with a JSON-RPC error (code -32600).
+"""
+import json
+import threading
+
+INVALID_REQUEST = -32600
+
+
+def _rejection(limit: int) -> bytes:
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "id": None,
+        "error": {"code": INVALID_REQUEST, "message": "Request body too large", "data": {"max_bytes": limit}},
+    }).encode()
+
+
+def _tool_error(request_id, error: str, limit: int) -> bytes:
+    text = json.dumps({"error": error, "max_bytes": limit})
+    # Shaped like FastMCP's result for a tool returning str, whose output schema is {"result": string}.
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "result": {
+            "content": [{"type": "text", "text": text}],
+            "structuredContent": {"result": text},
+            "isError": False,
+        },
+    }).encode()
+
+
+def parse_tool_limits(spec: str) -> dict:
+    """Parse "tool=max_bytes,..." into {tool: max_bytes}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            tool, value = item.split("=", 1)
+            limits[tool.strip()] = int(value)
+        except ValueError:
+            raise ValueError(f"Invalid tool size limit {item!r}; expected tool=max_bytes") from None
+    return limits
+
+
+class BodySizeLimits:
+    def __init__(self, max_bytes: int, tool_limits: dict = None, tool_errors: dict = None):
+        self.max_bytes = max_bytes
+        self.tool_limits = dict(tool_limits or {})
+        self.tool_errors = dict(tool_errors or {})
+        # Bodies up to this size are within every limit and are never decoded here.
+        self.smallest = min([max_bytes, *self.tool_limits.values()])
+        self._lock = threading.Lock()
+        self.rejected = {}
+
+    def count(self, reason: str):
+        with self._lock:
+            self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    def exceeded_tool_limit(self, body: bytes):
+        """(limit, tool, request id) of the first tool call in a JSON-RPC body whose arguments are over its limit."""
+        try:
+            message = json.loads(body)
+        except ValueError:
+            return None  # let the MCP layer report the parse error
+        for m in message if isinstance(message, list) else [message]:
+            if not isinstance(m, dict) or m.get("method") != "tools/call" or not isinstance(m.get("params"), dict):
+                continue
+            name = m["params"].get("name")
+            if not isinstance(name, str) or name not in self.tool_limits:
+                continue
+            limit = self.tool_limits[name]
+            if len(json.dumps(m["params"].get("arguments"))) > limit:
+                return limit, name, m.get("id")
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_bytes": self.max_bytes,
+                "tool_limits": dict(sorted(self.tool_limits.items())),
+                "rejected": dict(sorted(self.rejected.items())),
+            }
+
+
+class BodySizeLimitMiddleware:
+    """ASGI wrapper rejecting oversized request bodies with 413 before the app reads them."""
+
+    def __init__(self, app, limits: BodySizeLimits):
+        self.app = app
+        self.limits = limits
+
+    async def _respond(self, send, status: int, body: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") in ("GET", "HEAD", "OPTIONS", "DELETE"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        declared = headers.get(b"content-length")
+        limits = self.limits
+        if declared is not None and declared.isdigit() and int(declared) > limits.max_bytes:
+            limits.count("content_length")
+            await self._respond(send, 413, _rejection(limits.max_bytes))
+            return
+
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > limits.max_bytes:
+                limits.count("streamed")
+                await self._respond(send, 413, _rejection(limits.max_bytes))
+                return
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        found = limits.exceeded_tool_limit(body) if size > limits.smallest else None
+        if found:
+            limit, tool, request_id = found
+            limits.count("tool_limit")
+            error = limits.tool_errors.get(tool, "Input too large")
+            await self._respond(send, 200, _tool_error(request_id, error, limit))
+            return
+
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay, send)
@@ -0,0 +1,80 @@
+"""Bounded LRU + TTL cache for serialized tool responses."""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def content_key(namespace: str, body: str) -> str:
+    return hashlib.sha256(f"{namespace}\0{body}".encode()).hexdigest()
+
+
+def canonical_key(namespace: str, payload) -> str:
+    """Content hash of payload; equal dicts hash equal regardless of key order."""
+    return content_key(namespace, json.dumps(payload, sort_keys=True, separators=(",", ":")))
+
+
+class ResultCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds.
+
+    A max_entries of 0 disables the cache: get() always misses and put() is a no-op.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,220 @@
+"""Recommendation catalog: finding mappings plus the FIS action allowlist.
+
+A Catalog is an immutable snapshot compiled into everything the tools need
+(keyword matcher, response fragments, fingerprint for cache keys). The
+CatalogStore hands out the current snapshot and swaps in a new one when the
+catalog file changes; callers hold on to the snapshot they got, so a request
+in flight keeps using it even if a reload happens meanwhile.
+
+Catalog file format (JSON, or YAML when PyYAML is installed):
+
+    {
+      "version": "2026-10-18",
+      "allowed_actions": ["aws:ec2:stop-instances", ...],
+      "mappings": {
+        "cpu": {"action": "aws:ec2:stop-instances", "duration": "PT3M",
+                "description": "Test auto-scaling", "keywords": ["cpu spike"]}
+      }
+    }
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import NamedTuple
+
+from cache import canonical_key
+from matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+DURATION_PATTERN = re.compile(r"^PT\d+M$")
+
+
+class Catalog(NamedTuple):
+    version: str
+    mappings: dict
+    allowed_actions: frozenset
+    fingerprint: str
+    matcher: KeywordMatcher
+    # Per mapping key: the recommendation dict and its pre-serialized JSON forms.
+    records: dict
+    pretty_fragments: dict
+    compact_fragments: dict
+
+
+def compile_catalog(mappings: dict, allowed_actions, version: str = "builtin") -> Catalog:
+    """Validate mappings and compile them into a Catalog snapshot."""
+    if not isinstance(mappings, dict) or not mappings:
+        raise ValueError("catalog mappings must be a non-empty object")
+    allowed = frozenset(allowed_actions)
+    snapshot = {}
+    for key, value in mappings.items():
+        if not isinstance(value, dict):
+            raise ValueError(f"mapping {key!r} must be an object")
+        for field in ("action", "duration", "description"):
+            if not isinstance(value.get(field), str) or not value[field]:
+                raise ValueError(f"mapping {key!r} is missing {field}")
+        if value["action"] not in allowed:
+            raise ValueError(f"mapping {key!r} uses an action outside allowed_actions: {value['action']}")
+        if not DURATION_PATTERN.match(value["duration"]):
+            raise ValueError(f"mapping {key!r} has invalid duration {value['duration']!r}")
+        keywords = value.get("keywords", [])
+        if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+            raise ValueError(f"mapping {key!r} keywords must be a list of strings")
+        snapshot[key] = {**value, "keywords": list(keywords)} if keywords else dict(value)
+
+    matcher = KeywordMatcher(
+        (phrase, key) for key, value in snapshot.items() for phrase in [key, *value.get("keywords", [])]
+    )
+    records = {
+        k: {"action": v["action"], "duration": v["duration"], "description": v["description"]}
+        for k, v in snapshot.items()
+    }
+    # Pretty fragments are indented for their position inside the "recommendations" list.
+    pretty = {
+        k: "\n".join("    " + line for line in json.dumps(rec, indent=2).splitlines())
+        for k, rec in records.items()
+    }
+    compact = {k: json.dumps(rec, separators=(",", ":")) for k, rec in records.items()}
+    fingerprint = canonical_key("catalog", {"mappings": snapshot, "allowed_actions": sorted(allowed)})
+    return Catalog(str(version), snapshot, allowed, fingerprint, matcher, records, pretty, compact)
+
+
+def render_recommendations(catalog: Catalog, keys: list, compact: bool) -> str:
+    """Byte-for-byte what json.dumps of the response would produce, built from fragments."""
+    if compact:
+        body = ",".join(catalog.compact_fragments[k] for k in keys)
+        return f'{{"recommendations":[{body}],"count":{len(keys)}}}'
+    if not keys:
+        return '{\n  "recommendations": [],\n  "count": 0\n}'
+    body = ",\n".join(catalog.pretty_fragments[k] for k in keys)
+    return f'{{\n  "recommendations": [\n{body}\n  ],\n  "count": {len(keys)}\n}}'
+
+
+def load_catalog_file(path: str) -> Catalog:
+    with open(path, "r") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ValueError("YAML catalogs require PyYAML; install it or use a .json catalog") from e
+            try:
+                data = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"invalid YAML catalog: {e}") from e
+        else:
+            data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("catalog file must contain an object")
+    actions = data.get("allowed_actions")
+    if not isinstance(actions, list) or not all(isinstance(a, str) for a in actions):
+        raise ValueError("catalog allowed_actions must be a list of strings")
+    return compile_catalog(data.get("mappings"), actions, data.get("version", "unversioned"))
+
+
+class CatalogStore:
+    """Serves the current Catalog and hot-swaps it when the source changes.
+
+    With a path, the file's mtime and size are checked at most every
+    check_interval seconds and the file is recompiled when they change. A file
+    that fails to load or compile, for whatever reason, is logged and the
+    previous snapshot stays active.
+    Without a path, builtin() supplies (mappings, allowed_actions). Returning
+    different objects than last time is noticed on the next request; edits
+    made in place are compared against the compiled copy at most every
+    check_interval seconds. Either way a source that fails to compile is
+    retried no sooner than check_interval later.
+
+    Readers never take a lock: current() returns whatever snapshot reference
+    is installed. Only the thread performing a reload holds _reload_lock, and
+    other threads skip the reload instead of waiting for it.
+    """
+
+    def __init__(self, path: str = None, builtin=None, check_interval: float = 2.0, clock=time.monotonic):
+        if not path and builtin is None:
+            raise ValueError("CatalogStore needs a catalog path or a builtin source")
+        self.path = path
+        self._builtin = builtin
+        self.check_interval = check_interval
+        self._clock = clock
+        self._reload_lock = threading.Lock()
+        self._file_state = None
+        self._builtin_source = None
+        self._next_check = 0.0
+        self.reloads = 0
+        self.reload_errors = 0
+        if path:
+            self._file_state = self._stat()
+            self._catalog = load_catalog_file(path)
+            self._next_check = clock() + check_interval
+        else:
+            self._builtin_source = builtin()
+            self._catalog = compile_catalog(*self._builtin_source)
+            self._next_check = clock() + check_interval
+
+    def _stat(self):
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def current(self) -> Catalog:
+        catalog = self._catalog
+        if self.path:
+            if self._clock() >= self._next_check:
+                catalog = self._maybe_reload_file()
+        else:
+            mappings, actions = source = self._builtin()
+            previous = self._builtin_source
+            if mappings is not previous[0] or actions is not previous[1] or self._clock() >= self._next_check:
+                catalog = self._maybe_recompile_builtin(source)
+        return catalog
+
+    def _maybe_recompile_builtin(self, source) -> Catalog:
+        if not self._reload_lock.acquire(blocking=False):
+            return self._catalog
+        try:
+            self._next_check = self._clock() + self.check_interval
+            self._builtin_source = source
+            mappings, actions = source
+            try:
+                if self._catalog.mappings == mappings and self._catalog.allowed_actions == frozenset(actions):
+                    return self._catalog
+                catalog = compile_catalog(mappings, actions)
+            except Exception as e:
+                self.reload_errors += 1
+                logger.warning("Catalog recompile failed, keeping version %s: %s", self._catalog.version, e)
+                return self._catalog
+            if catalog.fingerprint != self._catalog.fingerprint:
+                self.reloads += 1
+            self._catalog = catalog
+            return catalog
+        finally:
+            self._reload_lock.release()
+
+    def _maybe_reload_file(self) -> Catalog:
+        if not self._reload_lock.acquire(blocking=False):
+            return self._catalog
+        try:
+            self._next_check = self._clock() + self.check_interval
+            try:
+                state = self._stat()
+                if state == self._file_state:
+                    return self._catalog
+                self._file_state = state
+                catalog = load_catalog_file(self.path)
+            except Exception as e:
+                # Not just OSError/ValueError: a reload must never take the tools down with it.
+                self.reload_errors += 1
+                logger.warning("Catalog reload from %s failed, keeping version %s: %s",
+                               self.path, self._catalog.version, e)
+                return self._catalog
+            if catalog.fingerprint != self._catalog.fingerprint:
+                self.reloads += 1
+                logger.info("Catalog reloaded from %s: version %s -> %s",
+                            self.path, self._catalog.version, catalog.version)
+                self._catalog = catalog
+            return self._catalog
+        finally:
+            self._reload_lock.release()
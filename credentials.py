@@ -0,0 +1,184 @@
+"""Cached cross-account credentials from STS AssumeRole.
+
+create_fis_template can create templates in the account that owns the
+template's roleArn by assuming a fixed-name role there. Credentials are kept
+per account (LRU, bounded) and a background thread re-assumes the role
+before they expire, so requests normally never wait on STS. Only the first
+request for an account, or one arriving after its credentials actually
+lapsed, calls STS inline. Accounts nobody asked for within idle_after are
+left to expire instead of being re-assumed forever.
+
+credentials() wraps an account's entry in botocore RefreshableCredentials,
+so one client per account keeps working across refreshes: botocore picks up
+the re-assumed keys from this cache instead of the server building a new
+client for every new AccessKeyId.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# botocore's RefreshableCredentials advisory refresh window (15 minutes).
+BOTOCORE_ADVISORY_REFRESH = 15 * 60
+
+
+class AssumeRoleCache:
+    def __init__(self, role_name: str, sts_client_factory, max_accounts: int = 32,
+                 refresh_ahead: float = 1200, check_interval: float = 30, duration_seconds: int = 3600,
+                 external_id: str = None, session_name: str = "fis-recommender-mcp",
+                 idle_after: float = 3600, on_evict=None, clock=time.time):
+        self.role_name = role_name
+        self._sts = sts_client_factory
+        self.max_accounts = max_accounts
+        # botocore asks RefreshableCredentials for new keys BOTOCORE_ADVISORY_REFRESH seconds before expiry;
+        # refreshing at least that early means the keys it gets then are already the re-assumed ones.
+        self.refresh_ahead = max(refresh_ahead, BOTOCORE_ADVISORY_REFRESH)
+        self.check_interval = check_interval
+        self.duration_seconds = duration_seconds
+        self.external_id = external_id
+        self.session_name = session_name
+        self.idle_after = idle_after
+        self._on_evict = on_evict
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._account_locks = {}
+        self._botocore = {}
+        self._last_used = {}
+        self._refresher = None
+        self._stop = threading.Event()
+        self.assumes = 0
+        self.inline_assumes = 0
+        self.refresh_errors = 0
+
+    def role_arn(self, account_id: str) -> str:
+        return f"arn:aws:iam::{account_id}:role/{self.role_name}"
+
+    def _assume(self, account_id: str) -> dict:
+        params = {
+            "RoleArn": self.role_arn(account_id),
+            "RoleSessionName": self.session_name,
+            "DurationSeconds": self.duration_seconds,
+        }
+        if self.external_id:
+            params["ExternalId"] = self.external_id
+        creds = self._sts().assume_role(**params)["Credentials"]
+        self.assumes += 1
+        return {
+            "AccessKeyId": creds["AccessKeyId"],
+            "SecretAccessKey": creds["SecretAccessKey"],
+            "SessionToken": creds["SessionToken"],
+            "expires_at": creds["Expiration"].timestamp(),
+        }
+
+    def _install(self, account_id: str, creds: dict, replace: bool = False):
+        """Cache creds for account_id. With replace, only if the account is still cached."""
+        evicted = []
+        with self._lock:
+            if replace and account_id not in self._entries:
+                # Evicted while the refresher was calling STS.
+                return
+            self._entries[account_id] = creds
+            self._entries.move_to_end(account_id)
+            while len(self._entries) > self.max_accounts:
+                old_account, _ = self._entries.popitem(last=False)
+                self._account_locks.pop(old_account, None)
+                self._botocore.pop(old_account, None)
+                self._last_used.pop(old_account, None)
+                evicted.append(old_account)
+        if self._on_evict:
+            for account in evicted:
+                self._on_evict(account)
+
+    def get(self, account_id: str) -> dict:
+        """Credentials for account_id, valid for at least another minute."""
+        self._ensure_refresher()
+        with self._lock:
+            self._last_used[account_id] = self._clock()
+            creds = self._entries.get(account_id)
+            if creds is not None and creds["expires_at"] - self._clock() > 60:
+                self._entries.move_to_end(account_id)
+                return creds
+            account_lock = self._account_locks.setdefault(account_id, threading.Lock())
+        with account_lock:
+            # Another request may have assumed the role while we waited.
+            creds = self._entries.get(account_id)
+            if creds is not None and creds["expires_at"] - self._clock() > 60:
+                return creds
+            creds = self._assume(account_id)
+            self.inline_assumes += 1
+            self._install(account_id, creds)
+            return creds
+
+    def _metadata(self, account_id: str) -> dict:
+        creds = self.get(account_id)
+        return {
+            "access_key": creds["AccessKeyId"],
+            "secret_key": creds["SecretAccessKey"],
+            "token": creds["SessionToken"],
+            "expiry_time": datetime.fromtimestamp(creds["expires_at"], tz=timezone.utc).isoformat(),
+        }
+
+    def credentials(self, account_id: str):
+        """botocore RefreshableCredentials for account_id that follow this cache's refreshes."""
+        with self._lock:
+            creds = self._botocore.get(account_id)
+            if creds is not None:
+                # botocore only calls back into get() near expiry, so count the use here.
+                self._last_used[account_id] = self._clock()
+                if account_id in self._entries:
+                    self._entries.move_to_end(account_id)
+                return creds
+        from botocore.credentials import RefreshableCredentials
+
+        creds = RefreshableCredentials.create_from_metadata(
+            self._metadata(account_id), lambda: self._metadata(account_id), "assume-role"
+        )
+        with self._lock:
+            return self._botocore.setdefault(account_id, creds)
+
+    def refresh_due(self):
+        """Re-assume every cached account used within idle_after whose credentials expire within refresh_ahead."""
+        now = self._clock()
+        with self._lock:
+            due = [
+                a for a, c in self._entries.items()
+                if c["expires_at"] - now <= self.refresh_ahead and now - self._last_used.get(a, 0) <= self.idle_after
+            ]
+        for account_id in due:
+            try:
+                self._install(account_id, self._assume(account_id), replace=True)
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.warning("Refreshing credentials for account %s failed: %s", account_id, e)
+
+    def _ensure_refresher(self):
+        if self._refresher is not None:
+            return
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, name="assume-role-refresh", daemon=True)
+                self._refresher.start()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.check_interval):
+            self.refresh_due()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        now = self._clock()
+        with self._lock:
+            remaining = [c["expires_at"] - now for c in self._entries.values()]
+        return {
+            "accounts": len(remaining),
+            "max_accounts": self.max_accounts,
+            "assumes": self.assumes,
+            "inline_assumes": self.inline_assumes,
+            "refresh_errors": self.refresh_errors,
+            "min_seconds_to_expiry": round(min(remaining), 1) if remaining else None,
+        }
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the AWS FIS experiment-template API.
+
+Speaks enough of FIS's REST-JSON protocol for boto3 to create, get, list and
+delete experiment templates against it, with optional latency and throttling
+injection. Point the server at it with FIS_ENDPOINT_URL (plus any dummy AWS
+credentials):
+
+    python fake_fis.py --port 4599 --latency-ms 40 --throttle-rate 0.05
+    FIS_ENDPOINT_URL=http://127.0.0.1:4599 AWS_ACCESS_KEY_ID=x AWS_SECRET_ACCESS_KEY=x \\
+        AWS_DEFAULT_REGION=us-east-1 python server.py
+
+Tests and benchmarks can also run it in-process with FakeFisServer.
+"""
+import argparse
+import json
+import random
+import secrets
+import string
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ACCOUNT_ID = "123456789012"
+PAGE_SIZE = 50
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle plus delayed ACKs adds ~40ms per call.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, error_type=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("x-amzn-RequestId", secrets.token_hex(8))
+        if error_type:
+            self.send_header("x-amzn-ErrorType", error_type)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self, method):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        status, payload, error_type = fake.handle(method, urlparse(self.path), body)
+        self._send(status, payload, error_type)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+class FakeFisServer:
+    """In-process fake FIS endpoint.
+
+    latency_ms (+ up to jitter_ms) is added to every request. throttle_rate
+    throttles that fraction of requests at random; max_rps throttles whatever
+    exceeds a per-second budget, which is how real FIS quotas behave.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, region="us-east-1", latency_ms=0.0, jitter_ms=0.0,
+                 throttle_rate=0.0, max_rps=None, seed=None):
+        self.region = region
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.max_rps = max_rps
+        self.templates = {}
+        self._tokens_by_client = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._window = (0, 0)
+        self.requests = 0
+        self.throttled = 0
+        self.created = 0
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = None
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-fis", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _should_throttle(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            throttle = self.throttle_rate and self._random.random() < self.throttle_rate
+            if self.max_rps is not None:
+                second = int(time.monotonic())
+                start, count = self._window
+                count = count + 1 if start == second else 1
+                self._window = (second, count)
+                throttle = throttle or count > self.max_rps
+            if throttle:
+                self.throttled += 1
+            return bool(throttle)
+
+    def handle(self, method, url, body):
+        delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+        if self._should_throttle():
+            return 429, {"message": "Rate exceeded"}, "ThrottlingException"
+
+        parts = [p for p in url.path.split("/") if p]
+        if parts[:1] != ["experimentTemplates"] or len(parts) > 2:
+            return 404, {"message": f"Unknown path {url.path}"}, "ResourceNotFoundException"
+        template_id = parts[1] if len(parts) == 2 else None
+
+        if method == "POST" and template_id is None:
+            return self._create(body)
+        if method == "GET" and template_id is None:
+            return self._list(parse_qs(url.query))
+        if method == "GET":
+            return self._get(template_id)
+        if method == "DELETE":
+            return self._delete(template_id)
+        return 400, {"message": f"Unsupported {method} {url.path}"}, "ValidationException"
+
+    def _create(self, body):
+        for field in ("description", "roleArn", "stopConditions", "actions"):
+            if field not in body:
+                return 400, {"message": f"Missing {field}"}, "ValidationException"
+        with self._lock:
+            token = body.get("clientToken")
+            if token and token in self._tokens_by_client and self._tokens_by_client[token] in self.templates:
+                return 200, {"experimentTemplate": self.templates[self._tokens_by_client[token]]}, None
+            template_id = "EXT" + "".join(self._random.choices(string.ascii_letters + string.digits, k=14))
+            now = time.time()
+            template = {
+                "id": template_id,
+                "arn": f"arn:aws:fis:{self.region}:{ACCOUNT_ID}:experiment-template/{template_id}",
+                "description": body["description"],
+                "targets": body.get("targets", {}),
+                "actions": body["actions"],
+                "stopConditions": body["stopConditions"],
+                "roleArn": body["roleArn"],
+                "tags": body.get("tags", {}),
+                "creationTime": now,
+                "lastUpdateTime": now,
+            }
+            self.templates[template_id] = template
+            if token:
+                self._tokens_by_client[token] = template_id
+            self.created += 1
+        return 200, {"experimentTemplate": template}, None
+
+    def _get(self, template_id):
+        template = self.templates.get(template_id)
+        if template is None:
+            return 404, {"message": f"Experiment template {template_id} not found"}, "ResourceNotFoundException"
+        return 200, {"experimentTemplate": template}, None
+
+    def _list(self, query):
+        limit = int(query.get("maxResults", [PAGE_SIZE])[0])
+        start = int(query.get("nextToken", ["0"])[0])
+        with self._lock:
+            ids = sorted(self.templates)
+        page = ids[start:start + limit]
+        summaries = [
+            {k: self.templates[i][k] for k in ("id", "arn", "description", "creationTime", "lastUpdateTime", "tags")}
+            for i in page if i in self.templates
+        ]
+        payload = {"experimentTemplates": summaries}
+        if start + limit < len(ids):
+            payload["nextToken"] = str(start + limit)
+        return 200, payload, None
+
+    def _delete(self, template_id):
+        with self._lock:
+            template = self.templates.pop(template_id, None)
+        if template is None:
+            return 404, {"message": f"Experiment template {template_id} not found"}, "ResourceNotFoundException"
+        return 200, {"experimentTemplate": template}, None
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "throttled": self.throttled, "created": self.created,
+                "templates": len(self.templates)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake FIS endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4599)
+    parser.add_argument("--region", default="us-east-1")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests to throttle at random")
+    parser.add_argument("--max-rps", type=int, default=None, help="throttle requests beyond this many per second")
+    args = parser.parse_args()
+
+    fake = FakeFisServer(args.host, args.port, args.region, args.latency_ms, args.jitter_ms,
+                         args.throttle_rate, args.max_rps)
+    print(f"Fake FIS listening on {fake.endpoint_url}")
+    try:
+        fake._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
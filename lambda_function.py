@@ -112,7 +112,7 @@ def lambda_handler(event, context):
             }
         }
     else:
-        ALLOWED_TOOLS = {"recommend_fis_experiments"}
+        ALLOWED_TOOLS = {"recommend_fis_experiments", "recommend_fis_experiments_batch"}
         tool_name = event.get("tool", "recommend_fis_experiments")
         if tool_name not in ALLOWED_TOOLS:
             return {
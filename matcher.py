@@ -0,0 +1,183 @@
+"""Keyword matcher used by recommend_fis_experiments.
+
+Keywords are compiled once into an Aho-Corasick automaton over word tokens,
+so a finding is scanned in a single pass no matter how large the catalog is.
+Tokens are runs of ASCII letters and digits; everything else is a word
+boundary. A keyword token matches a finding token that starts with it and
+adds at most a plural or -ing suffix (see SUFFIXES). "cpu" therefore matches
+"High-CPU", "CPU_SPIKE" or "cpus" but not "xcpu" or "cpuset", and "network"
+matches "networking". Small catalogs made only of single-word keywords are
+matched by substring scans confirmed with a per-keyword regex instead of
+tokenizing the text.
+
+Only selected text fields of a finding are scanned (see iter_finding_text),
+so ids, ARNs and JSON punctuation never reach the matcher.
+"""
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Endings a finding token may add to a keyword token, longest first.
+SUFFIXES = ("ing", "es", "s")
+
+# Up to this many single-word keywords, per-keyword substring scans beat tokenizing the finding.
+SUBSTRING_SCAN_MAX_KEYWORDS = 32
+
+DEFAULT_TEXT_FIELDS = ("summary", "type", "description")
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _lookup(finding: dict, path: str):
+    value = finding
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def iter_finding_text(finding: dict, fields=DEFAULT_TEXT_FIELDS, budget: int = 10240):
+    """Yield the string values of the given fields, at most budget characters in total.
+
+    Fields may be dotted paths into nested dicts ("details.message"). A field holding
+    a list yields each string item; any other value type is skipped.
+    """
+    for field in fields:
+        value = _lookup(finding, field)
+        spans = value if isinstance(value, list) else (value,)
+        for span in spans:
+            if not isinstance(span, str) or not span:
+                continue
+            if len(span) >= budget:
+                yield span[:budget]
+                return
+            budget -= len(span)
+            yield span
+
+
+class KeywordMatcher:
+    """Multi-pattern matcher mapping keyword phrases to labels."""
+
+    def __init__(self, keywords):
+        """Build the automaton from an iterable of (phrase, label) pairs."""
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [frozenset()]
+        self._labels = set()
+        self.max_phrase_tokens = 0
+
+        for phrase, label in keywords:
+            tokens = tokenize(phrase)
+            if not tokens:
+                raise ValueError(f"Keyword has no matchable tokens: {phrase!r}")
+            state = 0
+            for tok in tokens:
+                nxt = self._goto[state].get(tok)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][tok] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                state = nxt
+            self._out[state] = self._out[state] | {label}
+            self._labels.add(label)
+            self.max_phrase_tokens = max(self.max_phrase_tokens, len(tokens))
+
+        self._build_failure_links()
+        self._vocab = frozenset(tok for edges in self._goto for tok in edges)
+        # Catalogs made only of single-word keywords skip the automaton walk
+        # and intersect the token set with the root transitions instead.
+        self._single_word = {
+            tok: self._out[state] for tok, state in self._goto[0].items() if self._out[state]
+        }
+        # Small single-word catalogs skip tokenizing: a substring test (a C scan) rules out absent
+        # keywords and a per-keyword regex checks the word boundaries of the ones present.
+        self._word_patterns = None
+        if self.max_phrase_tokens <= 1 and 0 < len(self._single_word) <= SUBSTRING_SCAN_MAX_KEYWORDS:
+            suffixes = "|".join(SUFFIXES)
+            self._word_patterns = [
+                (tok, re.compile(rf"(?<![a-z0-9]){tok}(?:{suffixes})?(?![a-z0-9])"), labels)
+                for tok, labels in self._single_word.items()
+            ]
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for tok, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and tok not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(tok, 0)
+                self._out[nxt] = self._out[nxt] | self._out[self._fail[nxt]]
+
+    @property
+    def labels(self) -> frozenset:
+        return frozenset(self._labels)
+
+    def __len__(self) -> int:
+        return len(self._goto) - 1
+
+    def _stem(self, tok: str):
+        """tok itself or its keyword stem when it is in the vocabulary, else None."""
+        if tok in self._vocab:
+            return tok
+        for suffix in SUFFIXES:
+            if tok.endswith(suffix) and tok[:-len(suffix)] in self._vocab:
+                return tok[:-len(suffix)]
+        return None
+
+    def _match_text(self, text: str) -> set:
+        if self._word_patterns is None:
+            return self.match_tokens(tokenize(text))
+        text = text.lower()
+        found = set()
+        for tok, pattern, labels in self._word_patterns:
+            if tok in text and pattern.search(text):
+                found |= labels
+        return found
+
+    def match(self, text: str) -> set:
+        """Return the labels of every keyword found in text."""
+        return self._match_text(text)
+
+    def match_spans(self, spans) -> set:
+        """Match each text span separately; phrases never straddle two spans."""
+        found = set()
+        total = len(self._labels)
+        for span in spans:
+            found |= self._match_text(span)
+            if len(found) == total:
+                break
+        return found
+
+    def match_tokens(self, tokens) -> set:
+        found = set()
+        if self.max_phrase_tokens <= 1:
+            for tok in set(tokens):
+                if tok not in self._vocab:
+                    tok = self._stem(tok)
+                if tok is not None:
+                    found |= self._single_word[tok]
+            return found
+
+        goto, fail, out, vocab, stem = self._goto, self._fail, self._out, self._vocab, self._stem
+        total = len(self._labels)
+        state = 0
+        for tok in tokens:
+            # Every suffix ends in "s" or "g", so most other tokens need no stemming.
+            if tok not in vocab and (tok[-1] not in "sg" or (tok := stem(tok)) is None):
+                state = 0
+                continue
+            while state and tok not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(tok, 0)
+            if out[state]:
+                found |= out[state]
+                if len(found) == total:
+                    break
+        return found
@@ -0,0 +1,310 @@
+"""Per-tool call counters and latency histograms in Prometheus text format.
+
+Tools are wrapped with Metrics.instrument, which counts each call, times it
+and classifies error responses (the {"error": ...} JSON the tools return)
+by the fixed part of their message. Inside a tool, `with METRICS.phase(name)`
+times a phase (validation, matching, serialization, aws_call); a phase that
+runs several times in one call, like aws_call in a batch, is summed before
+it is observed. Given a tracer (see tracing.py), each tool call and phase
+also becomes a span; given a profiler (see profiling.py), sampled calls run
+under cProfile.
+
+Metrics are per process. Every series has a worker label, and with several
+workers MetricsExchange lets any of them serve every worker's series.
+"""
+import bisect
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current_call = contextvars.ContextVar("fis_mcp_tool_call", default=None)
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def record_error(self, error_type):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+MAX_ERROR_CLASS = 80
+
+
+def error_class(message: str) -> str:
+    """Stable label for an error message: its text before the first ':', as snake_case.
+
+    The tools put variable details after the colon ("Action not allowed: aws:foo"),
+    so this keeps label cardinality bounded. Dots are not boundaries, since they
+    also occur inside field names ("finding.summary must be a string"). Long
+    labels are cut at a word boundary.
+    """
+    label = re.sub(r"[^a-z0-9]+", "_", message.split(":", 1)[0].lower()).strip("_")
+    if len(label) > MAX_ERROR_CLASS:
+        label = label[:MAX_ERROR_CLASS + 1].rsplit("_", 1)[0][:MAX_ERROR_CLASS]
+    return label or "unknown"
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class _Phase:
+    __slots__ = ("_name", "_started", "_span")
+
+    def __init__(self, name, span):
+        self._name = name
+        self._span = span
+
+    def __enter__(self):
+        if self._span is not None:
+            self._span.__enter__()
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        phases = _current_call.get()
+        if phases is not None:
+            phases[self._name] = phases.get(self._name, 0.0) + time.perf_counter() - self._started
+        if self._span is not None:
+            self._span.__exit__(*exc)
+
+
+class Metrics:
+    def __init__(self, namespace: str = "fis_mcp", buckets=DEFAULT_BUCKETS, tracer=None, profiler=None):
+        self.namespace = namespace
+        self.buckets = buckets
+        self.tracer = tracer
+        self.profiler = profiler
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._errors = {}
+        self._durations = {}
+        self._phases = {}
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(name, self.tracer.span(f"phase.{name}") if self.tracer else None)
+
+    def _span(self, tool):
+        return self.tracer.span(f"tool.{tool}", **{"mcp.tool": tool}) if self.tracer else _NO_SPAN
+
+    def _profile(self, tool):
+        return self.profiler.sample(tool) if self.profiler else _NO_SPAN
+
+    def _record(self, tool: str, elapsed: float, phases: dict, error: str = None):
+        with self._lock:
+            outcome = "error" if error else "ok"
+            self._calls[(tool, outcome)] = self._calls.get((tool, outcome), 0) + 1
+            if error:
+                self._errors[(tool, error)] = self._errors.get((tool, error), 0) + 1
+            self._durations.setdefault(tool, Histogram(self.buckets)).observe(elapsed)
+            for name, seconds in phases.items():
+                self._phases.setdefault((tool, name), Histogram(self.buckets)).observe(seconds)
+
+    @staticmethod
+    def _response_error(result):
+        # Error payloads are always built with "error" as their first key.
+        if isinstance(result, str) and result.startswith('{"error"'):
+            try:
+                return error_class(str(json.loads(result)["error"]))
+            except (ValueError, KeyError):
+                return "unknown"
+        return None
+
+    def instrument(self, fn):
+        """Wrap a sync or async tool function; the wrapper keeps fn's signature for FastMCP."""
+        tool = fn.__name__
+
+        def finish(span, token, started, result=None, exc=None):
+            phases = _current_call.get()
+            _current_call.reset(token)
+            error = f"exception_{type(exc).__name__.lower()}" if exc else self._response_error(result)
+            self._record(tool, time.perf_counter() - started, phases, error)
+            if error and not exc:
+                span.record_error(error)
+            span.__exit__(type(exc) if exc else None, exc, None)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                span = self._span(tool).__enter__()
+                token, started = _current_call.set({}), time.perf_counter()
+                try:
+                    with self._profile(tool):
+                        result = await fn(*args, **kwargs)
+                except BaseException as e:
+                    finish(span, token, started, exc=e)
+                    raise
+                finish(span, token, started, result)
+                return result
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                span = self._span(tool).__enter__()
+                token, started = _current_call.set({}), time.perf_counter()
+                try:
+                    with self._profile(tool):
+                        result = fn(*args, **kwargs)
+                except BaseException as e:
+                    finish(span, token, started, exc=e)
+                    raise
+                finish(span, token, started, result)
+                return result
+        return wrapper
+
+    def snapshot(self) -> dict:
+        """This process's series as JSON-serializable lists, for MetricsExchange."""
+        with self._lock:
+            return {
+                "calls": sorted([*k, n] for k, n in self._calls.items()),
+                "errors": sorted([*k, n] for k, n in self._errors.items()),
+                "durations": sorted([t, list(h.counts), h.sum] for t, h in self._durations.items()),
+                "phases": sorted([*k, list(h.counts), h.sum] for k, h in self._phases.items()),
+            }
+
+    def render(self, peers=()) -> str:
+        """Prometheus text exposition (format 0.0.4) of every series recorded so far.
+
+        Every series carries a worker label (the process id). peers adds other workers'
+        series as (worker, snapshot) pairs, so one scrape covers every worker.
+        """
+        ns = self.namespace
+        workers = sorted([(str(os.getpid()), self.snapshot()), *peers], key=lambda w: w[0])
+
+        def series(field):
+            return [(f'worker="{w}",', row) for w, snap in workers for row in snap[field]]
+
+        lines = [
+            f"# HELP {ns}_tool_calls_total Tool calls by outcome.",
+            f"# TYPE {ns}_tool_calls_total counter",
+        ]
+        lines += [f'{ns}_tool_calls_total{{{w}tool="{t}",outcome="{o}"}} {n}' for w, (t, o, n) in series("calls")]
+        lines += [
+            f"# HELP {ns}_tool_errors_total Tool error responses by error class.",
+            f"# TYPE {ns}_tool_errors_total counter",
+        ]
+        lines += [f'{ns}_tool_errors_total{{{w}tool="{t}",error_class="{c}"}} {n}' for w, (t, c, n) in series("errors")]
+        lines += self._render_histograms(f"{ns}_tool_duration_seconds", "Tool call latency.",
+                                         [(f'{w}tool="{t}"', (c, total)) for w, (t, c, total) in series("durations")])
+        lines += self._render_histograms(f"{ns}_tool_phase_duration_seconds",
+                                         "Time spent per phase of a tool call, summed within the call.",
+                                         [(f'{w}tool="{t}",phase="{p}"', (c, total))
+                                          for w, (t, p, c, total) in series("phases")])
+        return "\n".join(lines) + "\n"
+
+    def _render_histograms(self, name, help_text, series):
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class MetricsExchange:
+    """Shares Metrics between worker processes through snapshot files in a common directory.
+
+    Each worker writes its snapshot to metrics-<pid>.json every interval seconds, and
+    peers() reads everyone else's, so whichever worker answers a scrape can render all
+    of them. Peers' series are therefore up to interval seconds old. Files not updated
+    for stale_after seconds belong to workers that have exited and are removed.
+    Without a directory, there is nothing to exchange and the exchange does nothing.
+    """
+
+    def __init__(self, metrics: Metrics, directory: str = None, interval: float = 5.0, stale_after: float = None):
+        self.metrics = metrics
+        self.directory = directory
+        self.interval = interval
+        self.stale_after = stale_after if stale_after is not None else max(30.0, 3 * interval)
+        self._stop = threading.Event()
+        self._thread = None
+        self.publish_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _path(self, pid) -> str:
+        return os.path.join(self.directory, f"metrics-{pid}.json")
+
+    def publish(self):
+        if not self.enabled:
+            return
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".metrics-")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.metrics.snapshot(), f, separators=(",", ":"))
+            os.replace(tmp, self._path(os.getpid()))
+        except OSError:
+            self.publish_errors += 1
+            logger.warning("Could not publish metrics to %s", self.directory, exc_info=True)
+
+    def peers(self) -> list:
+        """(worker, snapshot) for every other live worker."""
+        if not self.enabled:
+            return []
+        own, found = f"metrics-{os.getpid()}.json", []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        now = time.time()
+        for name in names:
+            if not (name.startswith("metrics-") and name.endswith(".json")) or name == own:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) > self.stale_after:
+                    os.remove(path)
+                    continue
+                with open(path) as f:
+                    found.append((name[len("metrics-"):-len(".json")], json.load(f)))
+            except (OSError, ValueError):
+                continue  # removed or replaced while we looked; it will be back next scrape
+        return found
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.publish()
+
+    def start(self):
+        if self.enabled and self._thread is None:
+            self.publish()
+            self._thread = threading.Thread(target=self._run, name="metrics-exchange", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self.enabled:
+            try:
+                os.remove(self._path(os.getpid()))
+            except OSError:
+                pass
@@ -0,0 +1,170 @@
+"""Sampled cProfile of tool calls, aggregated across calls.
+
+Metrics.instrument asks Profiler.sample() for a context to run each tool
+call in. With a sample_rate above 0, that fraction of calls runs under
+cProfile and the results are merged into one pstats.Stats, which can be
+rendered as a top-N table, written as a .prof file (snakeviz, pstats,
+flameprof) or turned into collapsed stacks for flamegraph.pl/speedscope.
+
+Only one call is profiled at a time; a call sampled while another is being
+profiled runs unprofiled and is counted as busy. cProfile follows a single
+thread, so an async tool's profile covers the event loop while it runs,
+including other tasks that run during its awaits, but not the AWS calls it
+hands to the executor threads.
+"""
+import cProfile
+import io
+import os
+import pstats
+import random
+import threading
+
+
+class _NoProfile:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_PROFILE = _NoProfile()
+
+
+class _ProfiledCall:
+    __slots__ = ("_owner", "_tool", "_profile")
+
+    def __init__(self, owner, tool):
+        self._owner = owner
+        self._tool = tool
+        self._profile = cProfile.Profile()
+
+    def __enter__(self):
+        try:
+            self._profile.enable()
+        except ValueError:
+            # Another profiler (a debugger, coverage) already owns this thread.
+            self._profile = None
+        return self
+
+    def __exit__(self, *exc):
+        if self._profile is not None:
+            self._profile.disable()
+        self._owner._finish(self._tool, self._profile)
+
+
+def _label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name.replace(";", ",")
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ",")
+
+
+class Profiler:
+    def __init__(self, sample_rate: float = 0.0, rng=random.random):
+        self.sample_rate = sample_rate
+        self._rng = rng
+        self._active = threading.Lock()
+        self._lock = threading.Lock()
+        self._stats = None
+        self._calls = {}
+        self.busy = 0
+
+    def sample(self, tool: str):
+        """Context manager for one tool call: profiled if sampled and no other call is being profiled."""
+        if self.sample_rate <= 0 or self._rng() >= self.sample_rate:
+            return _NO_PROFILE
+        if not self._active.acquire(blocking=False):
+            with self._lock:
+                self.busy += 1
+            return _NO_PROFILE
+        return _ProfiledCall(self, tool)
+
+    def _finish(self, tool, profile):
+        try:
+            if profile is None:
+                with self._lock:
+                    self.busy += 1
+                return
+            profile.create_stats()
+            with self._lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profile)
+                else:
+                    self._stats.add(profile)
+                self._calls[tool] = self._calls.get(tool, 0) + 1
+        finally:
+            self._active.release()
+
+    def reset(self):
+        with self._lock:
+            self._stats = None
+            self._calls = {}
+            self.busy = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sample_rate": self.sample_rate,
+                "profiled_calls": dict(sorted(self._calls.items())),
+                "busy_skipped": self.busy,
+            }
+
+    def _entries(self) -> dict:
+        """func -> (cc, nc, tt, ct, callers) without the profiler's own frames and enable/disable calls."""
+        with self._lock:
+            raw = dict(self._stats.stats) if self._stats else {}
+        return {
+            func: entry for func, entry in raw.items()
+            if func[0] != __file__ and "_lsprof.Profiler" not in func[2]
+        }
+
+    def table(self, limit: int = 30, sort: str = "cumulative") -> str:
+        """pstats report of the top `limit` functions."""
+        with self._lock:
+            if self._stats is None:
+                return ""
+            out = io.StringIO()
+            self._stats.stream = out
+            self._stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump(self, path: str) -> bool:
+        """Write the aggregated stats in pstats format; False if nothing has been profiled yet."""
+        with self._lock:
+            if self._stats is None:
+                return False
+            self._stats.dump_stats(path)
+        return True
+
+    def collapsed(self, min_us: int = 1) -> str:
+        """Aggregated stats as collapsed stacks ("root;child;leaf <microseconds>" per line).
+
+        cProfile records caller/callee edges rather than whole stacks, so each function's
+        time along a path is its edge time scaled by the share of its caller's time on
+        that path, as flameprof does. Recursive edges are folded into the caller.
+        """
+        entries = self._entries()
+        callees = {}
+        for func, (_, _, _, _, callers) in entries.items():
+            for caller, edge in callers.items():
+                if caller in entries:
+                    callees.setdefault(caller, []).append((func, edge[3]))
+        roots = [func for func, entry in entries.items() if not set(entry[4]) - {func}]
+        stacks = {}
+
+        def walk(func, seconds, path):
+            ct = entries[func][3]
+            share = seconds / ct if ct else 0.0
+            self_us = entries[func][2] * share * 1e6
+            if self_us >= min_us:
+                key = ";".join(path)
+                stacks[key] = stacks.get(key, 0) + self_us
+            for callee, edge_ct in callees.get(func, ()):
+                label = _label(callee)
+                if label not in path and edge_ct * share * 1e6 >= min_us:
+                    walk(callee, edge_ct * share, path + [label])
+
+        for root in roots:
+            walk(root, entries[root][3], [_label(root)])
+        return "".join(f"{stack} {round(us)}\n" for stack, us in sorted(stacks.items()) if round(us))
@@ -0,0 +1,118 @@
+"""TF-IDF relevance ranking of catalog entries against findings.
+
+Each catalog entry is a document made of its key, keywords, description and
+action name. Findings are scored by cosine similarity against every entry at
+once: a batch of findings becomes one sparse query matrix that is multiplied
+with the entry-term matrix in a single NumPy operation.
+
+NumPy is imported lazily so the recommendation path works without it when
+ranking is not requested.
+"""
+import math
+import threading
+
+from matcher import tokenize
+
+
+def _entry_terms(key: str, mapping: dict) -> list:
+    parts = [key, *mapping.get("keywords", []), mapping["description"], mapping["action"]]
+    return tokenize(" ".join(parts))
+
+
+class TfidfRanker:
+    def __init__(self, catalog):
+        import numpy as np
+
+        self._np = np
+        self.keys = list(catalog.mappings)
+        docs = [_entry_terms(k, catalog.mappings[k]) for k in self.keys]
+
+        self.vocab = {}
+        doc_freq = []
+        for terms in docs:
+            for term in set(terms):
+                col = self.vocab.setdefault(term, len(self.vocab))
+                if col == len(doc_freq):
+                    doc_freq.append(0)
+                doc_freq[col] += 1
+
+        n_docs = len(docs)
+        # Smoothed idf; a term present in every entry carries no weight.
+        self.idf = np.array([math.log((1 + n_docs) / (1 + df)) for df in doc_freq], dtype=np.float32)
+
+        # Stored term-major (vocab x entries) so a query's terms gather contiguous rows.
+        weights = np.zeros((len(self.vocab), n_docs), dtype=np.float32)
+        for j, terms in enumerate(docs):
+            for term in terms:
+                weights[self.vocab[term], j] += 1.0
+        weights *= self.idf[:, None]
+        norms = np.linalg.norm(weights, axis=0)
+        norms[norms == 0] = 1.0
+        self._term_entry = weights / norms
+
+    def scores(self, token_lists):
+        """Cosine similarity of each token list against every entry, shape (len(token_lists), entries)."""
+        np = self._np
+        rows, cols, counts = [], [], []
+        for row, tokens in enumerate(token_lists):
+            tf = {}
+            for tok in tokens:
+                col = self.vocab.get(tok)
+                if col is not None:
+                    tf[col] = tf.get(col, 0) + 1
+            rows.extend([row] * len(tf))
+            cols.extend(tf)
+            counts.extend(tf.values())
+
+        result = np.zeros((len(token_lists), len(self.keys)), dtype=np.float32)
+        if not cols:
+            return result
+        rows = np.asarray(rows)
+        cols = np.asarray(cols)
+        weights = np.asarray(counts, dtype=np.float32) * self.idf[cols]
+
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        query_norms = np.sqrt(np.add.reduceat(weights * weights, starts))
+        query_norms[query_norms == 0] = 1.0
+        # Sparse query x dense term-entry matrix: gather each query term's row and sum per query.
+        contributions = self._term_entry[cols] * weights[:, None]
+        result[rows[starts]] = np.add.reduceat(contributions, starts, axis=0) / query_norms[:, None]
+        return result
+
+    def top_k(self, token_lists, k: int, candidates=None):
+        """Per query, the k best (key, score) pairs, best first.
+
+        Without candidates, every entry with a positive score competes. candidates gives,
+        per query, the only keys that may be returned (the keyword matches); they are kept
+        even when they score zero, and the scores only decide their order.
+        """
+        np = self._np
+        scores = self.scores(token_lists)
+        position = {key: j for j, key in enumerate(self.keys)}
+        ranked = []
+        for row, row_scores in enumerate(scores):
+            if candidates is None:
+                allowed = np.flatnonzero(row_scores > 0).tolist()
+            else:
+                allowed = [position[key] for key in candidates[row]]
+            order = sorted(allowed, key=lambda j: (-row_scores[j], j))[:k]
+            ranked.append([(self.keys[j], round(float(row_scores[j]), 4)) for j in order])
+        return ranked
+
+
+_rankers = {}
+_rankers_lock = threading.Lock()
+
+
+def get_ranker(catalog) -> TfidfRanker:
+    """Ranker for this catalog snapshot, built on first use and reused afterwards."""
+    ranker = _rankers.get(catalog.fingerprint)
+    if ranker is None:
+        with _rankers_lock:
+            ranker = _rankers.get(catalog.fingerprint)
+            if ranker is None:
+                ranker = TfidfRanker(catalog)
+                # Only the latest catalog's ranker is kept; older snapshots rebuild on demand.
+                _rankers.clear()
+                _rankers[catalog.fingerprint] = ranker
+    return ranker
@@ -1,8 +1,37 @@
 import os
+import hmac
 import json
 import re
+import asyncio
+import logging
+import shutil
+import tempfile
+from startup import TIMELINE, StartupMiddleware, prewarm
+
 from mcp.server.fastmcp import FastMCP
 
+TIMELINE.mark("import_mcp")
+
+from admission import AdmissionController, parse_limits
+from audit import AuditSink
+from aws_clients import ClientCache
+from aws_executor import AwsCallExecutor
+from body_limit import BodySizeLimitMiddleware, BodySizeLimits, parse_tool_limits
+from cache import ResultCache, canonical_key, content_key
+from credentials import AssumeRoleCache
+from catalog import Catalog, CatalogStore, render_recommendations
+from metrics import Metrics, MetricsExchange
+from matcher import DEFAULT_TEXT_FIELDS, iter_finding_text, tokenize
+from profiling import Profiler
+from ranking import get_ranker
+from singleflight import SingleFlight
+from template_index import TemplateIndex, template_hash
+from throttle import AdaptiveRateLimiter, call_with_backoff_async
+from tracing import Tracer, TracingMiddleware, load_exporter
+
+TIMELINE.mark("import_modules")
+logger = logging.getLogger(__name__)
+
 # Default to 127.0.0.1 for local development security.
 # AgentCore sets AWS_EXECUTION_ENV at runtime; detect it to bind 0.0.0.0 for proxy access.
 if os.environ.get("AWS_EXECUTION_ENV") or os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
@@ -16,9 +45,48 @@ else:
 # directly internet-facing — all traffic passes through AgentCore's authenticated gateway.
 os.environ.setdefault("UVICORN_FORWARDED_ALLOW_IPS", "*")
 
-mcp = FastMCP(host=SERVER_HOST, stateless_http=True)
+mcp = FastMCP(host=SERVER_HOST, port=int(os.environ.get("MCP_PORT", "8000")), stateless_http=True)
+
+# stateless_http lets any process answer any request, so the server runs one worker per CPU by default.
+# Caches, the template index and rate limiters below are per worker.
+def _default_workers() -> int:
+    """CPUs this process may run on; os.cpu_count() would ignore affinity masks and cpusets."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS or Windows
+        return os.cpu_count() or 1
+
+
+WORKERS = int(os.environ.get("MCP_WORKERS") or _default_workers())
+GRACEFUL_SHUTDOWN_SECONDS = int(os.environ.get("MCP_GRACEFUL_SHUTDOWN_SECONDS", "30"))
 
 MAX_INPUT_SIZE = 10240  # 10KB
+MAX_BATCH_FINDINGS = int(os.environ.get("FIS_MAX_BATCH_FINDINGS", "100"))
+MAX_BATCH_INPUT_SIZE = int(os.environ.get("FIS_MAX_BATCH_INPUT_SIZE", str(256 * 1024)))  # 256KB
+# Only these finding fields are scanned for keywords; FIS_FINDING_TEXT_FIELDS adds
+# comma-separated extras, which may be dotted paths such as "details.message".
+FINDING_TEXT_FIELDS = DEFAULT_TEXT_FIELDS + tuple(
+    f.strip() for f in os.environ.get("FIS_FINDING_TEXT_FIELDS", "").split(",") if f.strip()
+)
+# Keyword scanning stops after this many characters of finding text.
+MAX_SCAN_CHARS = int(os.environ.get("FIS_MAX_SCAN_CHARS", str(MAX_INPUT_SIZE)))
+# Request bodies are size-checked before the MCP layer parses them: FIS_MAX_REQUEST_BYTES for any request,
+# and per-tool limits on the encoded arguments that leave room for the recommend tools' other arguments.
+# FIS_TOOL_MAX_BYTES="tool=max_bytes,..." adds or overrides per-tool limits.
+MAX_REQUEST_BYTES = int(os.environ.get("FIS_MAX_REQUEST_BYTES", str(1024 * 1024)))
+TOOL_ARGUMENTS_OVERHEAD_BYTES = 4096
+BODY_LIMITS = BodySizeLimits(
+    MAX_REQUEST_BYTES,
+    tool_limits={
+        "recommend_fis_experiments": MAX_INPUT_SIZE + TOOL_ARGUMENTS_OVERHEAD_BYTES,
+        "recommend_fis_experiments_batch": MAX_BATCH_INPUT_SIZE + TOOL_ARGUMENTS_OVERHEAD_BYTES,
+        **parse_tool_limits(os.environ.get("FIS_TOOL_MAX_BYTES", "")),
+    },
+    # The same errors the tools return for inputs over their own limits.
+    tool_errors={"recommend_fis_experiments": "Input too large", "recommend_fis_experiments_batch": "Batch too large"},
+)
+# Default output format for recommendation tools; callers can override per call.
+COMPACT_JSON = os.environ.get("FIS_COMPACT_JSON", "").lower() in ("1", "true", "yes")
 MAX_DURATION_MINUTES = 60
 ROLE_ARN_PATTERN = re.compile(r"^arn:aws:iam::\d{12}:role/[\w+=,.@-]+$")
 STOP_CONDITION_ARN_PATTERN = re.compile(r"^arn:aws:cloudwatch:[\w-]+:\d{12}:alarm:[\w+=,.@/-]+$")
@@ -49,6 +117,124 @@ FINDING_MAPPINGS = {
 }
 
 
+# FIS_CATALOG_PATH points at a JSON/YAML catalog that replaces the builtin
+# FINDING_MAPPINGS/ALLOWED_ACTIONS above and is hot-reloaded when the file changes.
+CATALOG_STORE = CatalogStore(
+    path=os.environ.get("FIS_CATALOG_PATH") or None,
+    builtin=lambda: (FINDING_MAPPINGS, ALLOWED_ACTIONS),
+    check_interval=float(os.environ.get("FIS_CATALOG_CHECK_INTERVAL", "2")),
+)
+
+
+# Cache keys include the catalog fingerprint, so a catalog change never serves stale results.
+RESULT_CACHE = ResultCache(
+    max_entries=int(os.environ.get("FIS_CACHE_MAX_ENTRIES", "1024")),
+    ttl=float(os.environ.get("FIS_CACHE_TTL_SECONDS", "300")),
+)
+
+# With FIS_TRACING=1, requests, tool calls, their phases and AWS API calls are recorded as spans,
+# continuing any W3C traceparent sent by the caller. Spans go to a local JSONL file by default.
+TRACER = Tracer(
+    exporter=load_exporter(
+        os.environ.get("FIS_TRACE_EXPORTER", "jsonl"),
+        os.environ.get("FIS_TRACE_FILE") or os.path.join(tempfile.gettempdir(), "fis-mcp-traces.jsonl"),
+    ) if os.environ.get("FIS_TRACING", "").lower() in ("1", "true", "yes") else None,
+    sample_rate=float(os.environ.get("FIS_TRACE_SAMPLE_RATE", "1.0")),
+)
+
+# boto3 clients are built on first use and shared across tool calls.
+AWS_MAX_CONCURRENCY = int(os.environ.get("FIS_AWS_MAX_CONCURRENCY", "16"))
+# One pooled connection per executor thread; a smaller pool makes concurrent calls reconnect.
+AWS_CLIENTS = ClientCache(
+    max_pool_connections=int(os.environ.get("FIS_MAX_POOL_CONNECTIONS", str(AWS_MAX_CONCURRENCY))),
+    # Point FIS at a local stand-in (see fake_fis.py) for load tests and benchmarks.
+    endpoint_urls={"fis": os.environ["FIS_ENDPOINT_URL"]} if os.environ.get("FIS_ENDPOINT_URL") else None,
+    on_build=TRACER.instrument_botocore,
+)
+
+# Maps template content hashes to existing FIS templates so repeated requests don't create duplicates.
+TEMPLATE_INDEX = TemplateIndex()
+
+# With FIS_ASSUME_ROLE_NAME set, templates are created in the account that owns the template's
+# roleArn by assuming that role name there; credentials are cached and refreshed ahead of expiry.
+# Clients are keyed by account, and dropped when their account leaves the cache.
+ASSUME_ROLE_NAME = os.environ.get("FIS_ASSUME_ROLE_NAME", "")
+ASSUME_ROLE_CACHE = AssumeRoleCache(
+    role_name=ASSUME_ROLE_NAME,
+    sts_client_factory=lambda: AWS_CLIENTS.get("sts"),
+    max_accounts=int(os.environ.get("FIS_ASSUME_ROLE_MAX_ACCOUNTS", "32")),
+    refresh_ahead=float(os.environ.get("FIS_ASSUME_ROLE_REFRESH_AHEAD", "1200")),
+    idle_after=float(os.environ.get("FIS_ASSUME_ROLE_IDLE_AFTER", "3600")),
+    external_id=os.environ.get("FIS_ASSUME_ROLE_EXTERNAL_ID") or None,
+    on_evict=AWS_CLIENTS.evict,
+) if ASSUME_ROLE_NAME else None
+
+# FIS_PROFILE_SAMPLE_RATE runs that fraction of tool calls under cProfile, aggregated per worker.
+# With FIS_ADMIN_TOKEN set, the profile_server tool changes the rate and returns or writes the profile.
+PROFILER = Profiler(sample_rate=float(os.environ.get("FIS_PROFILE_SAMPLE_RATE", "0")))
+PROFILE_FILE = os.environ.get("FIS_PROFILE_FILE") or os.path.join(tempfile.gettempdir(), "fis-mcp-profile")
+ADMIN_TOKEN = os.environ.get("FIS_ADMIN_TOKEN", "")
+
+# Per-tool call counts, error classes and phase latencies, served at /metrics (and traced as spans).
+METRICS = Metrics(tracer=TRACER if TRACER.enabled else None, profiler=PROFILER)
+# With several workers, main() points FIS_METRICS_DIR at a shared directory. Each worker publishes its metrics
+# there every FIS_METRICS_PUBLISH_INTERVAL seconds, so whichever worker answers /metrics serves all of them.
+METRICS_EXCHANGE = MetricsExchange(
+    METRICS,
+    directory=os.environ.get("FIS_METRICS_DIR") or None,
+    interval=float(os.environ.get("FIS_METRICS_PUBLISH_INTERVAL", "5")),
+)
+
+# With FIS_AUDIT_DIR set, every recommendation returned and template created is queued here and written
+# off the request path by a background thread as batched, gzip-compressed, rotating JSONL files.
+AUDIT = AuditSink(
+    directory=os.environ.get("FIS_AUDIT_DIR") or None,
+    max_queue=int(os.environ.get("FIS_AUDIT_QUEUE_SIZE", "10000")),
+    batch_size=int(os.environ.get("FIS_AUDIT_BATCH_SIZE", "500")),
+    flush_interval=float(os.environ.get("FIS_AUDIT_FLUSH_INTERVAL", "1")),
+    max_file_bytes=int(os.environ.get("FIS_AUDIT_MAX_FILE_BYTES", str(64 * 1024 * 1024))),
+    max_files=int(os.environ.get("FIS_AUDIT_MAX_FILES", "20")),
+    compress=os.environ.get("FIS_AUDIT_COMPRESS", "1").lower() not in ("0", "false", "no"),
+    policy=os.environ.get("FIS_AUDIT_POLICY", "drop"),
+    block_timeout=float(os.environ.get("FIS_AUDIT_BLOCK_TIMEOUT_MS", "50")) / 1000,
+)
+
+# Concurrent creates of the same template share one executor slot and one FIS round-trip.
+CREATE_FLIGHTS = SingleFlight()
+
+# Blocking FIS calls run here so async tools never stall the event loop serving cheap requests.
+AWS_EXECUTOR = AwsCallExecutor(max_concurrency=AWS_MAX_CONCURRENCY)
+
+MAX_COMPOSITE_ACTIONS = int(os.environ.get("FIS_MAX_COMPOSITE_ACTIONS", "20"))
+
+# create_fis_templates_batch: per-batch concurrency plus a shared AIMD token bucket for FIS calls.
+MAX_TEMPLATE_BATCH = int(os.environ.get("FIS_MAX_TEMPLATE_BATCH", "100"))
+TEMPLATE_BATCH_WORKERS = int(os.environ.get("FIS_TEMPLATE_BATCH_WORKERS", "8"))
+# FIS_CREATE_RATE/FIS_CREATE_BURST are for the whole server, so each worker gets an equal share.
+FIS_CREATE_RATE = float(os.environ.get("FIS_CREATE_RATE", "20"))
+FIS_CREATE_BURST = float(os.environ.get("FIS_CREATE_BURST", "20"))
+
+
+def _create_rate_limiter(workers: int) -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(rate=FIS_CREATE_RATE / workers, burst=max(1.0, FIS_CREATE_BURST / workers))
+
+
+FIS_RATE_LIMITER = _create_rate_limiter(WORKERS)
+
+# Per-worker admission limits for the create tools: running calls, queued calls and the longest a call
+# may expect to wait (scaled by observed latency) before it is turned away with retry_after_ms.
+# FIS_ADMISSION_LIMITS="tool=limit:max_queue:max_wait_ms,..." overrides any tool's defaults.
+ADMISSION_MAX_WAIT = float(os.environ.get("FIS_ADMISSION_MAX_WAIT_MS", "10000")) / 1000
+# Running batches may fill at most half the AWS executor, so single creates always keep some slots.
+_BATCH_LIMIT = max(1, AWS_MAX_CONCURRENCY // 2 // TEMPLATE_BATCH_WORKERS)
+ADMISSION = AdmissionController({
+    "create_fis_template": (AWS_MAX_CONCURRENCY, 4 * AWS_MAX_CONCURRENCY, ADMISSION_MAX_WAIT),
+    "create_fis_composite_template": (AWS_MAX_CONCURRENCY, 4 * AWS_MAX_CONCURRENCY, ADMISSION_MAX_WAIT),
+    "create_fis_templates_batch": (_BATCH_LIMIT, 4 * _BATCH_LIMIT, ADMISSION_MAX_WAIT),
+    **parse_limits(os.environ.get("FIS_ADMISSION_LIMITS", "")),
+})
+
+
 def _validate_duration(duration: str) -> bool:
     match = re.match(r"^PT(\d+)M$", duration)
     if not match:
@@ -56,102 +242,579 @@ def _validate_duration(duration: str) -> bool:
     return int(match.group(1)) <= MAX_DURATION_MINUTES
 
 
+def _check_finding(finding: dict, raw: str):
+    """Return an error payload if the finding is rejected, else None."""
+    if len(raw) > MAX_INPUT_SIZE:
+        return {"error": "Input too large", "max_bytes": MAX_INPUT_SIZE}
+
+    if not isinstance(finding.get("summary", ""), str):
+        return {"error": "finding.summary must be a string"}
+    return None
+
+
+def _matched_keys(finding: dict, catalog: Catalog) -> list:
+    matched = catalog.matcher.match_spans(iter_finding_text(finding, FINDING_TEXT_FIELDS, MAX_SCAN_CHARS))
+    return [k for k in catalog.mappings if k in matched]
+
+
+def _recommend(finding: dict, raw: str, catalog: Catalog) -> dict:
+    error = _check_finding(finding, raw)
+    if error:
+        return error
+    recs = [catalog.records[k] for k in _matched_keys(finding, catalog)]
+    return {"recommendations": recs, "count": len(recs)}
+
+
+def _rank(findings: list, catalog: Catalog, top_k: int) -> list:
+    """Top-k scored recommendations per finding; all findings are scored in one matrix operation.
+
+    Only keyword matches are returned: generic terms in descriptions and actions ("test", "instances")
+    would otherwise surface entries for findings that match nothing.
+    """
+    ranker = get_ranker(catalog)
+    token_lists = [
+        tokenize(" ".join(iter_finding_text(finding, FINDING_TEXT_FIELDS, MAX_SCAN_CHARS)))
+        for finding in findings
+    ]
+    matched = [_matched_keys(finding, catalog) for finding in findings]
+    return [
+        [{**catalog.records[k], "score": score} for k, score in ranked]
+        for ranked in ranker.top_k(token_lists, top_k, candidates=matched)
+    ]
+
+
+def _audit_recommendation(tool: str, raw: str, response: str, **fields):
+    """Queue an audit record of a recommendation response; raw and response are JSON text, embedded as is."""
+    AUDIT.record("recommendation", {"tool": tool, **fields}, {"finding": raw, "response": response})
+
+
+def _audit_created(tool: str, template: dict, result: dict):
+    AUDIT.record("template_created", {"tool": tool, **result, "template": template})
+
+
+def _check_top_k(top_k):
+    if top_k is not None and (isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1):
+        return {"error": "top_k must be a positive integer"}
+    return None
+
+
+def _use_compact(compact) -> bool:
+    return COMPACT_JSON if compact is None else compact
+
+
+def _dumps(payload: dict, compact: bool) -> str:
+    if compact:
+        return json.dumps(payload, separators=(",", ":"))
+    return json.dumps(payload, indent=2)
+
+
 @mcp.tool()
-def recommend_fis_experiments(finding: dict) -> str:
-    """Recommend FIS experiments based on findings"""
+@METRICS.instrument
+def recommend_fis_experiments(finding: dict, compact: bool | None = None, top_k: int | None = None) -> str:
+    """Recommend FIS experiments based on findings. Set compact=true for non-indented JSON.
+    Set top_k to rank recommendations by relevance and return the best k with scores"""
     try:
-        raw = json.dumps(finding)
-        if len(raw) > MAX_INPUT_SIZE:
-            return json.dumps({"error": "Input too large", "max_bytes": MAX_INPUT_SIZE})
-
-        if not isinstance(finding.get("summary", ""), str):
-            return json.dumps({"error": "finding.summary must be a string"})
-
-        text = raw.lower()
-        recs = [
-            {"action": v["action"], "duration": v["duration"], "description": v["description"]}
-            for k, v in FINDING_MAPPINGS.items()
-            if k in text
-        ]
-        return json.dumps({"recommendations": recs, "count": len(recs)}, indent=2)
+        with METRICS.phase("validation"):
+            # sort_keys gives a canonical form with the same length as a plain dump.
+            raw = json.dumps(finding, sort_keys=True)
+            if len(raw) > MAX_INPUT_SIZE:
+                return json.dumps({"error": "Input too large", "max_bytes": MAX_INPUT_SIZE})
+
+            error = _check_top_k(top_k)
+            if error:
+                return json.dumps(error)
+
+        compact = _use_compact(compact)
+        catalog = CATALOG_STORE.current()
+        key = content_key(f"{catalog.fingerprint}:{'compact' if compact else 'pretty'}:{top_k}", raw)
+        cached = RESULT_CACHE.get(key)
+        if cached is not None:
+            _audit_recommendation("recommend_fis_experiments", raw, cached, top_k=top_k, cached=True)
+            return cached
+
+        with METRICS.phase("validation"):
+            error = _check_finding(finding, raw)
+            if error:
+                return json.dumps(error)
+        with METRICS.phase("matching"):
+            if top_k is None:
+                keys = _matched_keys(finding, catalog)
+            else:
+                recs = _rank([finding], catalog, top_k)[0]
+        with METRICS.phase("serialization"):
+            if top_k is None:
+                response = render_recommendations(catalog, keys, compact)
+            else:
+                response = _dumps({"recommendations": recs, "count": len(recs)}, compact)
+        RESULT_CACHE.put(key, response)
+        _audit_recommendation("recommend_fis_experiments", raw, response, top_k=top_k, cached=False)
+        return response
+    except ImportError:
+        return json.dumps({"error": "Ranking is unavailable: numpy is not installed"})
+    except (TypeError, ValueError) as e:
+        return json.dumps({"error": f"Invalid input: {str(e)}"})
+
+
+@mcp.tool()
+@METRICS.instrument
+def recommend_fis_experiments_batch(
+    findings: list[dict], compact: bool | None = None, top_k: int | None = None
+) -> str:
+    """Recommend FIS experiments for a list of findings in a single call. Set compact=true for non-indented JSON.
+    Set top_k to rank each finding's recommendations by relevance and return the best k with scores"""
+    try:
+        with METRICS.phase("validation"):
+            error = _check_top_k(top_k)
+            if error:
+                return json.dumps(error)
+            if not findings:
+                return json.dumps({"error": "findings must be a non-empty list"})
+            if len(findings) > MAX_BATCH_FINDINGS:
+                return json.dumps({"error": "Too many findings", "max_findings": MAX_BATCH_FINDINGS})
+
+            # Serialize everything first so an oversized batch is rejected before any matching work.
+            raws = [json.dumps(finding) for finding in findings]
+            total = sum(len(raw) for raw in raws)
+            if total > MAX_BATCH_INPUT_SIZE:
+                return json.dumps({"error": "Batch too large", "max_bytes": MAX_BATCH_INPUT_SIZE})
+
+        catalog = CATALOG_STORE.current()
+        # Per-finding checks are cheap next to matching, so they are timed with it.
+        with METRICS.phase("matching"):
+            if top_k is None:
+                results = [
+                    {"index": i, **_recommend(finding, raw, catalog)}
+                    for i, (finding, raw) in enumerate(zip(findings, raws))
+                ]
+            else:
+                results = [
+                    {"index": i, **(_check_finding(finding, raw) or {})}
+                    for i, (finding, raw) in enumerate(zip(findings, raws))
+                ]
+                valid = [r["index"] for r in results if "error" not in r]
+                for i, recs in zip(valid, _rank([findings[i] for i in valid], catalog, top_k)):
+                    results[i].update({"recommendations": recs, "count": len(recs)})
+        with METRICS.phase("serialization"):
+            response = _dumps({"results": results, "count": len(results)}, _use_compact(compact))
+        if AUDIT.enabled:
+            _audit_recommendation("recommend_fis_experiments_batch", f"[{','.join(raws)}]", response, top_k=top_k)
+        return response
+    except ImportError:
+        return json.dumps({"error": "Ranking is unavailable: numpy is not installed"})
     except (TypeError, ValueError) as e:
         return json.dumps({"error": f"Invalid input: {str(e)}"})
 
 
 @mcp.tool()
-def create_fis_template(recommendation: dict, target: dict) -> str:
-    """Create FIS experiment template in AWS account"""
-    import boto3
+@METRICS.instrument
+def get_server_stats() -> str:
+    """Report recommendation cache counters, AWS client construction timings, template reuse and startup timeline"""
+    return json.dumps({
+        "recommendation_cache": RESULT_CACHE.stats(),
+        "aws_clients": AWS_CLIENTS.stats(),
+        "templates": TEMPLATE_INDEX.stats(),
+        "fis_rate_limiter": FIS_RATE_LIMITER.stats(),
+        "aws_executor": AWS_EXECUTOR.stats(),
+        "assumed_roles": ASSUME_ROLE_CACHE.stats() if ASSUME_ROLE_CACHE else None,
+        "startup_ms": TIMELINE.snapshot(),
+        "tracing": TRACER.stats(),
+        "create_single_flight": CREATE_FLIGHTS.stats(),
+        "profiler": PROFILER.stats(),
+        "admission": ADMISSION.stats(),
+        "request_body_limits": BODY_LIMITS.stats(),
+        "audit": AUDIT.stats(),
+    }, indent=2)
+
+
+def _build_template(recommendation: dict, target: dict, allowed_actions) -> tuple:
+    """Validate a recommendation/target pair. Returns (template, None) or (None, error payload)."""
+    action = recommendation.get("action", "")
+    if action not in allowed_actions:
+        return None, {"error": f"Action not allowed: {action}", "allowed": sorted(allowed_actions)}
+
+    duration = recommendation.get("duration", "")
+    if not _validate_duration(duration):
+        return None, {"error": f"Invalid duration: {duration}. Use PTxM format, max {MAX_DURATION_MINUTES} minutes"}
+
+    description = recommendation.get("description", "")
+    if not description or len(description) > 500:
+        return None, {"error": "description is required and must be <= 500 chars"}
+
+    role_arn = target.get("roleArn", "")
+    if not ROLE_ARN_PATTERN.match(role_arn):
+        return None, {"error": "Invalid roleArn format. Expected arn:aws:iam::<account>:role/<name>"}
+
+    # Ensure roleArn and stopConditionArn belong to the same account
+    stop_arn_raw = target.get("stopConditionArn", "")
+    if stop_arn_raw and stop_arn_raw.count(":") >= 5:
+        role_account = role_arn.split(":")[4]
+        stop_account = stop_arn_raw.split(":")[4]
+        if role_account != stop_account:
+            return None, {"error": "roleArn and stopConditionArn must belong to the same AWS account"}
+
+    selection_mode = target.get("selectionMode", "COUNT(1)")
+    if not ALLOWED_SELECTION_MODES.match(selection_mode):
+        return None, {"error": f"Invalid selectionMode: {selection_mode}. Use COUNT(n) or PERCENT(n)"}
 
+    tags = target.get("tags", {})
+    if not tags:
+        return None, {"error": "tags are required to scope the target. Empty tags would match all resources"}
+
+    stop_condition_arn = target.get("stopConditionArn", "")
+    if not stop_condition_arn:
+        return None, {"error": "stopConditionArn is required. Provide a CloudWatch alarm ARN as a safety guardrail"}
+    if not STOP_CONDITION_ARN_PATTERN.match(stop_condition_arn):
+        return None, {"error": "Invalid stopConditionArn format. Expected arn:aws:cloudwatch:<region>:<account>:alarm:<name>"}
+
+    template = {
+        "description": description[:500],
+        "actions": {
+            "action1": {
+                "actionId": action,
+                "parameters": {"duration": duration},
+                "targets": {"Instances": "target1"},
+            }
+        },
+        "targets": {
+            "target1": {
+                "resourceType": target.get("resourceType", "aws:ec2:instance"),
+                "selectionMode": selection_mode,
+                "resourceTags": tags,
+            }
+        },
+        "stopConditions": [{"source": "aws:cloudwatch:alarm", "value": stop_condition_arn}],
+        "roleArn": role_arn,
+    }
+    return template, None
+
+
+def _build_composite_template(
+    recommendations: list, targets: list, description: str, sequential: bool, allowed_actions
+) -> tuple:
+    """Merge validated recommendation/target pairs into one multi-action template.
+
+    Action i runs against target i. recommendations[i].startAfter may list indices of earlier
+    actions to wait for; sequential=True chains every action after the previous one.
+    Returns (template, None) or (None, error payload listing every invalid step).
+    """
+    if not recommendations or len(recommendations) != len(targets):
+        return None, {"error": "recommendations and targets must be non-empty lists of the same length"}
+    if len(recommendations) > MAX_COMPOSITE_ACTIONS:
+        return None, {"error": "Too many actions", "max_actions": MAX_COMPOSITE_ACTIONS}
+
+    errors, parts = [], []
+    for i, (recommendation, target) in enumerate(zip(recommendations, targets)):
+        part, error = _build_template(recommendation, target, allowed_actions)
+        if error:
+            errors.append({"index": i, **error})
+            continue
+        start_after = recommendation.get("startAfter", [])
+        if not isinstance(start_after, list) or not all(
+            isinstance(j, int) and not isinstance(j, bool) and 0 <= j < i for j in start_after
+        ):
+            errors.append({"index": i, "error": "startAfter must list indices of earlier actions"})
+            continue
+        if sequential and i:
+            start_after = sorted(set(start_after) | {i - 1})
+        parts.append((part, start_after))
+    if errors:
+        return None, {"error": "Validation failed", "results": errors}
+
+    role_arns = {part["roleArn"] for part, _ in parts}
+    if len(role_arns) > 1:
+        return None, {"error": "All targets must use the same roleArn"}
+
+    actions, target_defs, target_keys, stop_conditions = {}, {}, {}, []
+    for i, (part, start_after) in enumerate(parts):
+        target_def = part["targets"]["target1"]
+        # Identical targets are declared once and shared by the actions that use them.
+        target_key = target_keys.setdefault(canonical_key("target", target_def), f"target{len(target_keys) + 1}")
+        target_defs[target_key] = target_def
+        action = {**part["actions"]["action1"], "targets": {"Instances": target_key}}
+        if start_after:
+            action["startAfter"] = [f"action{j + 1}" for j in start_after]
+        actions[f"action{i + 1}"] = action
+        for condition in part["stopConditions"]:
+            if condition not in stop_conditions:
+                stop_conditions.append(condition)
+
+    description = description or "; ".join(part["description"] for part, _ in parts)
+    template = {
+        "description": description[:500],
+        "actions": actions,
+        "targets": target_defs,
+        "stopConditions": stop_conditions,
+        "roleArn": role_arns.pop(),
+    }
+    return template, None
+
+
+def _create_template(template: dict) -> dict:
+    """Blocking FIS work for one validated template; runs on AWS_EXECUTOR, never on the event loop."""
+    if ASSUME_ROLE_CACHE is None:
+        fis = AWS_CLIENTS.get("fis")
+        return TEMPLATE_INDEX.create_or_reuse(fis, template, scope=fis.meta.region_name)
+    account = template["roleArn"].split(":")[4]
+    # One client per account; its credentials follow ASSUME_ROLE_CACHE's refreshes.
+    fis = AWS_CLIENTS.get("fis", credentials=ASSUME_ROLE_CACHE.credentials(account), identity=account)
+    return TEMPLATE_INDEX.create_or_reuse(fis, template, scope=f"{account}:{fis.meta.region_name}")
+
+
+async def _create_and_audit(tool: str, template: dict) -> dict:
+    result = await call_with_backoff_async(lambda: AWS_EXECUTOR.run(_create_template, template), FIS_RATE_LIMITER)
+    _audit_created(tool, template, result)
+    return result
+
+
+async def _create_paced(tool: str, template: dict) -> dict:
+    """Create or reuse template on AWS_EXECUTOR, paced by FIS_RATE_LIMITER and retried when FIS throttles.
+
+    Every create tool goes through here, so they all draw on the same token bucket and its throttling
+    feedback. Limiter and backoff waits stay on the event loop; only the FIS work takes a thread.
+    Identical concurrent calls share one flight, which writes one audit record under the first caller's tool.
+    """
+    return await CREATE_FLIGHTS.do(template_hash(template), _create_and_audit, tool, template)
+
+
+@mcp.tool()
+@METRICS.instrument
+@ADMISSION.guard
+async def create_fis_template(recommendation: dict, target: dict) -> str:
+    """Create FIS experiment template in AWS account. Identical requests return the existing template"""
     try:
-        action = recommendation.get("action", "")
-        if action not in ALLOWED_ACTIONS:
-            return json.dumps({"error": f"Action not allowed: {action}", "allowed": sorted(ALLOWED_ACTIONS)})
-
-        duration = recommendation.get("duration", "")
-        if not _validate_duration(duration):
-            return json.dumps({"error": f"Invalid duration: {duration}. Use PTxM format, max {MAX_DURATION_MINUTES} minutes"})
-
-        description = recommendation.get("description", "")
-        if not description or len(description) > 500:
-            return json.dumps({"error": "description is required and must be <= 500 chars"})
-
-        role_arn = target.get("roleArn", "")
-        if not ROLE_ARN_PATTERN.match(role_arn):
-            return json.dumps({"error": "Invalid roleArn format. Expected arn:aws:iam::<account>:role/<name>"})
-
-        # Ensure roleArn and stopConditionArn belong to the same account
-        stop_arn_raw = target.get("stopConditionArn", "")
-        if stop_arn_raw and stop_arn_raw.count(":") >= 5:
-            role_account = role_arn.split(":")[4]
-            stop_account = stop_arn_raw.split(":")[4]
-            if role_account != stop_account:
-                return json.dumps({"error": "roleArn and stopConditionArn must belong to the same AWS account"})
-
-        selection_mode = target.get("selectionMode", "COUNT(1)")
-        if not ALLOWED_SELECTION_MODES.match(selection_mode):
-            return json.dumps({"error": f"Invalid selectionMode: {selection_mode}. Use COUNT(n) or PERCENT(n)"})
-
-        tags = target.get("tags", {})
-        if not tags:
-            return json.dumps({"error": "tags are required to scope the target. Empty tags would match all resources"})
-
-        stop_condition_arn = target.get("stopConditionArn", "")
-        if not stop_condition_arn:
-            return json.dumps({"error": "stopConditionArn is required. Provide a CloudWatch alarm ARN as a safety guardrail"})
-        if not STOP_CONDITION_ARN_PATTERN.match(stop_condition_arn):
-            return json.dumps({"error": "Invalid stopConditionArn format. Expected arn:aws:cloudwatch:<region>:<account>:alarm:<name>"})
-
-        template = {
-            "description": description[:500],
-            "actions": {
-                "action1": {
-                    "actionId": action,
-                    "parameters": {"duration": duration},
-                    "targets": {"Instances": "target1"},
-                }
-            },
-            "targets": {
-                "target1": {
-                    "resourceType": target.get("resourceType", "aws:ec2:instance"),
-                    "selectionMode": selection_mode,
-                    "resourceTags": tags,
-                }
-            },
-            "stopConditions": [{"source": "aws:cloudwatch:alarm", "value": stop_condition_arn}],
-            "roleArn": role_arn,
-        }
-        fis = boto3.client("fis")
-        resp = fis.create_experiment_template(**template)
-        return json.dumps(
-            {"templateId": resp["experimentTemplate"]["id"], "arn": resp["experimentTemplate"]["arn"]},
-            indent=2,
-        )
+        with METRICS.phase("validation"):
+            template, error = _build_template(recommendation, target, CATALOG_STORE.current().allowed_actions)
+            if error:
+                return json.dumps(error)
+        with METRICS.phase("aws_call"):
+            result = await _create_paced("create_fis_template", template)
+        with METRICS.phase("serialization"):
+            return json.dumps(result, indent=2)
     except (KeyError, TypeError, ValueError) as e:
         return json.dumps({"error": f"Invalid input: {str(e)}"})
     except Exception:
         return json.dumps({"error": "Failed to create FIS template. Check IAM permissions and input parameters."})
 
 
+@mcp.tool()
+@METRICS.instrument
+@ADMISSION.guard
+async def create_fis_templates_batch(items: list[dict]) -> str:
+    """Create many FIS experiment templates in one call. Each item is {"recommendation": {...}, "target": {...}}.
+    All items are validated before any template is created"""
+    try:
+        with METRICS.phase("validation"):
+            if not items:
+                return json.dumps({"error": "items must be a non-empty list"})
+            if len(items) > MAX_TEMPLATE_BATCH:
+                return json.dumps({"error": "Too many items", "max_items": MAX_TEMPLATE_BATCH})
+
+            allowed_actions = CATALOG_STORE.current().allowed_actions
+            templates, errors = [], []
+            for i, item in enumerate(items):
+                template, error = _build_template(
+                    item.get("recommendation") or {}, item.get("target") or {}, allowed_actions
+                )
+                templates.append(template)
+                if error:
+                    errors.append({"index": i, **error})
+            if errors:
+                return json.dumps({"error": "Validation failed; no templates were created", "results": errors}, indent=2)
+
+        # Each batch holds at most TEMPLATE_BATCH_WORKERS executor slots, leaving room for single creates.
+        slots = asyncio.Semaphore(TEMPLATE_BATCH_WORKERS)
+
+        async def create(i, template):
+            async with slots:
+                try:
+                    with METRICS.phase("aws_call"):
+                        result = await _create_paced("create_fis_templates_batch", template)
+                    return {"index": i, **result}
+                except Exception:
+                    return {"index": i, "error": "Failed to create FIS template. Check IAM permissions and input parameters."}
+
+        results = await asyncio.gather(*(create(i, template) for i, template in enumerate(templates)))
+        failed = sum(1 for r in results if "error" in r)
+        with METRICS.phase("serialization"):
+            return json.dumps({"results": results, "count": len(results), "failed": failed}, indent=2)
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        return json.dumps({"error": f"Invalid input: {str(e)}"})
+    except Exception:
+        return json.dumps({"error": "Failed to create FIS templates. Check IAM permissions and input parameters."})
+
+
+@mcp.tool()
+@METRICS.instrument
+@ADMISSION.guard
+async def create_fis_composite_template(
+    recommendations: list[dict], targets: list[dict], description: str = "", sequential: bool = False
+) -> str:
+    """Create one FIS experiment template with several actions. Action i runs against targets[i];
+    set recommendations[i].startAfter to indices of earlier actions, or sequential=true to chain them all"""
+    try:
+        with METRICS.phase("validation"):
+            if len(description) > 500:
+                return json.dumps({"error": "description must be <= 500 chars"})
+            template, error = _build_composite_template(
+                recommendations, targets, description, sequential, CATALOG_STORE.current().allowed_actions
+            )
+            if error:
+                return json.dumps(error)
+        with METRICS.phase("aws_call"):
+            result = await _create_paced("create_fis_composite_template", template)
+        with METRICS.phase("serialization"):
+            return json.dumps(
+                {**result, "actions": len(template["actions"]), "targets": len(template["targets"])}, indent=2
+            )
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        return json.dumps({"error": f"Invalid input: {str(e)}"})
+    except Exception:
+        return json.dumps({"error": "Failed to create FIS template. Check IAM permissions and input parameters."})
+
+
+PROFILE_ACTIONS = ("start", "stop", "stats", "collapsed", "dump", "reset")
+
+
+def _dump_profile():
+    """Write this worker's profile to <PROFILE_FILE>-<pid>.prof/.collapsed; the paths, or None if empty."""
+    base = f"{PROFILE_FILE}-{os.getpid()}"
+    if not PROFILER.dump(f"{base}.prof"):
+        return None
+    with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+        f.write(PROFILER.collapsed())
+    return [f"{base}.prof", f"{base}.collapsed"]
+
+
+def profile_server(token: str, action: str = "stats", sample_rate: float | None = None, limit: int = 30) -> str:
+    """Control the sampling profiler of the worker that answers (requires the admin token). action is one of:
+    start (profile sample_rate of tool calls), stop, stats (top `limit` functions by cumulative time),
+    collapsed (flamegraph-ready collapsed stacks), dump (write .prof and .collapsed files) or reset.
+    With several workers each call reaches one of them; the response names it in `worker`"""
+    if not ADMIN_TOKEN or not isinstance(token, str) or not hmac.compare_digest(
+        token.encode(), ADMIN_TOKEN.encode()
+    ):
+        return json.dumps({"error": "Unauthorized"})
+    if action not in PROFILE_ACTIONS:
+        return json.dumps({"error": f"Invalid action: {action}", "allowed": list(PROFILE_ACTIONS)})
+
+    result = {}
+    if action == "start":
+        if isinstance(sample_rate, bool) or not isinstance(sample_rate, (int, float)) or not 0 < sample_rate <= 1:
+            return json.dumps({"error": "sample_rate must be a number in (0, 1]"})
+        PROFILER.sample_rate = float(sample_rate)
+    elif action == "stop":
+        PROFILER.sample_rate = 0.0
+    elif action == "reset":
+        PROFILER.reset()
+    elif action == "stats":
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+            return json.dumps({"error": "limit must be a positive integer"})
+        result["table"] = PROFILER.table(limit)
+    elif action == "collapsed":
+        result["collapsed"] = PROFILER.collapsed()
+    else:
+        files = _dump_profile()
+        if files is None:
+            return json.dumps({"error": "Nothing has been profiled yet", "worker": os.getpid()})
+        result["files"] = files
+    return json.dumps({"worker": os.getpid(), "workers": WORKERS, "profiler": PROFILER.stats(), **result}, indent=2)
+
+
+# The admin tool is only listed when a token is configured.
+if ADMIN_TOKEN:
+    mcp.tool()(profile_server)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request):
+    """Prometheus scrape endpoint for every worker's tool metrics, labelled by worker."""
+    from starlette.responses import PlainTextResponse
+
+    return PlainTextResponse(METRICS.render(METRICS_EXCHANGE.peers()), media_type="text/plain; version=0.0.4")
+
+
+TIMELINE.mark("app_ready")
+
+# boto3 and numpy are imported on first use; once each worker has started they are loaded in the background.
+PREWARM = os.environ.get("FIS_PREWARM", "1").lower() not in ("0", "false", "no")
+STARTUP_PROFILE = os.environ.get("FIS_STARTUP_PROFILE", "").lower() in ("1", "true", "yes")
+
+
+def _prewarm_steps() -> list:
+    steps = [("fis_client", lambda: AWS_CLIENTS.get("fis"))]
+    if ASSUME_ROLE_CACHE is not None:
+        steps.append(("sts_client", lambda: AWS_CLIENTS.get("sts")))
+    steps.append(("ranker", lambda: get_ranker(CATALOG_STORE.current())))
+    return steps
+
+
+def _log_startup(event: str):
+    if STARTUP_PROFILE:
+        logger.warning("Startup profile at %s: %s", event, json.dumps(TIMELINE.snapshot()))
+
+
+def _shutdown():
+    """Let in-flight AWS calls finish and stop background threads; runs after uvicorn drains requests."""
+    AWS_EXECUTOR.shutdown(wait=True)
+    if ASSUME_ROLE_CACHE is not None:
+        ASSUME_ROLE_CACHE.stop()
+    if hasattr(TRACER.exporter, "close"):
+        TRACER.exporter.close()
+    AUDIT.close()
+    METRICS_EXCHANGE.stop()
+    # Every worker that profiled anything leaves its per-pid files, so FIS_PROFILE_SAMPLE_RATE profiles them all.
+    try:
+        _dump_profile()
+    except OSError:
+        logger.warning("Could not write the profile on shutdown", exc_info=True)
+
+
+def _on_started():
+    _log_startup("listening")
+    METRICS_EXCHANGE.start()
+    if PREWARM:
+        prewarm(_prewarm_steps(), TIMELINE)
+
+
+def create_app():
+    """ASGI app factory; uvicorn calls it once in every worker process."""
+    return StartupMiddleware(
+        TracingMiddleware(BodySizeLimitMiddleware(mcp.streamable_http_app(), BODY_LIMITS), TRACER), TIMELINE,
+        on_started=_on_started, on_first=lambda: _log_startup("first request"), on_shutdown=_shutdown,
+    )
+
+
+def main():
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="FIS Recommender MCP server (streamable HTTP)")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="worker processes sharing the port (default: MCP_WORKERS or the usable CPU count)")
+    args = parser.parse_args()
+
+    options = dict(
+        host=mcp.settings.host, port=mcp.settings.port, log_level=mcp.settings.log_level.lower(),
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_SECONDS,
+    )
+    if args.workers <= 1:
+        # The limiter was sized for WORKERS processes at import; this one is now the whole server.
+        global FIS_RATE_LIMITER
+        FIS_RATE_LIMITER = _create_rate_limiter(1)
+        uvicorn.run(create_app(), **options)
+    else:
+        # Workers import this module afresh; MCP_WORKERS tells them how many share the rate limits,
+        # and FIS_METRICS_DIR where they exchange metrics.
+        os.environ["MCP_WORKERS"] = str(args.workers)
+        metrics_dir = os.environ.get("FIS_METRICS_DIR")
+        if not metrics_dir:
+            os.environ["FIS_METRICS_DIR"] = tempfile.mkdtemp(prefix="fis-mcp-metrics-")
+        try:
+            uvicorn.run("server:create_app", factory=True, workers=args.workers, **options)
+        finally:
+            if not metrics_dir:
+                shutil.rmtree(os.environ["FIS_METRICS_DIR"], ignore_errors=True)
+
+
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http")
+    main()
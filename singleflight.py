@@ -0,0 +1,39 @@
+"""Coalescing of identical concurrent async calls.
+
+SingleFlight.do(key, fn) runs fn once per key at a time: callers that
+arrive while a call for the same key is in flight await that call instead
+of starting their own, and all of them get its result (or its exception).
+The shared call runs as its own task, so a caller that is cancelled does
+not cancel it for the others. Results are shared objects; treat them as
+read-only.
+"""
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs), or the in-flight call already running for key."""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved even if every caller was cancelled before it arrived.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
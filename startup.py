@@ -0,0 +1,97 @@
+"""Cold-start timeline and background prewarming.
+
+server.py imports this module first and marks each startup phase on
+TIMELINE (module imports, app construction, app startup, first request), so a
+cold start can be broken down from get_server_stats or, with
+FIS_STARTUP_PROFILE=1, from the log. Offsets are milliseconds since this
+module was imported; interpreter start-up before that is not included.
+
+Heavy dependencies that only some tools need (boto3, numpy) are imported on
+first use. prewarm() loads them on a background thread once the server is
+listening, so the first request that needs them usually finds them ready
+without having delayed the server's first response.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimeline:
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._origin = clock()
+        self._marks = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name: str) -> float:
+        """Record name at the current offset; later marks of the same name are ignored."""
+        offset = (self._clock() - self._origin) * 1000
+        with self._lock:
+            return self._marks.setdefault(name, round(offset, 2))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._marks)
+
+
+class StartupMiddleware:
+    """ASGI wrapper that marks lifespan startup ("listening") and the first HTTP request.
+
+    on_started runs once the wrapped app has finished starting, on_first with the
+    first HTTP request and on_shutdown after the app has shut down. Under
+    multiple workers each process runs its own copy of these hooks.
+    """
+
+    def __init__(self, app, timeline: StartupTimeline, on_started=None, on_first=None, on_shutdown=None):
+        self.app = app
+        self._timeline = timeline
+        self._on_started = on_started
+        self._on_first = on_first
+        self._on_shutdown = on_shutdown
+        self._seen = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.app(scope, receive, self._lifespan_send(send))
+            return
+        if not self._seen and scope["type"] == "http":
+            self._seen = True
+            self._timeline.mark("first_request")
+            if self._on_first:
+                self._on_first()
+        await self.app(scope, receive, send)
+
+    def _lifespan_send(self, send):
+        async def wrapped(message):
+            if message["type"] == "lifespan.shutdown.complete" and self._on_shutdown:
+                self._on_shutdown()
+            await send(message)
+            if message["type"] == "lifespan.startup.complete":
+                self._timeline.mark("listening")
+                if self._on_started:
+                    self._on_started()
+        return wrapped
+
+
+def prewarm(steps, timeline: StartupTimeline) -> threading.Thread:
+    """Run each (name, fn) in steps on a daemon thread, marking prewarm:<name> as each finishes.
+
+    A failing step is logged and skipped; the request that needs it will retry inline.
+    """
+    def run():
+        for name, fn in steps:
+            try:
+                fn()
+            except Exception as e:
+                logger.info("Prewarm step %s skipped: %s", name, e)
+                continue
+            timeline.mark(f"prewarm:{name}")
+
+    thread = threading.Thread(target=run, name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+TIMELINE = StartupTimeline()
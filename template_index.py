@@ -0,0 +1,129 @@
+"""Idempotent FIS template creation.
+
+Every template created by the server is tagged with a content hash of its
+normalized definition. Before creating a template, the index looks the hash
+up (seeding itself once per scope from list_experiment_templates) and returns
+the existing template instead. The hash doubles as the FIS clientToken, so
+identical requests racing from different processes still produce one
+template; within a process they are serialized on a per-hash lock and the
+second caller finds the first one's result in the index.
+
+Listing, reading and tagging templates need fis:ListExperimentTemplates,
+fis:GetExperimentTemplate and fis:TagResource. When a list or get call is
+refused, the index falls back to a plain create (the clientToken still
+dedups) and a scope whose seed failed is not listed again.
+"""
+import logging
+import threading
+
+from cache import canonical_key
+
+logger = logging.getLogger(__name__)
+
+HASH_TAG_KEY = "fis-mcp:content-hash"
+
+
+def template_hash(template: dict) -> str:
+    return canonical_key("fis-template", template)
+
+
+class TemplateIndex:
+    def __init__(self, lock_stripes: int = 64):
+        self._entries = {}
+        self._seeded = set()
+        # One listing per scope, however many first creates for it arrive at once.
+        self._seed_locks = {}
+        # Bumped when an indexed template turns out to be deleted, so its re-create gets a fresh clientToken.
+        self._generations = {}
+        self._lock = threading.Lock()
+        # Identical requests always land on the same stripe, so they collapse into one API call.
+        self._stripes = [threading.Lock() for _ in range(lock_stripes)]
+        self.created = 0
+        self.reused = 0
+        self.seed_errors = 0
+        self.lookup_errors = 0
+
+    def _seed(self, fis, scope: str):
+        found = {}
+        try:
+            for page in fis.get_paginator("list_experiment_templates").paginate():
+                for summary in page.get("experimentTemplates", []):
+                    digest = summary.get("tags", {}).get(HASH_TAG_KEY)
+                    if digest:
+                        found[(scope, digest)] = {"templateId": summary["id"], "arn": summary.get("arn", "")}
+        except fis.exceptions.ClientError:
+            # Typically AccessDenied without fis:ListExperimentTemplates. The scope is still marked seeded,
+            # so later creates don't repeat the listing; they dedup through clientToken alone.
+            logger.warning("Could not list FIS templates for %s; creating without the index", scope, exc_info=True)
+            with self._lock:
+                self.seed_errors += 1
+        with self._lock:
+            for key, entry in found.items():
+                self._entries.setdefault(key, entry)
+            self._seeded.add(scope)
+
+    def _ensure_seeded(self, fis, scope: str):
+        if scope in self._seeded:
+            return
+        with self._lock:
+            seed_lock = self._seed_locks.setdefault(scope, threading.Lock())
+        with seed_lock:
+            if scope not in self._seeded:
+                self._seed(fis, scope)
+
+    def _existing(self, fis, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        try:
+            fis.get_experiment_template(id=entry["templateId"])
+        except fis.exceptions.ResourceNotFoundException:
+            # Deleted outside the server; forget it and create a fresh one.
+            with self._lock:
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+            return None
+        except fis.exceptions.ClientError:
+            # Can't confirm it still exists; the create below returns it again through its clientToken.
+            logger.warning("Could not read FIS template %s", entry["templateId"], exc_info=True)
+            with self._lock:
+                self.lookup_errors += 1
+            return None
+        return entry
+
+    def create_or_reuse(self, fis, template: dict, scope: str = "default") -> dict:
+        """Return {"templateId", "arn"} for template, creating it only if no identical one exists.
+
+        scope separates indexes for different accounts/regions sharing this process.
+        """
+        digest = template_hash(template)
+        key = (scope, digest)
+        self._ensure_seeded(fis, scope)
+        with self._stripes[hash(key) % len(self._stripes)]:
+            entry = self._existing(fis, key)
+            if entry is not None:
+                with self._lock:
+                    self.reused += 1
+                return {**entry, "reused": True}
+
+            # A token FIS has already seen would return the deleted template again.
+            generation = self._generations.get(key, 0)
+            resp = fis.create_experiment_template(
+                clientToken=f"{digest}-{generation}" if generation else digest,
+                tags={HASH_TAG_KEY: digest},
+                **template,
+            )
+            entry = {"templateId": resp["experimentTemplate"]["id"], "arn": resp["experimentTemplate"]["arn"]}
+            with self._lock:
+                self._entries[key] = entry
+                self.created += 1
+            return entry
+
+    def stats(self) -> dict:
+        return {
+            "templates": len(self._entries),
+            "created": self.created,
+            "reused": self.reused,
+            "seed_errors": self.seed_errors,
+            "lookup_errors": self.lookup_errors,
+        }
@@ -0,0 +1,133 @@
+"""
+Unit tests for per-tool admission control and load shedding.
+Run: python -m pytest test_admission.py -v
+"""
+import asyncio
+import json
+
+import pytest
+
+import server
+from admission import AdmissionController, Overloaded, ToolGate, parse_limits
+
+
+def _controller(limit, max_queue, max_wait=1.0):
+    return AdmissionController({"tool": (limit, max_queue, max_wait)})
+
+
+def test_calls_beyond_limit_queue_in_order_and_overflow_is_shed():
+    controller = _controller(limit=2, max_queue=2)
+    release = asyncio.Event()
+    order = []
+
+    async def tool(i):
+        order.append(i)
+        await release.wait()
+        return str(i)
+
+    guarded = controller.guard(tool)
+
+    async def drive():
+        calls = [asyncio.ensure_future(guarded(i)) for i in range(5)]
+        await asyncio.sleep(0.01)
+        gate = controller.gates["tool"].stats()
+        release.set()
+        return gate, await asyncio.gather(*calls)
+
+    gate, results = asyncio.run(drive())
+    assert (gate["active"], gate["queued"]) == (2, 2)
+    assert results[:4] == ["0", "1", "2", "3"]
+    shed = json.loads(results[4])
+    assert (shed["error"], shed["reason"]) == ("Server overloaded", "queue_full")
+    assert shed["retry_after_ms"] >= 1
+    assert order == [0, 1, 2, 3]
+    stats = controller.stats()["tool"]
+    assert (stats["active"], stats["queued"], stats["admitted"], stats["shed"]) == (0, 0, 4, {"queue_full": 1})
+
+
+def test_expected_wait_from_observed_latency_sheds_before_queueing():
+    controller = _controller(limit=1, max_queue=10, max_wait=0.5)
+    gate = controller.gates["tool"]
+    for _ in range(20):
+        gate.observe(0.4)
+
+    async def tool():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    guarded = controller.guard(tool)
+
+    async def drive():
+        return await asyncio.gather(*(guarded() for _ in range(3)))
+
+    results = asyncio.run(drive())
+    # One runs, one may wait ~0.4s, the third would wait ~0.8s > max_wait.
+    assert results[:2] == ["ok", "ok"]
+    shed = json.loads(results[2])
+    assert shed["reason"] == "expected_wait"
+    assert 700 <= shed["retry_after_ms"] <= 900
+
+
+def test_queued_call_gives_up_after_max_wait_and_slot_is_kept():
+    gate = ToolGate(limit=1, max_queue=5, max_wait=0.05, initial_latency=0.001)
+
+    async def drive():
+        await gate.acquire()
+        with pytest.raises(Overloaded) as timed_out:
+            await gate.acquire()
+        gate.release()
+        await gate.acquire()
+        gate.release()
+        return timed_out.value
+
+    error = asyncio.run(drive())
+    assert error.reason == "queue_timeout"
+    assert gate.stats()["active"] == 0 and gate.stats()["queued"] == 0
+
+
+def test_cancelled_waiter_releases_its_place():
+    gate = ToolGate(limit=1, max_queue=5, max_wait=5.0)
+
+    async def drive():
+        await gate.acquire()
+        waiter = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        gate.release()
+
+    asyncio.run(drive())
+    assert (gate.active, gate.stats()["queued"]) == (0, 0)
+
+
+def test_parse_limits_and_guard_rules():
+    assert parse_limits(" a=2:4:1500, b=1:0:100 ") == {"a": (2, 4, 1.5), "b": (1, 0, 0.1)}
+    assert parse_limits("") == {}
+    with pytest.raises(ValueError):
+        parse_limits("a=2:4")
+
+    def tool():
+        return ""
+
+    with pytest.raises(TypeError):
+        _controller(1, 1).guard(tool)
+
+    def other():
+        return ""
+
+    assert _controller(1, 1).guard(other) is other
+
+
+def test_create_tool_returns_overloaded_when_gate_is_full(monkeypatch):
+    gate = server.ADMISSION.gates["create_fis_template"]
+    monkeypatch.setattr(gate, "active", gate.limit)
+    monkeypatch.setattr(gate, "max_queue", 0)
+    result = json.loads(asyncio.run(server.create_fis_template({}, {})))
+    assert result["error"] == "Server overloaded" and result["retry_after_ms"] >= 1
+    assert 'error_class="server_overloaded"' in server.METRICS.render()
+
+
+def test_batches_leave_half_the_aws_executor_to_single_creates():
+    batch_slots = server.ADMISSION.gates["create_fis_templates_batch"].limit * server.TEMPLATE_BATCH_WORKERS
+    assert batch_slots <= max(server.TEMPLATE_BATCH_WORKERS, server.AWS_MAX_CONCURRENCY // 2)
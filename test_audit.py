@@ -0,0 +1,170 @@
+"""
+Unit tests for the asynchronous audit sink.
+Run: python -m pytest test_audit.py -v
+"""
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+
+import server
+from audit import AuditSink
+from aws_clients import ClientCache
+from fake_fis import FakeFisServer
+from singleflight import SingleFlight
+from template_index import TemplateIndex
+
+
+def _read(sink):
+    lines = []
+    for path in sink.files():
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            lines += [json.loads(line) for line in f]
+    return lines
+
+
+def _blocked(sink):
+    """Hold the writer inside its first batch until the returned event is set."""
+    release = threading.Event()
+    write = sink._write
+
+    def slow_write(batch):
+        release.wait(5)
+        write(batch)
+
+    sink._write = slow_write
+    return release
+
+
+def test_records_are_batched_compressed_and_decoded(tmp_path):
+    sink = AuditSink(str(tmp_path), flush_interval=0.01)
+    for i in range(5):
+        response = json.dumps({"count": i, "items": ["a\nb"]}, indent=2)
+        assert sink.record("recommendation", {"n": i}, {"finding": json.dumps({"id": i}), "response": response})
+    sink.close()
+    records = _read(sink)
+    assert [r["n"] for r in records] == [0, 1, 2, 3, 4]
+    assert records[0]["event"] == "recommendation"
+    assert records[1]["finding"] == {"id": 1} and records[1]["response"] == {"count": 1, "items": ["a\nb"]}
+    assert sink.files()[0].endswith(".jsonl.gz")
+    assert sink.stats()["written"] == 5 and sink.stats()["dropped"] == 0
+
+
+def test_drop_policy_counts_records_that_do_not_fit(tmp_path):
+    sink = AuditSink(str(tmp_path), max_queue=2, flush_interval=0.01, policy="drop")
+    release = _blocked(sink)
+    results = [sink.record("e", {"n": i}) for i in range(6)]
+    time.sleep(0.05)
+    release.set()
+    sink.close()
+    written, dropped = sink.stats()["written"], sink.stats()["dropped"]
+    assert results.count(False) == dropped > 0
+    assert written + dropped == 6
+
+
+def test_block_policy_waits_for_room_then_drops(tmp_path):
+    sink = AuditSink(str(tmp_path), max_queue=1, flush_interval=0.01, policy="block", block_timeout=0.05)
+    release = _blocked(sink)
+    sink.record("e", {"n": 0})
+    time.sleep(0.05)  # the writer has taken the first record and is stuck writing it
+    assert sink.record("e", {"n": 1})
+    started = time.perf_counter()
+    assert not sink.record("e", {"n": 2})
+    assert time.perf_counter() - started >= 0.05
+    release.set()
+    sink.close()
+    assert [r["n"] for r in _read(sink)] == [0, 1]
+    assert sink.stats()["dropped"] == 1
+
+
+def test_files_rotate_and_old_ones_are_removed(tmp_path):
+    sink = AuditSink(str(tmp_path), batch_size=1, max_file_bytes=1, max_files=3, compress=False, flush_interval=0.01)
+    release = _blocked(sink)
+    for i in range(6):
+        sink.record("e", {"n": i})
+    release.set()
+    sink.close()
+    files = sink.files()
+    assert len(files) == 3 and all(path.endswith(".jsonl") for path in files)
+    assert [r["n"] for r in _read(sink)] == [3, 4, 5]
+
+
+def test_pruning_counts_files_left_by_other_processes(tmp_path):
+    old = tmp_path / "audit-1-20240101T000000Z-0001.jsonl"
+    old.write_text('{"n":-1}\n')
+    os.utime(old, (1, 1))
+    sink = AuditSink(str(tmp_path), batch_size=1, max_file_bytes=1, max_files=2, compress=False, flush_interval=0.01)
+    release = _blocked(sink)
+    for i in range(2):
+        sink.record("e", {"n": i})
+    release.set()
+    sink.close()
+    assert not old.exists()
+    assert [r["n"] for r in _read(sink)] == [0, 1]
+
+
+def test_disabled_sink_records_nothing():
+    sink = AuditSink()
+    assert not sink.record("e", {})
+    assert sink._thread is None and sink.files() == []
+
+
+def test_tools_audit_recommendations_and_created_templates(monkeypatch, tmp_path):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    sink = AuditSink(str(tmp_path), flush_interval=0.01)
+    monkeypatch.setattr(server, "AUDIT", sink)
+    finding = {"summary": "audit trail network latency check"}
+    first = server.recommend_fis_experiments(finding)
+    server.recommend_fis_experiments(finding)
+
+    recommendation = {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": "Audit test"}
+    target = {
+        "roleArn": "arn:aws:iam::123456789012:role/FISRole",
+        "tags": {"Env": "audit"},
+        "stopConditionArn": "arn:aws:cloudwatch:us-east-1:123456789012:alarm:test-alarm",
+    }
+    with FakeFisServer() as fake:
+        monkeypatch.setattr(server, "AWS_CLIENTS", ClientCache(endpoint_urls={"fis": fake.endpoint_url}))
+        monkeypatch.setattr(server, "TEMPLATE_INDEX", TemplateIndex())
+        monkeypatch.setattr(server, "ASSUME_ROLE_CACHE", None)
+        monkeypatch.setattr(server, "CREATE_FLIGHTS", SingleFlight())
+        created = json.loads(asyncio.run(server.create_fis_template(recommendation, target)))
+    sink.close()
+
+    recommended, again, template = _read(sink)
+    assert (recommended["event"], recommended["tool"], recommended["cached"]) == (
+        "recommendation", "recommend_fis_experiments", False)
+    assert recommended["finding"] == finding and recommended["response"] == json.loads(first)
+    assert again["cached"] is True
+    assert template["event"] == "template_created" and template["templateId"] == created["templateId"]
+    assert template["template"]["targets"]["target1"]["resourceTags"] == {"Env": "audit"}
+
+
+def test_coalesced_creates_write_one_record(monkeypatch, tmp_path):
+    sink = AuditSink(str(tmp_path), flush_interval=0.01)
+    monkeypatch.setattr(server, "AUDIT", sink)
+    monkeypatch.setattr(server, "CREATE_FLIGHTS", SingleFlight())
+
+    def create(template):
+        time.sleep(0.05)
+        return {"templateId": "EXT1", "arn": "arn"}
+
+    monkeypatch.setattr(server, "_create_template", create)
+    recommendation = {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": "Coalesced"}
+    target = {
+        "roleArn": "arn:aws:iam::123456789012:role/FISRole",
+        "tags": {"Env": "audit"},
+        "stopConditionArn": "arn:aws:cloudwatch:us-east-1:123456789012:alarm:test-alarm",
+    }
+
+    async def both():
+        return await asyncio.gather(*(server.create_fis_template(recommendation, target) for _ in range(2)))
+
+    assert all('"EXT1"' in result for result in asyncio.run(both()))
+    sink.close()
+    assert [r["event"] for r in _read(sink)] == ["template_created"]
@@ -0,0 +1,41 @@
+"""
+Unit tests for the shared boto3 client cache.
+Run: python -m pytest test_aws_clients.py -v
+"""
+import threading
+
+import pytest
+
+from aws_clients import ClientCache
+
+
+@pytest.fixture(autouse=True)
+def fake_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+def test_reuses_client_per_region_and_identity():
+    cache = ClientCache(max_pool_connections=4)
+    fis = cache.get("fis")
+    assert cache.get("fis") is fis
+    assert cache.get("fis", region="us-west-2") is not fis
+    assumed = {"AccessKeyId": "ASIAEXAMPLE", "SecretAccessKey": "x", "SessionToken": "y"}
+    assert cache.get("fis", credentials=assumed) is not fis
+    assert fis.meta.config.max_pool_connections == 4
+    assert cache.stats()["constructions"] == 3
+
+
+def test_concurrent_first_use_builds_once():
+    cache = ClientCache()
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(cache.get("fis"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(c) for c in clients}) == 1
+    stats = cache.stats()
+    assert stats["constructions"] == 1
+    assert stats["construction_seconds_total"] > 0
@@ -0,0 +1,53 @@
+"""
+Unit tests for the AWS call executor used by async tools.
+Run: python -m pytest test_aws_executor.py -v
+"""
+import asyncio
+import json
+import threading
+import time
+
+import server
+from aws_executor import AwsCallExecutor
+
+
+def test_slow_calls_do_not_block_the_loop():
+    executor = AwsCallExecutor(max_concurrency=2)
+    release = threading.Event()
+
+    async def scenario():
+        slow = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        await asyncio.sleep(0)
+        loop_latency = time.perf_counter() - started
+        stats = executor.stats()
+        release.set()
+        await asyncio.gather(*slow)
+        return loop_latency, stats
+
+    loop_latency, stats = asyncio.run(scenario())
+    assert loop_latency < 0.05
+    assert stats["in_flight"] == 2
+    assert stats["queue_depth"] == 1
+    assert executor.stats()["completed"] == 3
+
+
+def test_create_tool_offloads_aws_work(monkeypatch):
+    calls = []
+
+    def fake_create(template):
+        calls.append(threading.current_thread().name)
+        return {"templateId": "EXT1", "arn": "arn"}
+
+    monkeypatch.setattr(server, "_create_template", fake_create)
+    result = asyncio.run(server.create_fis_template(
+        {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": "Test"},
+        {
+            "roleArn": "arn:aws:iam::123456789012:role/FISRole",
+            "tags": {"Env": "test"},
+            "stopConditionArn": "arn:aws:cloudwatch:us-east-1:123456789012:alarm:test-alarm",
+        },
+    ))
+    assert json.loads(result)["templateId"] == "EXT1"
+    assert calls[0].startswith("aws-call")
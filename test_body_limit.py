@@ -0,0 +1,129 @@
+"""
+Unit tests for request body size limits.
+Run: python -m pytest test_body_limit.py -v
+"""
+import asyncio
+import json
+
+import pytest
+
+import server
+from body_limit import BodySizeLimitMiddleware, BodySizeLimits, parse_tool_limits
+
+
+def _call(name, payload, request_id=7):
+    return json.dumps({
+        "jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+        "params": {"name": name, "arguments": {"finding": {"summary": payload}}},
+    }).encode()
+
+
+def _drive(limits, body, method="POST", chunk_size=None, content_length=True):
+    """Send body through the middleware; returns (status, response JSON, body seen by the app, chunks read)."""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] if chunk_size else [body]
+    messages = [{"type": "http.request", "body": c, "more_body": i < len(chunks) - 1} for i, c in enumerate(chunks)]
+    read, sent, seen = [], [], []
+
+    async def receive():
+        message = messages[len(read)] if len(read) < len(messages) else {"type": "http.disconnect"}
+        read.append(message)
+        return message
+
+    async def send(message):
+        sent.append(message)
+
+    async def app(scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        seen.append(body)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    headers = [(b"content-length", str(len(body)).encode())] if content_length else []
+    scope = {"type": "http", "method": method, "path": "/mcp", "headers": headers}
+    asyncio.run(BodySizeLimitMiddleware(app, limits)(scope, receive, send))
+    payload = json.loads(sent[1]["body"]) if sent[1]["body"] else None
+    return sent[0]["status"], payload, seen, len(read)
+
+
+def test_declared_length_over_limit_is_rejected_unread():
+    limits = BodySizeLimits(max_bytes=100)
+    status, payload, seen, read = _drive(limits, b"x" * 101)
+    assert (status, read, seen) == (413, 0, [])
+    assert payload["error"]["data"] == {"max_bytes": 100}
+    assert limits.stats()["rejected"] == {"content_length": 1}
+
+
+def test_chunked_body_is_counted_and_reading_stops_at_limit():
+    limits = BodySizeLimits(max_bytes=100)
+    status, _, seen, read = _drive(limits, b"x" * 1000, chunk_size=40, content_length=False)
+    assert (status, seen, read) == (413, [], 3)
+    assert limits.stats()["rejected"] == {"streamed": 1}
+
+
+def test_body_within_limits_is_replayed_to_app():
+    body = _call("recommend_fis_experiments", "network latency")
+    status, _, seen, _ = _drive(BodySizeLimits(max_bytes=10_000), body, chunk_size=16, content_length=False)
+    assert (status, seen) == (200, [body])
+
+
+def test_tool_limits_answer_with_the_tools_error_and_apply_only_to_their_tool():
+    limits = BodySizeLimits(max_bytes=50_000, tool_limits={"small_tool": 1000}, tool_errors={"small_tool": "Too big"})
+    status, payload, seen, _ = _drive(limits, _call("small_tool", "x" * 2000, request_id=42))
+    assert (status, seen, payload["id"]) == (200, [], 42)
+    assert payload["result"]["isError"] is False
+    assert json.loads(payload["result"]["content"][0]["text"]) == {"error": "Too big", "max_bytes": 1000}
+
+    status, _, seen, _ = _drive(limits, _call("other_tool", "x" * 2000))
+    assert status == 200 and len(seen) == 1
+    status, _, _, _ = _drive(limits, b"not json" * 200)
+    assert status == 200
+    assert limits.stats()["rejected"] == {"tool_limit": 1}
+
+
+def test_server_limits_reject_oversized_recommend_call_before_parsing():
+    oversized = _call("recommend_fis_experiments", "x" * (server.MAX_INPUT_SIZE * 2))
+    _, payload, seen, _ = _drive(server.BODY_LIMITS, oversized)
+    assert seen == [] and "too large" in payload["result"]["content"][0]["text"].lower()
+    batch_sized = _call("recommend_fis_experiments_batch", "x" * (server.MAX_INPUT_SIZE * 2))
+    assert len(_drive(server.BODY_LIMITS, batch_sized)[2]) == 1
+    assert _drive(server.BODY_LIMITS, b"x" * (server.MAX_REQUEST_BYTES + 1))[0] == 413
+    assert _drive(server.BODY_LIMITS, b"", method="GET")[0] == 200
+
+
+def _pretty_call(name, finding):
+    return json.dumps({
+        "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+        "params": {"name": name, "arguments": {"finding": finding}},
+    }, indent=8).encode()
+
+
+def test_server_limits_agree_with_the_tool_on_pretty_printed_input():
+    # Many short fields make indentation a large share of the body.
+    def finding(size):
+        fields = {f"f{i:04d}": "x" for i in range((size - 100) // 14)}
+        fields["summary"] = "x" * (size - len(json.dumps(fields)) - len(', "summary": ""'))
+        assert len(json.dumps(fields)) == size
+        return fields
+
+    limit = server.BODY_LIMITS.tool_limits["recommend_fis_experiments"]
+    largest = finding(server.MAX_INPUT_SIZE)
+    body = _pretty_call("recommend_fis_experiments", largest)
+    assert len(body) > limit
+    assert _drive(server.BODY_LIMITS, body)[2] == [body]
+    assert "too large" not in server.recommend_fis_experiments(largest).lower()
+
+    # Past the tool's own limit, the tool refuses and so, beyond the overhead allowance, does the middleware.
+    assert "too large" in server.recommend_fis_experiments(finding(server.MAX_INPUT_SIZE + 1)).lower()
+    _, payload, seen, _ = _drive(server.BODY_LIMITS, _pretty_call("recommend_fis_experiments", finding(limit)))
+    assert seen == [] and "too large" in payload["result"]["content"][0]["text"].lower()
+
+
+def test_parse_tool_limits():
+    assert parse_tool_limits(" a=100, b=2000 ") == {"a": 100, "b": 2000}
+    with pytest.raises(ValueError):
+        parse_tool_limits("a")
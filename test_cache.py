@@ -0,0 +1,99 @@
+"""
+Unit tests for the recommendation result cache.
+Run: python -m pytest test_cache.py -v
+"""
+import json
+
+import pytest
+
+import server
+from cache import ResultCache, canonical_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResultCache:
+    def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2, ttl=60)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        assert cache.get("a") == "1"
+        cache.put("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = ResultCache(max_entries=10, ttl=5, clock=clock)
+        cache.put("a", "1")
+        clock.now = 4.9
+        assert cache.get("a") == "1"
+        clock.now = 5.0
+        assert cache.get("a") is None
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 1)
+
+    def test_disabled_when_max_entries_zero(self):
+        cache = ResultCache(max_entries=0)
+        cache.put("a", "1")
+        assert cache.get("a") is None
+
+    def test_canonical_key_ignores_key_order(self):
+        assert canonical_key("ns", {"a": 1, "b": 2}) == canonical_key("ns", {"b": 2, "a": 1})
+        assert canonical_key("ns", {"a": 1}) != canonical_key("other", {"a": 1})
+
+
+class TestRecommendCaching:
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        monkeypatch.setattr(server, "RESULT_CACHE", ResultCache(max_entries=16, ttl=60))
+
+    def test_repeated_finding_hits_cache(self):
+        first = server.recommend_fis_experiments({"summary": "cpu spike", "id": "f-1"})
+        second = server.recommend_fis_experiments({"id": "f-1", "summary": "cpu spike"})
+        assert first == second
+        assert server.RESULT_CACHE.stats()["hits"] == 1
+
+    def test_errors_are_not_cached(self):
+        server.recommend_fis_experiments({"summary": 123})
+        assert len(server.RESULT_CACHE) == 0
+
+    def test_mapping_change_invalidates(self, monkeypatch):
+        finding = {"summary": "disk full"}
+        assert json.loads(server.recommend_fis_experiments(finding))["count"] == 0
+
+        mappings = dict(server.FINDING_MAPPINGS)
+        mappings["disk"] = {"action": "aws:ebs:pause-volume-io", "duration": "PT3M", "description": "Test disk I/O"}
+        monkeypatch.setattr(server, "FINDING_MAPPINGS", mappings)
+        assert json.loads(server.recommend_fis_experiments(finding))["count"] == 1
+
+        # Replacing the dict takes effect at once; edits in place only every FIS_CATALOG_CHECK_INTERVAL.
+        mappings = {**mappings, "disk": {**mappings["disk"], "duration": "PT4M"}}
+        monkeypatch.setattr(server, "FINDING_MAPPINGS", mappings)
+        result = json.loads(server.recommend_fis_experiments(finding))
+        assert result["recommendations"][0]["duration"] == "PT4M"
+
+
+class TestResponseFragments:
+    @pytest.fixture(autouse=True)
+    def no_cache(self, monkeypatch):
+        monkeypatch.setattr(server, "RESULT_CACHE", ResultCache(max_entries=0))
+
+    @pytest.mark.parametrize("summary", ["nothing relevant", "cpu spike", "network latency on lambda database"])
+    def test_fragments_match_json_dumps(self, summary):
+        finding = {"summary": summary}
+        expected = json.loads(server.recommend_fis_experiments(finding))
+        assert server.recommend_fis_experiments(finding) == json.dumps(expected, indent=2)
+        assert server.recommend_fis_experiments(finding, compact=True) == json.dumps(expected, separators=(",", ":"))
+
+    def test_compact_default_from_env(self, monkeypatch):
+        monkeypatch.setattr(server, "COMPACT_JSON", True)
+        assert "\n" not in server.recommend_fis_experiments({"summary": "cpu"})
+        assert "\n" in server.recommend_fis_experiments({"summary": "cpu"}, compact=False)
@@ -0,0 +1,128 @@
+"""
+Unit tests for the hot-reloadable recommendation catalog.
+Run: python -m pytest test_catalog.py -v
+"""
+import json
+import os
+
+import pytest
+
+from catalog import CatalogStore, compile_catalog, load_catalog_file
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.example.json")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _write(path, version, description="Test auto-scaling"):
+    path.write_text(json.dumps({
+        "version": version,
+        "allowed_actions": ["aws:ec2:stop-instances"],
+        "mappings": {"cpu": {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": description}},
+    }))
+    # Give each write a distinct mtime even on coarse-grained filesystems.
+    os.utime(path, ns=(int(version) * 10**9, int(version) * 10**9))
+
+
+class TestCompile:
+    def test_example_catalog_loads(self):
+        catalog = load_catalog_file(EXAMPLE)
+        assert catalog.matcher.match("packet loss in az-1") == {"network"}
+
+    def test_rejects_action_outside_allowlist(self):
+        with pytest.raises(ValueError, match="allowed_actions"):
+            compile_catalog({"cpu": {"action": "aws:ec2:terminate-instances", "duration": "PT3M",
+                                     "description": "x"}}, ["aws:ec2:stop-instances"])
+
+    def test_rejects_bad_duration(self):
+        with pytest.raises(ValueError, match="duration"):
+            compile_catalog({"cpu": {"action": "aws:ec2:stop-instances", "duration": "3 minutes",
+                                     "description": "x"}}, ["aws:ec2:stop-instances"])
+
+
+class TestHotReload:
+    def test_swaps_snapshot_when_file_changes(self, tmp_path):
+        path = tmp_path / "catalog.json"
+        _write(path, "1")
+        clock = FakeClock()
+        store = CatalogStore(str(path), check_interval=5, clock=clock)
+        in_flight = store.current()
+
+        _write(path, "2", description="Scale out")
+        assert store.current() is in_flight  # not yet due for a check
+        clock.now = 5
+        latest = store.current()
+        assert latest.version == "2"
+        assert latest.records["cpu"]["description"] == "Scale out"
+        assert in_flight.records["cpu"]["description"] == "Test auto-scaling"
+        assert store.reloads == 1
+
+    def test_broken_file_keeps_previous_snapshot(self, tmp_path):
+        path = tmp_path / "catalog.json"
+        _write(path, "1")
+        clock = FakeClock()
+        store = CatalogStore(str(path), check_interval=1, clock=clock)
+        path.write_text("{not json")
+        clock.now = 1
+        assert store.current().version == "1"
+        assert store.reload_errors == 1
+
+    def test_malformed_yaml_and_unhashable_actions_keep_previous_snapshot(self, tmp_path):
+        pytest.importorskip("yaml")
+        path = tmp_path / "catalog.yaml"
+        path.write_text("version: '1'\nallowed_actions: [aws:ec2:stop-instances]\nmappings:\n"
+                        "  cpu: {action: 'aws:ec2:stop-instances', duration: PT3M, description: x}\n")
+        clock = FakeClock()
+        store = CatalogStore(str(path), check_interval=1, clock=clock)
+
+        path.write_text("mappings: [unclosed\n")
+        os.utime(path, ns=(2 * 10**9, 2 * 10**9))
+        clock.now = 1
+        assert store.current().version == "1"
+
+        path.write_text(json.dumps({"allowed_actions": [["x"]], "mappings": {}}))
+        os.utime(path, ns=(3 * 10**9, 3 * 10**9))
+        clock.now = 2
+        assert store.current().version == "1"
+        assert store.reload_errors == 2
+        with pytest.raises(ValueError, match="list of strings"):
+            load_catalog_file(str(path))
+
+    def test_builtin_source_recompiles_on_change(self):
+        clock = FakeClock()
+        source = {"mappings": {"cpu": {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": "x"}}}
+        actions = {"aws:ec2:stop-instances"}
+        store = CatalogStore(builtin=lambda: (source["mappings"], actions), check_interval=1, clock=clock)
+        before = store.current()
+
+        # Edits in place are compared at most once per check_interval.
+        source["mappings"]["cpu"]["duration"] = "PT4M"
+        assert store.current() is before
+        clock.now = 1
+        after = store.current()
+        assert after.fingerprint != before.fingerprint
+        assert after.records["cpu"]["duration"] == "PT4M"
+
+        # A replaced mappings object is picked up on the next request.
+        source["mappings"] = {"cpu": {"action": "aws:ec2:stop-instances", "duration": "PT5M", "description": "x"}}
+        assert store.current().records["cpu"]["duration"] == "PT5M"
+
+    def test_builtin_compile_failure_backs_off(self):
+        clock = FakeClock()
+        source = {"mappings": {"cpu": {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": "x"}}}
+        actions = {"aws:ec2:stop-instances"}
+        store = CatalogStore(builtin=lambda: (source["mappings"], actions), check_interval=1, clock=clock)
+        before = store.current()
+        source["mappings"] = {"cpu": {"action": "aws:ec2:stop-instances", "duration": "bad", "description": "x"}}
+        for _ in range(3):
+            assert store.current() is before
+        assert store.reload_errors == 1
+        clock.now = 1
+        assert store.current() is before
+        assert store.reload_errors == 2
@@ -0,0 +1,53 @@
+"""
+Unit tests for building multi-action (composite) FIS templates.
+Run: python -m pytest test_composite_template.py -v
+"""
+import server
+
+RECOMMENDATION = {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": "Test auto-scaling"}
+TARGET = {
+    "roleArn": "arn:aws:iam::123456789012:role/FISRole",
+    "tags": {"Env": "test"},
+    "stopConditionArn": "arn:aws:cloudwatch:us-east-1:123456789012:alarm:test-alarm",
+}
+
+
+class TestCompositeTemplate:
+    def _target(self, env="test", alarm="test-alarm"):
+        alarm_arn = f"arn:aws:cloudwatch:us-east-1:123456789012:alarm:{alarm}"
+        return {**TARGET, "tags": {"Env": env}, "stopConditionArn": alarm_arn}
+
+    def test_builds_multi_action_template_with_ordering(self):
+        recs = [
+            RECOMMENDATION,
+            {"action": "aws:network:disrupt-connectivity", "duration": "PT5M", "description": "Net", "startAfter": [0]},
+            {"action": "aws:ec2:reboot-instances", "duration": "PT2M", "description": "Reboot"},
+        ]
+        targets = [self._target(), self._target(alarm="other-alarm"), self._target(env="prod")]
+        template, error = server._build_composite_template(recs, targets, "", True, server.ALLOWED_ACTIONS)
+        assert error is None
+        assert list(template["actions"]) == ["action1", "action2", "action3"]
+        assert "startAfter" not in template["actions"]["action1"]
+        assert template["actions"]["action2"]["startAfter"] == ["action1"]
+        assert template["actions"]["action3"]["startAfter"] == ["action2"]
+        # The first two steps share an identical target definition.
+        assert len(template["targets"]) == 2
+        assert template["actions"]["action2"]["targets"] == {"Instances": "target1"}
+        assert len(template["stopConditions"]) == 2
+        assert template["description"] == "Test auto-scaling; Net; Reboot"
+
+    def test_reports_every_invalid_step(self):
+        recs = [
+            {**RECOMMENDATION, "action": "aws:ec2:terminate-instances"},
+            {**RECOMMENDATION, "startAfter": [1]},
+        ]
+        template, error = server._build_composite_template(recs, [TARGET, TARGET], "", False, server.ALLOWED_ACTIONS)
+        assert template is None
+        assert [r["index"] for r in error["results"]] == [0, 1]
+
+    def test_rejects_mixed_role_arns(self):
+        other = {**TARGET, "roleArn": "arn:aws:iam::123456789012:role/OtherRole"}
+        _, error = server._build_composite_template(
+            [RECOMMENDATION, RECOMMENDATION], [TARGET, other], "", False, server.ALLOWED_ACTIONS
+        )
+        assert "same roleArn" in error["error"]
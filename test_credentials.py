@@ -0,0 +1,160 @@
+"""
+Unit tests for the cross-account assume-role credential cache.
+Run: python -m pytest test_credentials.py -v
+"""
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from aws_clients import ClientCache
+from credentials import BOTOCORE_ADVISORY_REFRESH, AssumeRoleCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSts:
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+
+    def assume_role(self, RoleArn, RoleSessionName, DurationSeconds, **kwargs):
+        self.calls.append(RoleArn)
+        n = len(self.calls)
+        return {"Credentials": {
+            "AccessKeyId": f"ASIA{n}",
+            "SecretAccessKey": "secret",
+            "SessionToken": "token",
+            "Expiration": datetime.fromtimestamp(self.clock() + DurationSeconds, tz=timezone.utc),
+        }}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def sts(clock):
+    return FakeSts(clock)
+
+
+def _cache(sts, clock, **kwargs):
+    return AssumeRoleCache("FISTemplateCreator", lambda: sts, clock=clock, check_interval=3600, **kwargs)
+
+
+def test_caches_per_account(sts, clock):
+    cache = _cache(sts, clock)
+    first = cache.get("111111111111")
+    assert cache.get("111111111111") is first
+    cache.get("222222222222")
+    assert sts.calls == [
+        "arn:aws:iam::111111111111:role/FISTemplateCreator",
+        "arn:aws:iam::222222222222:role/FISTemplateCreator",
+    ]
+    cache.stop()
+
+
+def test_refresh_ahead_replaces_credentials_before_expiry(sts, clock):
+    evicted = []
+    cache = _cache(sts, clock, on_evict=evicted.append)
+    first = cache.get("111111111111")
+    clock.now += 3600 - 1199
+    cache.refresh_due()
+    refreshed = cache.get("111111111111")
+    assert refreshed["AccessKeyId"] != first["AccessKeyId"]
+    # A refresh keeps the account, so its client stays.
+    assert evicted == []
+    assert cache.stats()["inline_assumes"] == 1
+    cache.stop()
+
+
+def test_refresh_skips_idle_accounts(sts, clock):
+    cache = _cache(sts, clock, idle_after=600)
+    cache.get("111111111111")
+    cache.get("222222222222")
+    clock.now += 3600 - 1199
+    cache.get("222222222222")
+    cache.refresh_due()
+    assert sts.calls == [
+        "arn:aws:iam::111111111111:role/FISTemplateCreator",
+        "arn:aws:iam::222222222222:role/FISTemplateCreator",
+        "arn:aws:iam::222222222222:role/FISTemplateCreator",
+    ]
+    cache.stop()
+
+
+def test_refresh_does_not_reinstall_an_account_evicted_meanwhile(sts, clock):
+    evicted = []
+    cache = _cache(sts, clock, max_accounts=1, on_evict=evicted.append)
+    cache.get("111111111111")
+    clock.now += 3600 - 1199
+    assume = cache._assume
+
+    def assume_while_another_account_arrives(account_id):
+        creds = assume(account_id)
+        if account_id == "111111111111":
+            cache.get("222222222222")
+        return creds
+
+    cache._assume = assume_while_another_account_arrives
+    cache.refresh_due()
+    assert evicted == ["111111111111"]
+    assert cache.stats()["accounts"] == 1
+    assert cache.get("222222222222")["AccessKeyId"] == "ASIA3"
+    cache.stop()
+
+
+def test_refresh_ahead_covers_botocores_advisory_window(sts, clock):
+    cache = _cache(sts, clock, refresh_ahead=60)
+    assert cache.refresh_ahead == BOTOCORE_ADVISORY_REFRESH
+    cache.stop()
+
+
+def test_expired_credentials_are_reassumed_inline(sts, clock):
+    cache = _cache(sts, clock)
+    first = cache.get("111111111111")
+    clock.now += 3600
+    assert cache.get("111111111111")["AccessKeyId"] != first["AccessKeyId"]
+    assert cache.stats()["inline_assumes"] == 2
+    cache.stop()
+
+
+def test_lru_eviction(sts, clock):
+    evicted = []
+    cache = _cache(sts, clock, max_accounts=2, on_evict=evicted.append)
+    a = cache.get("111111111111")
+    cache.get("222222222222")
+    cache.get("111111111111")
+    cache.get("333333333333")
+    assert cache.stats()["accounts"] == 2
+    assert evicted == ["222222222222"]
+    assert cache.get("111111111111") is a
+    cache.stop()
+
+
+def test_one_client_per_account_follows_refreshed_credentials(monkeypatch, sts):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    # botocore compares expiry with the real time, so this cache runs on it too. Credentials that
+    # only live for botocore's advisory window are due for a refresh on every use.
+    sts.clock = time.time
+    cache = AssumeRoleCache("FISTemplateCreator", lambda: sts, clock=time.time, check_interval=3600,
+                            duration_seconds=BOTOCORE_ADVISORY_REFRESH)
+    creds = cache.credentials("111111111111")
+    assert cache.credentials("111111111111") is creds
+    assert creds.get_frozen_credentials().access_key == "ASIA1"
+
+    clients = ClientCache()
+    fis = clients.get("fis", credentials=creds, identity="111111111111")
+    cache.refresh_due()
+    assert creds.get_frozen_credentials().access_key == "ASIA2"
+    assert clients.get("fis", credentials=cache.credentials("111111111111"), identity="111111111111") is fis
+    assert fis._request_signer._credentials is creds
+    assert clients.stats()["constructions"] == 1
+    cache.stop()
@@ -0,0 +1,75 @@
+"""
+End-to-end tests of the create path against the local fake FIS endpoint.
+Run: python -m pytest test_fake_fis.py -v
+"""
+import asyncio
+import json
+
+import pytest
+
+import server
+from aws_clients import ClientCache
+from fake_fis import FakeFisServer
+from template_index import HASH_TAG_KEY, TemplateIndex
+from throttle import AdaptiveRateLimiter
+
+RECOMMENDATION = {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": "Test auto-scaling"}
+
+
+def _target(env):
+    return {
+        "roleArn": "arn:aws:iam::123456789012:role/FISRole",
+        "tags": {"Env": env},
+        "stopConditionArn": "arn:aws:cloudwatch:us-east-1:123456789012:alarm:test-alarm",
+    }
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with FakeFisServer(seed=1) as fake:
+        monkeypatch.setattr(server, "AWS_CLIENTS", ClientCache(endpoint_urls={"fis": fake.endpoint_url}))
+        monkeypatch.setattr(server, "TEMPLATE_INDEX", TemplateIndex())
+        monkeypatch.setattr(server, "ASSUME_ROLE_CACHE", None)
+        yield fake
+
+
+def test_create_get_list_delete_round_trip(fake):
+    fis = server.AWS_CLIENTS.get("fis")
+    created = fis.create_experiment_template(
+        clientToken="tok", description="d", roleArn="arn:aws:iam::123456789012:role/FISRole",
+        stopConditions=[{"source": "none"}], actions={"a": {"actionId": "aws:ec2:stop-instances"}},
+        tags={HASH_TAG_KEY: "abc"},
+    )["experimentTemplate"]
+    again = fis.create_experiment_template(
+        clientToken="tok", description="d", roleArn="arn:aws:iam::123456789012:role/FISRole",
+        stopConditions=[{"source": "none"}], actions={"a": {"actionId": "aws:ec2:stop-instances"}},
+    )["experimentTemplate"]
+    assert again["id"] == created["id"]
+    assert fis.get_experiment_template(id=created["id"])["experimentTemplate"]["tags"] == {HASH_TAG_KEY: "abc"}
+    listed = fis.list_experiment_templates()["experimentTemplates"]
+    assert [t["id"] for t in listed] == [created["id"]]
+
+    fis.delete_experiment_template(id=created["id"])
+    with pytest.raises(fis.exceptions.ResourceNotFoundException):
+        fis.get_experiment_template(id=created["id"])
+
+
+def test_tool_creates_then_reuses(fake):
+    first = json.loads(asyncio.run(server.create_fis_template(RECOMMENDATION, _target("test"))))
+    second = json.loads(asyncio.run(server.create_fis_template(RECOMMENDATION, _target("test"))))
+    assert first["templateId"] in fake.templates
+    assert second == {**first, "reused": True}
+    assert fake.created == 1
+
+
+def test_batch_rides_out_injected_throttling(fake, monkeypatch):
+    fake.throttle_rate = 0.3
+    monkeypatch.setattr(server, "FIS_RATE_LIMITER", AdaptiveRateLimiter(rate=200))
+    items = [{"recommendation": RECOMMENDATION, "target": _target(f"env{i}")} for i in range(12)]
+    result = json.loads(asyncio.run(server.create_fis_templates_batch(items)))
+    assert result["failed"] == 0
+    assert fake.created == 12
+    assert fake.throttled > 0
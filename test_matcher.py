@@ -0,0 +1,92 @@
+"""
+Unit tests for the keyword matcher used by recommend_fis_experiments.
+Run: python -m pytest test_matcher.py -v
+"""
+import json
+
+import pytest
+
+import server
+from matcher import KeywordMatcher, iter_finding_text
+
+
+def _matcher(*phrases):
+    return KeywordMatcher((p, p) for p in phrases)
+
+
+class TestWordBoundaries:
+    def test_matches_whole_words(self):
+        assert _matcher("cpu", "network").match("High CPU on the network tier") == {"cpu", "network"}
+
+    def test_ignores_keyword_inside_other_tokens(self):
+        assert _matcher("cpu", "lambda").match("cpuset idle; lambdax fine; xcpu; cpusing") == set()
+
+    def test_plurals_and_ing_forms_match(self):
+        m = _matcher("database", "network", "lambda", "box")
+        assert m.match("Databases and networking are slow; Lambdas erroring; boxes") == {
+            "database", "network", "lambda", "box",
+        }
+        assert m.match_tokens(["databases", "networking"]) == {"database", "network"}
+
+    def test_suffixes_apply_inside_phrases(self):
+        assert _matcher("packet loss", "cpu").match("packets lost; CPUs losses") == {"cpu"}
+        assert _matcher("packet loss").match("dropped packets loss") == {"packet loss"}
+
+    def test_punctuation_and_underscores_are_boundaries(self):
+        assert _matcher("network").match('{"type": "NETWORK_ISSUE"}') == {"network"}
+
+    def test_case_insensitive(self):
+        assert _matcher("Database").match("DATABASE failover") == {"Database"}
+
+
+class TestPhrases:
+    def test_multi_word_phrase(self):
+        m = _matcher("packet loss", "loss")
+        assert m.match("seeing packet-loss on eth0") == {"packet loss", "loss"}
+        assert m.match("packet drops and loss") == {"loss"}
+
+    def test_overlapping_phrases_use_failure_links(self):
+        m = _matcher("lambda latency", "latency spike")
+        assert m.match("lambda lambda latency spike") == {"lambda latency", "latency spike"}
+
+    def test_several_phrases_share_a_label(self):
+        m = KeywordMatcher([("oom", "memory"), ("out of memory", "memory")])
+        assert m.match("process killed: out of memory") == {"memory"}
+
+    def test_rejects_phrase_without_tokens(self):
+        with pytest.raises(ValueError):
+            _matcher("--")
+
+
+def test_large_catalog():
+    m = KeywordMatcher((f"kw{i}", i) for i in range(1000))
+    assert m.match("kw7 and kw999 but not kw1000") == {7, 999}
+
+
+class TestFindingText:
+    def test_only_configured_fields_are_scanned(self):
+        finding = {"id": "lambda-finding-1", "summary": "cpu spike", "arn": "arn:aws:lambda:us-east-1:1:function:x"}
+        assert list(iter_finding_text(finding)) == ["cpu spike"]
+
+    def test_dotted_paths_and_lists(self):
+        finding = {"details": {"message": "disk full"}, "tags": ["network", 3, "db"]}
+        assert list(iter_finding_text(finding, ("details.message", "tags", "missing.path"))) == [
+            "disk full", "network", "db",
+        ]
+
+    def test_stops_at_budget(self):
+        finding = {"summary": "a" * 8, "type": "b" * 8, "description": "c" * 8}
+        assert list(iter_finding_text(finding, budget=12)) == ["a" * 8, "b" * 4]
+
+    def test_phrases_do_not_straddle_fields(self):
+        m = _matcher("packet loss")
+        assert m.match_spans(["packet", "loss"]) == set()
+        assert m.match_spans(["packet loss"]) == {"packet loss"}
+
+    def test_recommend_matches_plural_findings(self):
+        finding = {"summary": "Databases and networking are slow; Lambdas erroring"}
+        assert json.loads(server.recommend_fis_experiments(finding))["count"] == 3
+
+    def test_recommend_ignores_ids(self):
+        result = json.loads(server.recommend_fis_experiments({"id": "lambda-123", "summary": "cpu spike"}))
+        assert [r["action"] for r in result["recommendations"]] == ["aws:ec2:stop-instances"]
@@ -0,0 +1,113 @@
+"""
+Unit tests for per-tool metrics and the Prometheus rendering.
+Run: python -m pytest test_metrics.py -v
+"""
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+import server
+from metrics import Metrics, MetricsExchange, error_class
+
+W = f'worker="{os.getpid()}",'
+
+
+def test_error_class_drops_variable_details():
+    assert error_class("Action not allowed: aws:foo:bar") == "action_not_allowed"
+    assert error_class("Invalid roleArn format. Expected arn:aws:iam::<account>:role/<name>") == (
+        "invalid_rolearn_format_expected_arn")
+    assert error_class("finding.summary must be a string") == "finding_summary_must_be_a_string"
+    assert error_class("roleArn and stopConditionArn must belong to the same AWS account") == (
+        "rolearn_and_stopconditionarn_must_belong_to_the_same_aws_account")
+    assert error_class(" ".join(["word"] * 30)).endswith("_word")
+    assert error_class("tags are required to scope the target") == "tags_are_required_to_scope_the_target"
+    assert error_class("") == "unknown"
+
+
+def test_sync_tool_counts_errors_and_phases():
+    metrics = Metrics()
+
+    @metrics.instrument
+    def tool(fail: bool) -> str:
+        with metrics.phase("validation"):
+            if fail:
+                return json.dumps({"error": "Invalid duration: PT99M"})
+        with metrics.phase("matching"):
+            pass
+        return json.dumps({"count": 0})
+
+    tool(False)
+    tool(True)
+    text = metrics.render()
+    assert f'fis_mcp_tool_calls_total{{{W}tool="tool",outcome="ok"}} 1' in text
+    assert f'fis_mcp_tool_calls_total{{{W}tool="tool",outcome="error"}} 1' in text
+    assert f'fis_mcp_tool_errors_total{{{W}tool="tool",error_class="invalid_duration"}} 1' in text
+    assert f'fis_mcp_tool_duration_seconds_count{{{W}tool="tool"}} 2' in text
+    assert f'fis_mcp_tool_phase_duration_seconds_count{{{W}tool="tool",phase="validation"}} 2' in text
+    assert f'fis_mcp_tool_phase_duration_seconds_count{{{W}tool="tool",phase="matching"}} 1' in text
+
+
+def test_async_tool_sums_concurrent_phases_and_records_exceptions():
+    metrics = Metrics()
+
+    @metrics.instrument
+    async def tool(n: int) -> str:
+        async def one():
+            with metrics.phase("aws_call"):
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(one() for _ in range(n)))
+        if n > 2:
+            raise RuntimeError("boom")
+        return "{}"
+
+    asyncio.run(tool(2))
+    with pytest.raises(RuntimeError):
+        asyncio.run(tool(3))
+    text = metrics.render()
+    assert f'fis_mcp_tool_errors_total{{{W}tool="tool",error_class="exception_runtimeerror"}} 1' in text
+    assert f'fis_mcp_tool_phase_duration_seconds_count{{{W}tool="tool",phase="aws_call"}} 2' in text
+    phase_sum = next(line for line in text.splitlines()
+                     if line.startswith(f'fis_mcp_tool_phase_duration_seconds_sum{{{W}tool="tool",phase="aws_call"}}'))
+    assert float(phase_sum.split()[-1]) >= 0.05
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics._record("t", 0.05, {})
+    metrics._record("t", 0.5, {})
+    metrics._record("t", 5.0, {})
+    lines = metrics.render().splitlines()
+    assert f'fis_mcp_tool_duration_seconds_bucket{{{W}tool="t",le="0.1"}} 1' in lines
+    assert f'fis_mcp_tool_duration_seconds_bucket{{{W}tool="t",le="1.0"}} 2' in lines
+    assert f'fis_mcp_tool_duration_seconds_bucket{{{W}tool="t",le="+Inf"}} 3' in lines
+
+
+def test_exchange_renders_every_workers_series(tmp_path):
+    ours, theirs = Metrics(), Metrics()
+    ours._record("t", 0.5, {})
+    theirs._record("t", 0.5, {}, error="invalid_duration")
+    (tmp_path / "metrics-99999999.json").write_text(json.dumps(theirs.snapshot()))
+    stale = tmp_path / "metrics-99999998.json"
+    stale.write_text(json.dumps(theirs.snapshot()))
+    os.utime(stale, (time.time() - 120, time.time() - 120))
+
+    exchange = MetricsExchange(ours, str(tmp_path), interval=5)
+    exchange.publish()
+    text = ours.render(exchange.peers())
+    assert f'fis_mcp_tool_calls_total{{{W}tool="t",outcome="ok"}} 1' in text
+    assert 'fis_mcp_tool_errors_total{worker="99999999",tool="t",error_class="invalid_duration"} 1' in text
+    assert "99999998" not in text and not stale.exists()
+    # Each metric family keeps a single HELP/TYPE header.
+    assert text.count("# TYPE fis_mcp_tool_calls_total") == 1
+    exchange.stop()
+    assert not (tmp_path / f"metrics-{os.getpid()}.json").exists()
+
+
+def test_instrumented_tools_keep_their_schemas():
+    tools = {t.name: t for t in asyncio.run(server.mcp.list_tools())}
+    assert set(tools["recommend_fis_experiments"].inputSchema["properties"]) == {"finding", "compact", "top_k"}
+    assert tools["create_fis_template"].inputSchema["required"] == ["recommendation", "target"]
@@ -0,0 +1,93 @@
+"""
+Unit tests for the sampling profiler and the profile_server admin tool.
+Run: python -m pytest test_profiling.py -v
+"""
+import json
+import os
+
+import server
+from metrics import Metrics
+from profiling import Profiler
+
+
+def _leaf(n):
+    return sum(i * i for i in range(n))
+
+
+def _work():
+    return _leaf(2000) + _leaf(3000)
+
+
+def test_sampled_calls_are_aggregated():
+    profiler = Profiler(sample_rate=1.0)
+    for _ in range(3):
+        with profiler.sample("work"):
+            _work()
+    assert profiler.stats() == {"sample_rate": 1.0, "profiled_calls": {"work": 3}, "busy_skipped": 0}
+    assert "_work" in profiler.table(10)
+    stacks = [line.rsplit(" ", 1)[0] for line in profiler.collapsed().splitlines()]
+    assert any(s.startswith("_work (test_profiling.py:") and ";_leaf (test_profiling.py:" in s for s in stacks)
+    assert not any("_lsprof" in s or "(profiling.py:" in s for s in stacks)
+
+
+def test_unsampled_and_overlapping_calls_run_unprofiled():
+    profiler = Profiler(sample_rate=0.0)
+    with profiler.sample("work"):
+        _work()
+    assert profiler.stats()["profiled_calls"] == {}
+
+    profiler.sample_rate = 1.0
+    with profiler.sample("outer"):
+        with profiler.sample("inner"):
+            _work()
+    assert profiler.stats()["profiled_calls"] == {"outer": 1}
+    assert profiler.stats()["busy_skipped"] == 1
+
+    profiler.reset()
+    assert profiler.table() == "" and profiler.collapsed() == ""
+
+
+def test_metrics_profiles_instrumented_tools():
+    profiler = Profiler(sample_rate=1.0)
+    metrics = Metrics(profiler=profiler)
+
+    @metrics.instrument
+    def tool() -> str:
+        _work()
+        return "{}"
+
+    tool()
+    assert profiler.stats()["profiled_calls"] == {"tool": 1}
+
+
+def test_profile_server_requires_admin_token(monkeypatch):
+    monkeypatch.setattr(server, "ADMIN_TOKEN", "")
+    assert json.loads(server.profile_server(""))["error"] == "Unauthorized"
+    monkeypatch.setattr(server, "ADMIN_TOKEN", "s3cret")
+    assert json.loads(server.profile_server("wrong"))["error"] == "Unauthorized"
+    assert json.loads(server.profile_server(None))["error"] == "Unauthorized"
+
+
+def test_profile_server_start_collect_and_dump(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(server, "PROFILER", Profiler())
+    monkeypatch.setattr(server, "METRICS", Metrics(profiler=server.PROFILER))
+    monkeypatch.setattr(server, "PROFILE_FILE", str(tmp_path / "profile"))
+    recommend = server.METRICS.instrument(server.recommend_fis_experiments.__wrapped__)
+
+    assert "error" in json.loads(server.profile_server("s3cret", "start", sample_rate=2))
+    assert json.loads(server.profile_server("s3cret", "dump"))["error"] == "Nothing has been profiled yet"
+    assert json.loads(server.profile_server("s3cret", "start", sample_rate=1))["profiler"]["sample_rate"] == 1.0
+    recommend({"summary": "High network latency on api tier"}, top_k=None)
+
+    collapsed = json.loads(server.profile_server("s3cret", "collapsed"))["collapsed"]
+    assert "recommend_fis_experiments (server.py:" in collapsed
+    stats = json.loads(server.profile_server("s3cret", "stats", limit=5))
+    assert stats["profiler"]["profiled_calls"] == {"recommend_fis_experiments": 1}
+    assert "recommend_fis_experiments" in stats["table"]
+
+    dumped = json.loads(server.profile_server("s3cret", "dump"))
+    assert dumped["worker"] == os.getpid() and dumped["workers"] == server.WORKERS
+    files = dumped["files"]
+    assert all(os.path.getsize(path) > 0 for path in files)
+    assert json.loads(server.profile_server("s3cret", "stop"))["profiler"]["sample_rate"] == 0.0
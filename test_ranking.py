@@ -0,0 +1,59 @@
+"""
+Unit tests for TF-IDF ranking of recommendations.
+Run: python -m pytest test_ranking.py -v
+"""
+import json
+
+import pytest
+
+import server
+from catalog import compile_catalog
+from matcher import tokenize
+from ranking import TfidfRanker
+
+ACTIONS = ["aws:ec2:stop-instances", "aws:rds:reboot-db-instances"]
+
+
+@pytest.fixture
+def ranker():
+    return TfidfRanker(compile_catalog({
+        "cpu": {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": "Test auto-scaling"},
+        "database": {"action": "aws:rds:reboot-db-instances", "duration": "PT2M", "description": "Test database failover"},
+    }, ACTIONS))
+
+
+class TestTfidfRanker:
+    def test_batch_scores_match_single_scores(self, ranker):
+        queries = [tokenize("database failover"), tokenize("nothing here"), tokenize("cpu auto scaling")]
+        batch = ranker.scores(queries)
+        for row, query in enumerate(queries):
+            assert batch[row].tolist() == pytest.approx(ranker.scores([query])[0].tolist())
+
+    def test_top_k_orders_by_score(self, ranker):
+        [ranked] = ranker.top_k([tokenize("database failover with cpu")], k=2)
+        assert [key for key, _ in ranked] == ["database", "cpu"]
+        assert ranked[0][1] > ranked[1][1] > 0
+
+    def test_unrelated_query_scores_nothing(self, ranker):
+        assert ranker.top_k([tokenize("nothing relevant")], k=5) == [[]]
+
+    def test_candidates_limit_results_and_keep_zero_scores(self, ranker):
+        query = tokenize("test database failover")
+        [ranked] = ranker.top_k([query], k=5, candidates=[["cpu"]])
+        assert [key for key, _ in ranked] == ["cpu"]
+        assert ranker.top_k([query], k=5, candidates=[[]]) == [[]]
+
+
+def test_recommend_top_k():
+    result = json.loads(server.recommend_fis_experiments({"summary": "network latency spike"}, top_k=1))
+    assert result["count"] == 1
+    assert result["recommendations"][0]["action"] == "aws:network:disrupt-connectivity"
+    assert "score" in result["recommendations"][0]
+    assert "error" in json.loads(server.recommend_fis_experiments({"summary": "cpu"}, top_k=0))
+
+
+def test_recommend_top_k_returns_only_keyword_matches():
+    finding = {"summary": "Instances test the"}
+    assert json.loads(server.recommend_fis_experiments(finding, top_k=3))["count"] == 0
+    batch = json.loads(server.recommend_fis_experiments_batch([finding, {"summary": "cpu and database"}], top_k=3))
+    assert [r["count"] for r in batch["results"]] == [0, 2]
@@ -44,6 +44,43 @@ class TestRecommendInputValidation:
         assert "error" in result
 
 
+class TestRecommendBatchValidation:
+    def test_returns_per_finding_results(self, call_tool):
+        """Each finding in the batch gets its own result, in order."""
+        result = call_tool("recommend_fis_experiments_batch", {"findings": [
+            {"summary": "network latency spike"},
+            {"summary": "nothing relevant"},
+        ]})
+        assert result["count"] == 2
+        assert [r["index"] for r in result["results"]] == [0, 1]
+        assert result["results"][0]["count"] == 2
+        assert result["results"][1]["recommendations"] == []
+
+    def test_rejects_oversized_finding_in_batch(self, call_tool):
+        """Per-finding size limit still applies inside a batch."""
+        result = call_tool("recommend_fis_experiments_batch", {"findings": [
+            {"summary": "cpu"},
+            {"summary": "x" * 20000},
+        ]})
+        assert result["results"][0]["count"] == 1
+        assert "too large" in result["results"][1]["error"].lower()
+
+    def test_rejects_oversized_batch(self, call_tool):
+        """Aggregate size budget enforced across the whole batch."""
+        result = call_tool("recommend_fis_experiments_batch", {"findings": [{"summary": "x" * 9000}] * 40})
+        assert "error" in result
+        assert "batch too large" in result["error"].lower()
+
+    def test_rejects_too_many_findings(self, call_tool):
+        result = call_tool("recommend_fis_experiments_batch", {"findings": [{"summary": "cpu"}] * 101})
+        assert "error" in result
+        assert "too many" in result["error"].lower()
+
+    def test_rejects_empty_batch(self, call_tool):
+        result = call_tool("recommend_fis_experiments_batch", {"findings": []})
+        assert "error" in result
+
+
 class TestCreateTemplateValidation:
     def test_rejects_disallowed_action(self, call_tool):
         """Finding #3: Action allowlist enforced."""
@@ -150,6 +187,28 @@ class TestCreateTemplateValidation:
         assert "selectionMode" in result["error"]
 
 
+class TestCreateTemplatesBatchValidation:
+    def test_invalid_item_blocks_whole_batch(self, call_tool):
+        """Every item is validated before any FIS call is made."""
+        good = {
+            "recommendation": {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": "Test"},
+            "target": {
+                "roleArn": "arn:aws:iam::123456789012:role/FISRole",
+                "tags": {"Env": "test"},
+                "stopConditionArn": "arn:aws:cloudwatch:us-east-1:123456789012:alarm:test-alarm",
+            },
+        }
+        bad = {**good, "recommendation": {**good["recommendation"], "action": "aws:ec2:terminate-instances"}}
+        result = call_tool("create_fis_templates_batch", {"items": [good, bad]})
+        assert "no templates were created" in result["error"]
+        assert [r["index"] for r in result["results"]] == [1]
+        assert "not allowed" in result["results"][0]["error"].lower()
+
+    def test_rejects_too_many_items(self, call_tool):
+        result = call_tool("create_fis_templates_batch", {"items": [{}] * 101})
+        assert "too many" in result["error"].lower()
+
+
 # === Error Handling Tests ===
 
 class TestErrorHandling:
@@ -0,0 +1,93 @@
+"""
+Unit tests for single-flight coalescing.
+Run: python -m pytest test_singleflight.py -v
+"""
+import asyncio
+import json
+
+import pytest
+
+import server
+from aws_clients import ClientCache
+from fake_fis import FakeFisServer
+from singleflight import SingleFlight
+from template_index import TemplateIndex
+
+
+def test_identical_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return {"value": value}
+
+    async def drive():
+        same = [flights.do("a", work, 1) for _ in range(5)]
+        other = flights.do("b", work, 2)
+        return await asyncio.gather(*same, other)
+
+    results = asyncio.run(drive())
+    assert calls == [1, 2]
+    assert results[:5] == [{"value": 1}] * 5 and results[5] == {"value": 2}
+    assert flights.stats() == {"in_flight": 0, "leaders": 2, "coalesced": 4}
+
+
+def test_exception_reaches_every_caller_and_key_is_released():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def drive():
+        results = await asyncio.gather(flights.do("k", fail), flights.do("k", fail), return_exceptions=True)
+        again = await flights.do("k", asyncio.sleep, 0, "fresh")
+        return results, again
+
+    results, again = asyncio.run(drive())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert again == "fresh"
+    assert flights.stats()["leaders"] == 2
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flights = SingleFlight()
+
+    async def drive():
+        leader = asyncio.ensure_future(flights.do("k", asyncio.sleep, 0.02, "done"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("k", asyncio.sleep, 0.02, "other"))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(drive()) == "done"
+
+
+def test_concurrent_identical_creates_make_one_fis_round_trip(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    recommendation = {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": "Test auto-scaling"}
+    target = {
+        "roleArn": "arn:aws:iam::123456789012:role/FISRole",
+        "tags": {"Env": "test"},
+        "stopConditionArn": "arn:aws:cloudwatch:us-east-1:123456789012:alarm:test-alarm",
+    }
+    with FakeFisServer(latency_ms=20) as fake:
+        monkeypatch.setattr(server, "AWS_CLIENTS", ClientCache(endpoint_urls={"fis": fake.endpoint_url}))
+        monkeypatch.setattr(server, "TEMPLATE_INDEX", TemplateIndex())
+        monkeypatch.setattr(server, "ASSUME_ROLE_CACHE", None)
+        monkeypatch.setattr(server, "CREATE_FLIGHTS", SingleFlight())
+
+        async def drive():
+            return await asyncio.gather(*(server.create_fis_template(recommendation, target) for _ in range(8)))
+
+        results = [json.loads(r) for r in asyncio.run(drive())]
+    assert len({r["templateId"] for r in results}) == 1
+    assert fake.stats()["requests"] == 2  # one list to seed the index, one create
+    assert server.CREATE_FLIGHTS.stats()["coalesced"] == 7
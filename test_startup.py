@@ -0,0 +1,83 @@
+"""
+Unit tests for startup marks, prewarming and lazy imports.
+Run: python -m pytest test_startup.py -v
+"""
+import asyncio
+import subprocess
+import sys
+
+from startup import StartupMiddleware, StartupTimeline, prewarm
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_marks_are_offsets_and_first_one_wins():
+    clock = FakeClock()
+    timeline = StartupTimeline(clock=clock)
+    clock.now += 0.25
+    assert timeline.mark("imports") == 250.0
+    clock.now += 0.5
+    assert timeline.mark("imports") == 250.0
+    assert timeline.snapshot() == {"imports": 250.0}
+
+
+def test_middleware_marks_first_http_request_only():
+    timeline = StartupTimeline()
+    seen, firsts = [], []
+
+    async def app(scope, receive, send):
+        seen.append(scope["type"])
+
+    wrapped = StartupMiddleware(app, timeline, on_first=lambda: firsts.append(1))
+
+    async def drive():
+        await wrapped({"type": "http"}, None, None)
+        await wrapped({"type": "http"}, None, None)
+
+    asyncio.run(drive())
+    assert seen == ["http", "http"]
+    assert firsts == [1]
+    assert "first_request" in timeline.snapshot()
+
+
+def test_middleware_runs_lifespan_hooks():
+    timeline = StartupTimeline()
+    events, sent = [], []
+
+    async def app(scope, receive, send):
+        await send({"type": "lifespan.startup.complete"})
+        await send({"type": "lifespan.shutdown.complete"})
+
+    async def send(message):
+        sent.append(message["type"])
+
+    wrapped = StartupMiddleware(app, timeline, on_started=lambda: events.append("started"),
+                                on_shutdown=lambda: events.append("shutdown"))
+    asyncio.run(wrapped({"type": "lifespan"}, None, send))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert events == ["started", "shutdown"]
+    assert set(timeline.snapshot()) == {"listening"}
+
+
+def test_prewarm_skips_failing_steps():
+    timeline = StartupTimeline()
+    ran = []
+
+    def broken():
+        raise RuntimeError("no region")
+
+    prewarm([("broken", broken), ("ok", lambda: ran.append("ok"))], timeline).join(timeout=5)
+    assert ran == ["ok"]
+    assert set(timeline.snapshot()) == {"prewarm:ok"}
+
+
+def test_importing_server_leaves_heavy_modules_unloaded():
+    code = "import sys, server; print(sorted(m for m in ('boto3', 'botocore', 'numpy') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
@@ -0,0 +1,142 @@
+"""
+Unit tests for idempotent FIS template creation.
+Run: python -m pytest test_template_index.py -v
+"""
+import threading
+import time
+
+import boto3
+import pytest
+from botocore.stub import ANY, Stubber
+
+import server
+from template_index import HASH_TAG_KEY, TemplateIndex, template_hash
+
+RECOMMENDATION = {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": "Test auto-scaling"}
+TARGET = {
+    "roleArn": "arn:aws:iam::123456789012:role/FISRole",
+    "tags": {"Env": "test"},
+    "stopConditionArn": "arn:aws:cloudwatch:us-east-1:123456789012:alarm:test-alarm",
+}
+
+
+@pytest.fixture
+def template():
+    template, error = server._build_template(RECOMMENDATION, TARGET, server.ALLOWED_ACTIONS)
+    assert error is None
+    return template
+
+
+@pytest.fixture
+def fis():
+    client = boto3.client("fis", region_name="us-east-1", aws_access_key_id="x", aws_secret_access_key="x")
+    with Stubber(client) as stubber:
+        client.stubber = stubber
+        yield client
+        stubber.assert_no_pending_responses()
+
+
+def _arn(template_id):
+    return f"arn:aws:fis:us-east-1:123456789012:experiment-template/{template_id}"
+
+
+def _created(template_id):
+    return {"experimentTemplate": {"id": template_id, "arn": _arn(template_id)}}
+
+
+def test_second_identical_request_reuses_template(fis, template):
+    digest = template_hash(template)
+    fis.stubber.add_response("list_experiment_templates", {"experimentTemplates": []})
+    fis.stubber.add_response("create_experiment_template", _created("EXT1"), {
+        **template, "clientToken": digest, "tags": {HASH_TAG_KEY: digest},
+    })
+    fis.stubber.add_response("get_experiment_template", {"experimentTemplate": {"id": "EXT1"}}, {"id": "EXT1"})
+
+    index = TemplateIndex()
+    first = index.create_or_reuse(fis, template)
+    assert first["templateId"] == "EXT1"
+    assert "reused" not in first
+    second = index.create_or_reuse(fis, template)
+    assert second == {**first, "reused": True}
+    assert index.stats() == {"templates": 1, "created": 1, "reused": 1, "seed_errors": 0, "lookup_errors": 0}
+
+
+def test_seeds_from_tagged_templates(fis, template):
+    digest = template_hash(template)
+    fis.stubber.add_response("list_experiment_templates", {"experimentTemplates": [
+        {"id": "EXTOLD", "arn": _arn("EXTOLD"), "tags": {HASH_TAG_KEY: digest}},
+        {"id": "EXTOTHER", "tags": {}},
+    ]})
+    fis.stubber.add_response("get_experiment_template", {"experimentTemplate": {"id": "EXTOLD"}}, {"id": "EXTOLD"})
+
+    result = TemplateIndex().create_or_reuse(fis, template)
+    assert result == {"templateId": "EXTOLD", "arn": _arn("EXTOLD"), "reused": True}
+
+
+def test_recreates_when_indexed_template_was_deleted(fis, template):
+    digest = template_hash(template)
+    fis.stubber.add_response("list_experiment_templates", {"experimentTemplates": [
+        {"id": "EXTGONE", "arn": _arn("EXTGONE"), "tags": {HASH_TAG_KEY: digest}},
+    ]})
+    fis.stubber.add_client_error("get_experiment_template", "ResourceNotFoundException")
+    # The digest alone was the deleted template's token, which FIS could answer with the deleted template.
+    fis.stubber.add_response("create_experiment_template", _created("EXT2"), {
+        **template, "clientToken": f"{digest}-1", "tags": ANY,
+    })
+
+    assert TemplateIndex().create_or_reuse(fis, template)["templateId"] == "EXT2"
+
+
+def test_denied_list_and_get_fall_back_to_create_and_seed_once(fis, template):
+    digest = template_hash(template)
+    expected = {**template, "clientToken": digest, "tags": {HASH_TAG_KEY: digest}}
+    fis.stubber.add_client_error("list_experiment_templates", "AccessDeniedException", http_status_code=403)
+    fis.stubber.add_response("create_experiment_template", _created("EXT1"), expected)
+    fis.stubber.add_client_error("get_experiment_template", "AccessDeniedException", http_status_code=403)
+    fis.stubber.add_response("create_experiment_template", _created("EXT1"), expected)
+
+    index = TemplateIndex()
+    assert index.create_or_reuse(fis, template)["templateId"] == "EXT1"
+    assert index.create_or_reuse(fis, template)["templateId"] == "EXT1"
+    stats = index.stats()
+    assert (stats["seed_errors"], stats["lookup_errors"]) == (1, 1)
+
+
+class SlowListFis:
+    """Just enough of a FIS client for concurrent first creates, with a listing slow enough to overlap."""
+
+    def __init__(self):
+        self.lists = 0
+        self.creates = 0
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self):
+        self.lists += 1
+        time.sleep(0.05)
+        return [{"experimentTemplates": []}]
+
+    def create_experiment_template(self, **kwargs):
+        self.creates += 1
+        return _created(kwargs["clientToken"][:8])
+
+
+def test_concurrent_first_creates_list_the_scope_once(template):
+    fis = SlowListFis()
+    index = TemplateIndex()
+    templates = [{**template, "description": f"template {i}"} for i in range(8)]
+    threads = [threading.Thread(target=index.create_or_reuse, args=(fis, t)) for t in templates]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert fis.lists == 1
+    assert fis.creates == 8
+    assert index.stats()["created"] == 8
+
+
+def test_hash_ignores_key_order(template):
+    reordered = dict(reversed(list(template.items())))
+    assert template_hash(reordered) == template_hash(template)
+
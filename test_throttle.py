@@ -0,0 +1,141 @@
+"""
+Unit tests for the adaptive FIS rate limiter.
+Run: python -m pytest test_throttle.py -v
+"""
+import asyncio
+
+import pytest
+import uvicorn
+from botocore.exceptions import ClientError
+
+import server
+from throttle import AdaptiveRateLimiter, call_with_backoff_async
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+def _throttled():
+    return ClientError({"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}}, "CreateExperimentTemplate")
+
+
+def test_token_bucket_paces_after_burst():
+    t = FakeTime()
+    limiter = AdaptiveRateLimiter(rate=10, burst=2, clock=t.clock)
+
+    async def drive():
+        for _ in range(12):
+            await limiter.acquire_async(sleep=t.sleep)
+
+    asyncio.run(drive())
+    assert t.now == pytest.approx(1.0)
+
+
+def test_throttle_halves_rate_and_success_recovers():
+    limiter = AdaptiveRateLimiter(rate=20)
+    limiter.on_throttle()
+    assert limiter.rate == 10
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == 20
+
+
+def test_throttle_never_raises_a_rate_below_min_rate():
+    limiter = AdaptiveRateLimiter(rate=0.25)
+    limiter.on_throttle()
+    assert limiter.rate <= 0.25
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == 0.25
+    assert server._create_rate_limiter(80).min_rate <= server.FIS_CREATE_RATE / 80
+
+
+def test_backoff_retries_throttling_only():
+    t = FakeTime()
+    limiter = AdaptiveRateLimiter(rate=100, clock=t.clock)
+    outcomes = [_throttled(), _throttled(), "ok"]
+
+    async def call():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert asyncio.run(call_with_backoff_async(call, limiter, sleep=t.sleep)) == "ok"
+    assert limiter.throttles == 2
+
+    async def denied():
+        raise ClientError({"Error": {"Code": "AccessDeniedException", "Message": "no"}}, "CreateExperimentTemplate")
+
+    with pytest.raises(ClientError):
+        asyncio.run(call_with_backoff_async(denied, limiter, sleep=t.sleep))
+    assert limiter.throttles == 2
+
+
+def test_backoff_gives_up_after_max_attempts():
+    t = FakeTime()
+    limiter = AdaptiveRateLimiter(rate=1000, clock=t.clock)
+
+    async def always_throttled():
+        raise _throttled()
+
+    with pytest.raises(ClientError):
+        asyncio.run(call_with_backoff_async(always_throttled, limiter, max_attempts=3, sleep=t.sleep))
+    assert limiter.throttles == 2
+
+
+def test_backoff_waits_grow_between_attempts():
+    t = FakeTime()
+    limiter = AdaptiveRateLimiter(rate=10, burst=1, clock=t.clock)
+    calls = []
+
+    async def call():
+        calls.append(t.now)
+        if len(calls) < 3:
+            raise _throttled()
+        return "ok"
+
+    assert asyncio.run(call_with_backoff_async(call, limiter, sleep=t.sleep)) == "ok"
+    assert limiter.throttles == 2
+    assert calls[0] == 0 and calls[2] - calls[1] > calls[1] - calls[0] > 0
+
+
+def test_single_process_server_gets_the_whole_create_rate(monkeypatch):
+    monkeypatch.setattr(server, "FIS_RATE_LIMITER", server._create_rate_limiter(8))
+    monkeypatch.setattr(server, "create_app", lambda: "app")
+    monkeypatch.setattr(uvicorn, "run", lambda app, **options: None)
+    monkeypatch.setattr("sys.argv", ["server.py", "--workers", "1"])
+    server.main()
+    assert server.FIS_RATE_LIMITER.max_rate == server.FIS_CREATE_RATE
+    assert server.FIS_RATE_LIMITER.burst == max(1.0, server.FIS_CREATE_BURST)
+
+
+def test_single_creates_share_the_limiter_and_retry_throttles(monkeypatch):
+    limiter = AdaptiveRateLimiter(rate=1000)
+    monkeypatch.setattr(server, "FIS_RATE_LIMITER", limiter)
+    outcomes = [_throttled(), {"templateId": "EXT1", "arn": "arn"}]
+
+    def create(template):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(server, "_create_template", create)
+    recommendation = {"action": "aws:ec2:stop-instances", "duration": "PT3M", "description": "Paced"}
+    target = {
+        "roleArn": "arn:aws:iam::123456789012:role/FISRole",
+        "tags": {"Env": "paced"},
+        "stopConditionArn": "arn:aws:cloudwatch:us-east-1:123456789012:alarm:test-alarm",
+    }
+    result = asyncio.run(server.create_fis_template(recommendation, target))
+    assert '"EXT1"' in result
+    assert limiter.throttles == 1
@@ -0,0 +1,144 @@
+"""
+Unit tests for tracing spans, traceparent propagation and exporters.
+Run: python -m pytest test_tracing.py -v
+"""
+import asyncio
+import json
+
+import boto3
+import pytest
+
+from aws_executor import AwsCallExecutor
+from fake_fis import FakeFisServer
+from metrics import Metrics
+from tracing import JsonlExporter, Tracer, TracingMiddleware, parse_traceparent
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def by_name(self, name):
+        return next(s for s in self.spans if s["name"] == name)
+
+
+@pytest.fixture
+def exporter():
+    return ListExporter()
+
+
+def test_parse_traceparent():
+    ctx = parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01")
+    assert (ctx.trace_id, ctx.span_id, ctx.sampled) == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00").sampled is False
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert parse_traceparent("garbage") is None
+    assert ctx.traceparent() == f"00-{TRACE_ID}-{PARENT_ID}-01"
+
+
+def test_nested_spans_share_trace_and_record_errors(exporter):
+    tracer = Tracer(exporter)
+    with pytest.raises(ValueError):
+        with tracer.span("outer") as outer:
+            with tracer.span("inner", key="v"):
+                pass
+            raise ValueError("boom")
+    inner, root = exporter.spans
+    assert inner["trace_id"] == root["trace_id"] == outer.trace_id
+    assert inner["parent_span_id"] == root["span_id"]
+    assert root["parent_span_id"] is None
+    assert inner["attributes"] == {"key": "v"}
+    assert (root["status"], root["attributes"]["error.type"]) == ("error", "ValueError")
+
+
+def test_disabled_or_unsampled_tracer_exports_nothing(exporter):
+    with Tracer(None).span("x"):
+        pass
+    tracer = Tracer(exporter, sample_rate=0.0)
+    with tracer.span("root"):
+        with tracer.span("child"):
+            pass
+    assert exporter.spans == []
+
+
+def _drive(app, headers):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app({"type": "http", "method": "POST", "path": "/mcp", "headers": headers}, None, send))
+    return sent
+
+
+def test_middleware_continues_incoming_trace_through_tool_phases(exporter):
+    tracer = Tracer(exporter)
+    metrics = Metrics(tracer=tracer)
+    executor = AwsCallExecutor(max_concurrency=2)
+
+    @metrics.instrument
+    async def tool() -> str:
+        with metrics.phase("aws_call"):
+            # The worker thread sees the phase span as its parent.
+            await executor.run(lambda: tracer.span("aws.call").__enter__().end())
+        return json.dumps({"error": "Action not allowed: x"})
+
+    async def app(scope, receive, send):
+        await tool()
+        await send({"type": "http.response.start", "status": 200})
+
+    _drive(TracingMiddleware(app, tracer), [(b"traceparent", f"00-{TRACE_ID}-{PARENT_ID}-01".encode())])
+    request, tool_span = exporter.by_name("http.request"), exporter.by_name("tool.tool")
+    phase, aws = exporter.by_name("phase.aws_call"), exporter.by_name("aws.call")
+    assert {s["trace_id"] for s in exporter.spans} == {TRACE_ID}
+    assert request["parent_span_id"] == PARENT_ID
+    assert request["attributes"]["http.status_code"] == 200
+    assert tool_span["parent_span_id"] == request["span_id"]
+    assert (tool_span["status"], tool_span["attributes"]["error.type"]) == ("error", "action_not_allowed")
+    assert phase["parent_span_id"] == tool_span["span_id"]
+    assert aws["parent_span_id"] == phase["span_id"]
+
+
+def test_middleware_honours_unsampled_parent(exporter):
+    tracer = Tracer(exporter)
+
+    async def app(scope, receive, send):
+        with tracer.span("inner"):
+            pass
+
+    _drive(TracingMiddleware(app, tracer), [(b"traceparent", f"00-{TRACE_ID}-{PARENT_ID}-00".encode())])
+    assert exporter.spans == []
+
+
+def test_botocore_calls_become_spans(exporter):
+    tracer = Tracer(exporter)
+    with FakeFisServer() as fake:
+        fis = boto3.client("fis", region_name="us-east-1", endpoint_url=fake.endpoint_url,
+                           aws_access_key_id="x", aws_secret_access_key="x")
+        tracer.instrument_botocore(fis)
+        with tracer.span("parent"):
+            fis.list_experiment_templates()
+            with pytest.raises(fis.exceptions.ResourceNotFoundException):
+                fis.get_experiment_template(id="EXTmissing")
+    listed = exporter.by_name("aws.fis.ListExperimentTemplates")
+    missing = exporter.by_name("aws.fis.GetExperimentTemplate")
+    assert listed["parent_span_id"] == exporter.by_name("parent")["span_id"]
+    assert (listed["status"], listed["attributes"]["http.status_code"]) == ("ok", 200)
+    assert (missing["status"], missing["attributes"]["error.type"]) == ("error", "ResourceNotFoundException")
+
+
+def test_jsonl_exporter_writes_one_span_per_line(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(JsonlExporter(str(path)))
+    with tracer.span("a"):
+        with tracer.span("b"):
+            pass
+    tracer.exporter.close()
+    names = [json.loads(line)["name"] for line in path.read_text().splitlines()]
+    assert names == ["b", "a"]
@@ -0,0 +1,92 @@
+"""Client-side rate limiting for AWS API calls.
+
+AdaptiveRateLimiter is a token bucket whose refill rate backs off
+multiplicatively when AWS throttles and creeps back up additively on
+success (AIMD), so bulk operations settle just under the account's limit
+instead of repeatedly tripping it.
+
+call_with_backoff_async paces and retries a coroutine, waiting on the event
+loop so no executor thread sits idle through the limiter or the backoff.
+"""
+import asyncio
+import random
+import threading
+import time
+
+THROTTLE_ERROR_CODES = {"ThrottlingException", "Throttling", "TooManyRequestsException", "RequestLimitExceeded"}
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, rate: float, burst: float = None, min_rate: float = 0.5, clock=time.monotonic):
+        self.max_rate = rate
+        self.rate = rate
+        # A worker's share of the server-wide rate can be below min_rate; backing off must never raise it.
+        self.min_rate = min(min_rate, rate)
+        self.burst = burst if burst is not None else rate
+        self._tokens = self.burst
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.throttles = 0
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self) -> float:
+        """Take a token and return 0, or return how long to wait before trying again."""
+        with self._lock:
+            self._refill()
+            # Tolerate float rounding so a refill that lands at 0.999... doesn't spin.
+            if self._tokens >= 1 - 1e-9:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    async def acquire_async(self, sleep=asyncio.sleep):
+        """Wait on the event loop until a token is available, then take it."""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def on_throttle(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0)
+            self.throttles += 1
+
+    def stats(self) -> dict:
+        return {"rate": round(self.rate, 3), "max_rate": self.max_rate, "throttles": self.throttles}
+
+
+def is_throttle_error(error: Exception) -> bool:
+    response = getattr(error, "response", None) or {}
+    return response.get("Error", {}).get("Code") in THROTTLE_ERROR_CODES
+
+
+async def call_with_backoff_async(fn, limiter: AdaptiveRateLimiter, max_attempts: int = 6,
+                                  base_delay: float = 0.1, max_delay: float = 5.0, sleep=asyncio.sleep):
+    """Await fn() under the limiter, retrying throttling errors with jittered exponential backoff.
+
+    Limiter and backoff waits happen on the event loop, never on a thread.
+    """
+    for attempt in range(max_attempts):
+        await limiter.acquire_async(sleep=sleep)
+        try:
+            result = await fn()
+        except Exception as e:
+            if not is_throttle_error(e) or attempt == max_attempts - 1:
+                raise
+            limiter.on_throttle()
+            await sleep(min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0))
+            continue
+        limiter.on_success()
+        return result
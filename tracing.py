@@ -0,0 +1,242 @@
+"""Lightweight request tracing with W3C trace-context propagation.
+
+TracingMiddleware opens an http.request span for every HTTP request,
+continuing the caller's trace when a `traceparent` header is present, so
+spans line up with the AgentCore/agent side of a slow call. Tool calls and
+their phases open child spans through Metrics (see metrics.py), and
+instrument_botocore adds a span per AWS API call. The current span lives in
+a contextvar, which AwsCallExecutor copies into its worker threads.
+
+Finished spans go to an exporter: any object with export(span_dict). The
+default writes one JSON object per line to a local file, so traces can be
+inspected without a collector. With no exporter, spans cost one contextvar
+read.
+"""
+import contextvars
+import importlib
+import json
+import random
+import re
+import threading
+import time
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current = contextvars.ContextVar("fis_mcp_span", default=None)
+
+
+class SpanContext:
+    """Identity of a span; also used for the remote parent taken from traceparent."""
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool = True):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+def parse_traceparent(header: str):
+    """SpanContext for a valid traceparent header value, else None."""
+    match = TRACEPARENT_PATTERN.match((header or "").strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return SpanContext(match.group(1), match.group(2), sampled=bool(int(match.group(3), 16) & 1))
+
+
+class Span(SpanContext):
+    __slots__ = ("name", "parent_id", "attributes", "start_ns", "end_ns", "status", "_tracer", "_token")
+
+    def __init__(self, tracer, name, trace_id, parent_id, attributes):
+        super().__init__(trace_id, f"{random.getrandbits(64):016x}", sampled=True)
+        self._tracer = tracer
+        self.name = name
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, error_type: str):
+        self.status = "error"
+        self.attributes.setdefault("error.type", error_type)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.record_error(exc_type.__name__)
+        self.end()
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self._tracer._export(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "service": self._tracer.service,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is off or the trace is not sampled."""
+    __slots__ = ("_token", "_context")
+
+    def __init__(self, context=None):
+        self._context = context
+
+    def set_attribute(self, key, value):
+        pass
+
+    def record_error(self, error_type):
+        pass
+
+    def __enter__(self):
+        # Unsampled traces still carry their context so children make the same decision.
+        self._token = _current.set(self._context) if self._context is not None else None
+        return self
+
+    def __exit__(self, *exc):
+        if self._token is not None:
+            _current.reset(self._token)
+
+
+_NOOP = _NoopSpan()
+
+
+class Tracer:
+    def __init__(self, exporter=None, sample_rate: float = 1.0, service: str = "fis-recommender-mcp"):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.service = service
+        self.exported = 0
+        self.export_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def current(self):
+        return _current.get()
+
+    def span(self, name: str, parent: SpanContext = None, **attributes):
+        """Context manager for a child of parent (default: the current span)."""
+        if self.exporter is None:
+            return _NOOP
+        parent = parent or _current.get()
+        if parent is None:
+            if random.random() >= self.sample_rate:
+                return _NoopSpan(SpanContext(f"{random.getrandbits(128):032x}", "0" * 16, sampled=False))
+            return Span(self, name, f"{random.getrandbits(128):032x}", None, attributes)
+        if not parent.sampled:
+            return _NoopSpan(parent)
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    def _export(self, span: Span):
+        try:
+            self.exporter.export(span.to_dict())
+            self.exported += 1
+        except Exception:
+            self.export_errors += 1
+
+    def instrument_botocore(self, client):
+        """Record a span per API call made with a boto3 client (retries included)."""
+        if self.exporter is None:
+            return client
+
+        def before_call(model, context, **kwargs):
+            span = self.span(f"aws.{model.service_model.service_name}.{model.name}",
+                             **{"rpc.system": "aws-api", "rpc.method": model.name})
+            context["fis_mcp_span"] = span.__enter__()
+
+        def finish(context, exception=None, http_response=None, parsed=None, **kwargs):
+            span = context.pop("fis_mcp_span", None)
+            if span is None:
+                return
+            if exception is not None:
+                span.record_error(type(exception).__name__)
+            elif http_response is not None:
+                span.set_attribute("http.status_code", http_response.status_code)
+                if http_response.status_code >= 400:
+                    span.record_error((parsed or {}).get("Error", {}).get("Code") or "HTTPError")
+            span.__exit__(None, None, None)
+
+        events = client.meta.events
+        events.register("before-call.*.*", before_call)
+        events.register("after-call.*.*", finish)
+        events.register("after-call-error.*.*", finish)
+        return client
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "sample_rate": self.sample_rate,
+                "exported": self.exported, "export_errors": self.export_errors}
+
+
+class JsonlExporter:
+    """Appends each finished span to path as one JSON line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+
+    def export(self, span: dict):
+        line = json.dumps(span, separators=(",", ":"), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def load_exporter(spec: str, path: str):
+    """Exporter for FIS_TRACE_EXPORTER: "jsonl" (default), "none", or "package.module:factory"."""
+    if not spec or spec == "jsonl":
+        return JsonlExporter(path)
+    if spec == "none":
+        return None
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr or "exporter")()
+
+
+class TracingMiddleware:
+    """ASGI wrapper opening an http.request span per request, parented on the incoming traceparent."""
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        remote = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        with self.tracer.span("http.request", parent=remote, **{
+            "http.method": scope.get("method", ""), "http.target": scope.get("path", ""),
+        }) as span:
+            async def traced_send(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, traced_send)